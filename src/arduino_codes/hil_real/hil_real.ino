@@ -21,9 +21,17 @@ bool led_fuel_state = false;
 String inputString = "";
 bool stringComplete = false;
 
+// Hız pazarlığı (BAUD): yeni hızda BAUD_CONFIRM_MS içinde TEST gelmezse eski hıza dönülür
+const long BAUD_BASE = 9600;
+const unsigned long BAUD_CONFIRM_MS = 1000;
+long curBaud = BAUD_BASE;
+long prevBaud = BAUD_BASE;
+unsigned long baudSwitchAt = 0;
+bool baudPending = false;
+
 void setup() {
   // Serial başlat
-  Serial.begin(9600);
+  Serial.begin(BAUD_BASE);
   
   // LED pinlerini çıkış olarak ayarla
   pinMode(LED_GREEN, OUTPUT);
@@ -46,6 +54,12 @@ void setup() {
 }
 
 void loop() {
+  // Yeni hız onaylanmadıysa geri dön
+  if (baudPending && millis() - baudSwitchAt >= BAUD_CONFIRM_MS) {
+    baudPending = false;
+    switchBaud(prevBaud);
+  }
+  
   // Serial mesajları işle
   if (stringComplete) {
     processSerialMessage(inputString);
@@ -73,10 +87,33 @@ void processSerialMessage(String message) {
   
   // Test mesajı kontrolü
   if (message == "TEST") {
+    baudPending = false;
     Serial.println("1");
     return;
   }
   
+  // Yetenek sorgusu
+  if (message == "CAPS") {
+    Serial.println("CAPS HIL_REAL/2 BAUD");
+    return;
+  }
+  
+  // Hız pazarlığı: "BAUD hız" formatında
+  if (message.startsWith("BAUD ")) {
+    long rate = message.substring(5).toInt();
+    if (rate != BAUD_BASE && rate != 115200 && rate != 250000 && rate != 1000000) {
+      Serial.println("BAUD ERR");
+      return;
+    }
+    Serial.print("BAUD OK ");
+    Serial.println(rate);
+    prevBaud = curBaud;
+    switchBaud(rate);
+    baudSwitchAt = millis();
+    baudPending = true;
+    return;
+  }
+  
   // Pin komutları: "pin,state" formatında
   if (message.indexOf(',') != -1) {
     int commaIndex = message.indexOf(',');
@@ -121,6 +158,14 @@ void processSerialMessage(String message) {
   }
 }
 
+void switchBaud(long rate) {
+  Serial.flush();
+  Serial.end();
+  Serial.begin(rate);
+  curBaud = rate;
+  inputString = "";
+}
+
 void setPinState(int pin, int state) {
   bool pinState = (state == 1);
   
@@ -14,6 +14,81 @@ String pinLabel(int pin){
   return String(pin);
 }
 
+bool isPwmPin(int p){return p==3||p==5||p==6||p==9||p==10||p==11;}
+
+// Sıra numaralı komutlar: "#<seq> KOMUT" -> yanıt "#<seq> YANIT"
+// Çıktı üretmeyen komutlar için yalnızca "#<seq>" onayı gönderilir.
+int curSeq=-1;        // -1 = etiketsiz komut
+bool tagSent=false;
+
+// Hız pazarlığı: "BAUD <hız>" -> "BAUD OK <hız>", ardından iki taraf yeni hıza geçer.
+// Yeni hızda BAUD_CONFIRM_MS içinde TEST gelmezse önceki hıza geri dönülür.
+const long BAUD_BASE=9600;
+const unsigned long BAUD_CONFIRM_MS=1000;
+long curBaud=BAUD_BASE, prevBaud=BAUD_BASE;
+unsigned long baudSwitchAt=0; bool baudPending=false;
+
+bool baudAllowed(long b){return b==BAUD_BASE||b==115200||b==250000||b==1000000;}
+void switchBaud(long b){Serial.flush();Serial.end();Serial.begin(b);curBaud=b;}
+
+// ---------------- İkili protokol (PROTO BIN) ----------------
+// Çerçeve: [opcode][seq][payload...][crc8], COBS ile kodlanır ve 0x00 ile biter.
+// Opcode'lar core/protocol.py ile aynı olmalıdır.
+bool binMode=false;
+enum {OP_TEST=0x01,OP_MODE,OP_DWRITE,OP_PWM,OP_ALL,OP_STAT,OP_DIG,OP_ANA,OP_TEXT,OP_MODES,OP_WRITE};
+enum {OP_R_ACK=0x81,OP_R_DIGITAL,OP_R_PWM,OP_R_MODE,OP_R_ALL,OP_R_DIG,OP_R_ANA,OP_R_STAT,OP_R_TEXT,OP_R_BATCH};
+uint8_t rxBuf[64]; uint8_t rxLen=0; bool rxOverflow=false;
+uint8_t txBuf[64]; uint8_t txLen=0;
+
+uint8_t crc8(const uint8_t *d, uint8_t n){
+  uint8_t c=0;
+  for(uint8_t i=0;i<n;i++){c^=d[i];for(uint8_t b=0;b<8;b++)c=(c&0x80)?(uint8_t)((c<<1)^0x07):(uint8_t)(c<<1);}
+  return c;
+}
+
+// COBS kodlayıp yaz (çerçeveler 254 bayttan kısa)
+void cobsWrite(const uint8_t *d, uint8_t n){
+  uint8_t start=0;
+  for(uint8_t i=0;i<=n;i++){
+    if(i==n || d[i]==0){Serial.write((uint8_t)(i-start+1));Serial.write(d+start,i-start);start=i+1;}
+  }
+}
+
+// Yerinde COBS çözme; çözülen uzunluk ya da hata için -1
+int cobsDecode(uint8_t *buf, uint8_t n){
+  uint8_t out=0, i=0;
+  while(i<n){
+    uint8_t code=buf[i++];
+    if(code==0 || i+code-1>n) return -1;
+    for(uint8_t k=1;k<code;k++) buf[out++]=buf[i++];
+    if(i<n) buf[out++]=0;
+  }
+  return out;
+}
+
+void frameBegin(uint8_t op){txLen=0;txBuf[txLen++]=op;txBuf[txLen++]=curSeq<0?0:(uint8_t)curSeq;tagSent=true;}
+void framePut(uint8_t b){if(txLen<sizeof(txBuf)-1)txBuf[txLen++]=b;}
+void frameEnd(){txBuf[txLen]=crc8(txBuf,txLen);cobsWrite(txBuf,txLen+1);Serial.write((uint8_t)0);}
+
+// ---------------- Yanıt yardımcıları (metin / ikili) ----------------
+// Yanıtın başına (bir kez) sıra etiketini yaz
+void replyBegin(){
+  if(curSeq>=0 && !tagSent){Serial.print('#');Serial.print(curSeq);Serial.print(' ');}
+  tagSent=true;
+}
+
+void reply(const String &m){
+  if(binMode){frameBegin(OP_R_TEXT);for(unsigned int i=0;i<m.length();i++)framePut((uint8_t)m.charAt(i));frameEnd();return;}
+  replyBegin();Serial.println(m);
+}
+
+// Etiketli komut hiç çıktı üretmediyse boş onay gönder
+void replyAck(){
+  if(curSeq<0 || tagSent) return;
+  if(binMode){frameBegin(OP_R_ACK);frameEnd();return;}
+  Serial.print('#');Serial.println(curSeq);
+}
+
 String prevLCDLine="";
 void lcdMsg(const String &m){
   String newLine = m.length()>16?m.substring(0,16):m;
@@ -32,10 +107,112 @@ void lcdMsg(const String &m){
 
   prevLCDLine = newLine;
   // gecikme kaldırıldı; anlık güncelleme
-} 
+}
+
+// ---------------- Pin işlemleri (her iki protokol de kullanır) ----------------
+// apply* fonksiyonları yanıt üretmez; toplu komutlar (MODES/WRITE) bunları kullanır
+bool applyMode(int pin, int m){
+  if(pin<2 || pin>19) return false;
+  if(m<0 || m>2) m=0;
+  pinMode(pin, m==1?OUTPUT:INPUT);
+  pinModes[pin]=m; // 0/1/2
+  return true;
+}
+
+// PWM pinine değer, diğer pinlere 0/1 yaz
+bool applyWrite(int pin, int val){
+  if(!(pin>=2&&pin<=19&&pinModes[pin])) return false;
+  if(isPwmPin(pin)){analogWrite(pin,val);pinStates[pin]=val;}
+  else {digitalWrite(pin,val?HIGH:LOW);pinStates[pin]=val?1:0;}
+  return true;
+}
+
+void doMode(int pin, int m){
+  if(!applyMode(pin,m)) return;
+  m=pinModes[pin];
+  String modeStr = m==2?"PAS":(m==1?"OUT":"IN");
+  String msg = "PIN " + pinLabel(pin) + ":" + modeStr;
+  if(binMode){frameBegin(OP_R_MODE);framePut(pin);framePut(m);frameEnd();}
+  else reply(msg);
+  lcdMsg(msg); // LCD'ye de yazdır
+}
+
+void doDigital(int pin, int st){
+  if(!(pin>=2&&pin<=19&&pinModes[pin])) return;
+  digitalWrite(pin,st?HIGH:LOW);pinStates[pin]=st;
+  String s="PIN "+pinLabel(pin)+" : "+ (st?"ON":"OFF");
+  if(binMode){frameBegin(OP_R_DIGITAL);framePut(pin);framePut(st?1:0);frameEnd();}
+  else reply(s);
+  lcdMsg(s);
+}
+
+void doPwm(int pin, int val){
+  if(!(isPwmPin(pin)&&pinModes[pin])) return;
+  analogWrite(pin,val);pinStates[pin]=val;
+  String s="PIN "+pinLabel(pin)+" : "+String(val);
+  if(binMode){frameBegin(OP_R_PWM);framePut(pin);framePut(val);frameEnd();}
+  else reply(s);
+  lcdMsg(s);
+}
+
+void doAll(int st){
+  for(int p=2;p<=19;p++){if(!pinModes[p])continue;if(isPwmPin(p)){analogWrite(p,st?255:0);pinStates[p]=st?255:0;}else {digitalWrite(p,st?HIGH:LOW);pinStates[p]=st?1:0;}}
+  String msg = String("PIN ALL: ") + (st?"ON":"OFF");
+  if(binMode){frameBegin(OP_R_ALL);framePut(st?1:0);frameEnd();}
+  else reply(msg);
+  lcdMsg(msg);
+}
+
+// Toplu komut onayı: "MODES OK <n>" / "WRITE OK <n>"
+void replyBatch(uint8_t kind, int count){
+  String msg = String(kind==0?"MODES":"WRITE") + " OK " + String(count);
+  if(binMode){frameBegin(OP_R_BATCH);framePut(kind);framePut(count);frameEnd();}
+  else reply(msg);
+  lcdMsg(msg);
+}
+
+// Metin toplu komut gövdesi: "2:1,3:255,..." (pin:değer çiftleri)
+void doBatchText(uint8_t kind, String body){
+  int count=0, start=0;
+  while(start<(int)body.length()){
+    int comma=body.indexOf(',',start);
+    if(comma<0) comma=body.length();
+    String ent=body.substring(start,comma);
+    int c=ent.indexOf(':');
+    if(c>0){
+      int pin=ent.substring(0,c).toInt();int val=ent.substring(c+1).toInt();
+      if(kind==0 ? applyMode(pin,val) : applyWrite(pin,val)) count++;
+    }
+    start=comma+1;
+  }
+  replyBatch(kind,count);
+}
+
+void sendStat(){
+  if(binMode){frameBegin(OP_R_STAT);for(int p=2;p<=19;p++){framePut(pinStates[p]);framePut(pinModes[p]);}frameEnd();return;}
+  replyBegin();for(int p=2;p<=19;p++){Serial.print(pinLabel(p));Serial.print(":" );Serial.print(pinStates[p]);Serial.print(":" );Serial.print(pinModes[p]); // 0/1/2
+        if(p<19)Serial.print(",");}Serial.println();
+}
+
+void sendDig(){
+  if(binMode){
+    uint32_t mask=0, vals=0;
+    for(int p=2;p<=19;p++){if(!pinModes[p]){mask|=(1UL<<p);if(digitalRead(p))vals|=(1UL<<p);}}
+    frameBegin(OP_R_DIG);
+    for(int i=0;i<3;i++)framePut((mask>>(8*i))&0xFF);
+    for(int i=0;i<3;i++)framePut((vals>>(8*i))&0xFF);
+    frameEnd();return;
+  }
+  replyBegin();for(int p=2;p<=19;p++){if(!pinModes[p]){int v=digitalRead(p);Serial.print("D");Serial.print(p);Serial.print(":" );Serial.print(v);Serial.print(",");}}Serial.println();
+}
+
+void sendAna(){
+  if(binMode){frameBegin(OP_R_ANA);for(int a=0;a<6;a++){int v=analogRead(a);analogValues[a]=v;framePut(v&0xFF);framePut(v>>8);}frameEnd();return;}
+  replyBegin();for(int a=0;a<6;a++){int v=analogRead(a);analogValues[a]=v;Serial.print("A");Serial.print(a);Serial.print(":" );Serial.print(v);if(a<5)Serial.print(",");}Serial.println();
+}
 
 void setup(){
-  Serial.begin(9600);
+  Serial.begin(BAUD_BASE);
   lcd.init();
   lcd.backlight();
   lcd.setCursor(0,0);
@@ -46,10 +223,75 @@ void setup(){
 }
 
 void loop(){
+ if(baudPending && millis()-baudSwitchAt>=BAUD_CONFIRM_MS){baudPending=false;switchBaud(prevBaud);}
+ if(binMode){
+  while(Serial.available()){
+    uint8_t b=Serial.read();
+    if(b==0){
+      int n = rxOverflow ? -1 : cobsDecode(rxBuf,rxLen);
+      rxLen=0;rxOverflow=false;
+      if(n>0) handleFrame(rxBuf,n);
+    }
+    else if(rxLen<sizeof(rxBuf)) rxBuf[rxLen++]=b;
+    else rxOverflow=true; // çerçeve sonuna kadar yoksay
+  }
+  return;
+ }
  if(Serial.available()){
   String cmd=Serial.readStringUntil('\n');
   cmd.trim(); // sondaki \r veya boşlukları temizle
-  if(cmd.equals("TEST")) { Serial.println("1"); }
+  curSeq=-1;
+  tagSent=false;
+  if(cmd.charAt(0)=='#'){
+    int sp=cmd.indexOf(' ');
+    if(sp<0){curSeq=cmd.substring(1).toInt();cmd="";}
+    else{curSeq=cmd.substring(1,sp).toInt();cmd=cmd.substring(sp+1);cmd.trim();}
+  }
+  handleCommand(cmd);
+  replyAck();
+ }
+}
+
+// İkili çerçeveyi işle (CRC hatalı çerçeveler sessizce atılır; host zaman aşımıyla düşer)
+void handleFrame(uint8_t *f, int n){
+  if(n<3 || crc8(f,n-1)!=f[n-1]) return;
+  uint8_t op=f[0];
+  curSeq = f[1] ? f[1] : -1;
+  tagSent=false;
+  uint8_t *p=f+2; int len=n-3;
+  switch(op){
+    case OP_TEST: baudPending=false; reply("1"); break;
+    case OP_MODE: if(len>=2) doMode(p[0],p[1]); break;
+    case OP_DWRITE: if(len>=2) doDigital(p[0],p[1]); break;
+    case OP_PWM: if(len>=2) doPwm(p[0],p[1]); break;
+    case OP_ALL: if(len>=1) doAll(p[0]); break;
+    case OP_STAT: sendStat(); break;
+    case OP_DIG: sendDig(); break;
+    case OP_ANA: sendAna(); break;
+    case OP_MODES: case OP_WRITE: {
+      int count=0;
+      for(int i=0;i+1<len;i+=2){if(op==OP_MODES ? applyMode(p[i],p[i+1]) : applyWrite(p[i],p[i+1])) count++;}
+      replyBatch(op==OP_MODES?0:1,count);
+    } break;
+    case OP_TEXT: {String cmd="";for(int i=0;i<len;i++)cmd+=(char)p[i];cmd.trim();handleCommand(cmd);} break;
+  }
+  replyAck();
+}
+
+void handleCommand(String cmd){
+  if(cmd.equals("TEST")) { baudPending=false; reply("1"); }
+  else if(cmd.equals("CAPS")) { reply("CAPS FNSS_TEST/5 SEQ BIN BATCH BAUD"); }
+  else if(cmd.startsWith("BAUD ")){
+    long b=cmd.substring(5).toInt();
+    if(!baudAllowed(b)){reply("BAUD ERR");return;}
+    reply("BAUD OK "+String(b));
+    prevBaud=curBaud;switchBaud(b);
+    baudSwitchAt=millis();baudPending=true;
+  }
+  else if(cmd.equals("PROTO BIN")) { reply("PROTO BIN"); Serial.flush(); binMode=true; rxLen=0; rxOverflow=false; }
+  else if(cmd.equals("PROTO TEXT")) { reply("PROTO TEXT"); Serial.flush(); binMode=false; }
+  else if(cmd.startsWith("MODES ")){doBatchText(0,cmd.substring(6));}
+  else if(cmd.startsWith("WRITE ")){doBatchText(1,cmd.substring(6));}
   else if(cmd.startsWith("MODE ")){
     int c=cmd.indexOf(',');
     if(c<=5) return; // eksik komutu yoksay
@@ -60,30 +302,13 @@ void loop(){
     int m;
     if(val=="2" || val=="PAS" || val=="PASS" || val=="PASIF") m=2;
     else m = (val=="1" || val=="OUT" || val=="OUTPUT") ? 1 : 0;
-    if(pin>=2 && pin<=19){
-      if(m==2){
-        pinMode(pin, INPUT);
-        pinModes[pin]=2;
-        String msg = "PIN " + pinLabel(pin) + ":PAS";
-        Serial.println(msg);
-        lcdMsg(msg); // LCD'ye de yazdır
-      }else{
-        pinMode(pin, m==1?OUTPUT:INPUT);
-        pinModes[pin]=m; // 0/1
-        String modeStr = m==1?"OUT":"IN";
-        String msg = "PIN " + pinLabel(pin) + ":" + modeStr;
-        Serial.println(msg);
-        lcdMsg(msg); // LCD'ye de yazdır
-      }
-    }
+    doMode(pin,m);
   }
-  else if(cmd.indexOf(',')>0 && isDigit(cmd.charAt(0))){int c=cmd.indexOf(',');int pin=cmd.substring(0,c).toInt();int st=cmd.substring(c+1).toInt();if(pin>=2&&pin<=19&&pinModes[pin]){digitalWrite(pin,st?HIGH:LOW);pinStates[pin]=st;String s="PIN "+pinLabel(pin)+" : "+ (st?"ON":"OFF");Serial.println(s);lcdMsg(s);} }
-  else if(cmd.startsWith("PWM ")){int c=cmd.indexOf(',');int pin=cmd.substring(4,c).toInt();int val=cmd.substring(c+1).toInt();if((pin==3||pin==5||pin==6||pin==9||pin==10||pin==11)&&pinModes[pin]){analogWrite(pin,val);pinStates[pin]=val;String s="PIN "+pinLabel(pin)+" : "+String(val);Serial.println(s);lcdMsg(s);} }
+  else if(cmd.indexOf(',')>0 && isDigit(cmd.charAt(0))){int c=cmd.indexOf(',');doDigital(cmd.substring(0,c).toInt(),cmd.substring(c+1).toInt());}
+  else if(cmd.startsWith("PWM ")){int c=cmd.indexOf(',');doPwm(cmd.substring(4,c).toInt(),cmd.substring(c+1).toInt());}
   /* ALLMODE komutu kaldırıldı */
-  else if(cmd.startsWith("ALL ")){int st=cmd.substring(4).toInt();for(int p=2;p<=19;p++){if(!pinModes[p])continue;if(p==3||p==5||p==6||p==9||p==10||p==11){analogWrite(p,st?255:0);pinStates[p]=st?255:0;}else {digitalWrite(p,st?HIGH:LOW);pinStates[p]=st?1:0;}}String msg = String("PIN ALL: ") + (st?"ON":"OFF");Serial.println(msg);lcdMsg(msg);} 
-  else if(cmd.equals("STAT")){for(int p=2;p<=19;p++){Serial.print(pinLabel(p));Serial.print(":" );Serial.print(pinStates[p]);Serial.print(":" );Serial.print(pinModes[p]); // 0/1/2
-        if(p<19)Serial.print(",");}Serial.println();}
-  else if(cmd.equals("DIG")){for(int p=2;p<=19;p++){if(!pinModes[p]){int v=digitalRead(p);Serial.print("D");Serial.print(p);Serial.print(":" );Serial.print(v);Serial.print(",");}}Serial.println();}
-  else if(cmd.equals("ANA")){for(int a=0;a<6;a++){int v=analogRead(a);analogValues[a]=v;Serial.print("A");Serial.print(a);Serial.print(":" );Serial.print(v);if(a<5)Serial.print(",");}Serial.println();}
- }
-} 
\ No newline at end of file
+  else if(cmd.startsWith("ALL ")){doAll(cmd.substring(4).toInt());}
+  else if(cmd.equals("STAT")){sendStat();}
+  else if(cmd.equals("DIG")){sendDig();}
+  else if(cmd.equals("ANA")){sendAna();}
+}
@@ -0,0 +1,5 @@
+"""Donanım gerektirmeyen performans ölçüm scriptleri.
+
+Çalıştırma (src dizininden):
+    python -m benchmarks.serial_latency
+"""
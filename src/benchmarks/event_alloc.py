@@ -0,0 +1,90 @@
+"""benchmarks.event_alloc
+MessageRouter olaylarının satır başına bellek ayırma maliyetini ölçer.
+
+    dict  : olaylar eskisi gibi {'pin': .., 'value': ..} dict'leri
+    slots : core.events sınıfları (__slots__)
+
+Her modda iki geçiş yapılır:
+    süre     : boş dinleyicilerle satır başına süre
+    tutulan  : dinleyiciler aldıkları olayı saklar (Tk kuyruğu gibi); olaylar
+               için ayrılıp serbest bırakılmayan bellek tracemalloc ile
+               satır başına bayt / blok olarak ölçülür
+
+Korpus benchmarks.router_parse ile aynıdır (FirmwareModel yanıtları).
+
+    python -m benchmarks.event_alloc [--lines 20000]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from typing import List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.router_parse import firmware_corpus, run  # noqa: E402
+from core.events import PinState  # noqa: E402
+from core.message_router import MessageRouter  # noqa: E402
+from core.serial_manager import SerialManager  # noqa: E402
+
+EVENTS = ("pin_state", "analog_value", "stat", "raw")
+
+
+class DictRouter(MessageRouter):
+    """Karşılaştırma için olayları dict olarak üreten yönlendirici"""
+
+    def _new(self, cls, *args):
+        return dict(zip(cls.__slots__, args))
+
+
+def measure_retained(router, lines: List[str]):
+    kept: list = []
+    for event in EVENTS:
+        router.add_listener(event, kept.append)
+    # Listenin kendi büyümesi ölçüme girmesin diye önceden yer ayır
+    kept.extend([None] * (len(lines) * 30))
+    kept.clear()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    run(router, lines)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    size = sum(s.size_diff for s in stats)
+    blocks = sum(s.count_diff for s in stats)
+    for event in EVENTS:
+        router.remove_listener(event, kept.append)
+    return len(kept), size, blocks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=20000, help="üretilecek satır sayısı")
+    args = parser.parse_args()
+
+    lines = firmware_corpus(args.lines)
+    print(f"korpus: {len(lines)} satır  "
+          f"olay boyutu: dict={sys.getsizeof({'pin': 7, 'value': 1})} B  slots={sys.getsizeof(PinState(7, 1))} B")
+
+    serial = SerialManager(name="event_alloc")
+    for name, router in (("dict", DictRouter(serial)), ("slots", MessageRouter(serial))):
+        serial.remove_message_callback(router._on_serial_message)
+        for event in EVENTS:
+            router.add_listener(event, _noop)
+        elapsed = min(run(router, lines) for _ in range(3))
+        for event in EVENTS:
+            router.remove_listener(event, _noop)
+        count, size, blocks = measure_retained(router, lines)
+        print(f"{name:<6} {elapsed * 1e6 / len(lines):6.2f} µs/satır  olay={count:<7} "
+              f"tutulan: {size / len(lines):7.1f} B/satır  {blocks / len(lines):5.2f} blok/satır")
+
+
+def _noop(data):
+    pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""benchmarks.firmware_loop
+SerialManager'ı uçtan uca (el sıkışma, codec, pencere, dağıtıcı) ölçer.
+
+Varsayılan port donanım gerektirmez: "sim://" süreç içi FirmwareModel'i,
+"pty://sim" aynı modeli gerçek bir PTY çiftinin karşı ucunda çalıştırır.
+Gerçek kartla karşılaştırmak için --port COM3 / /dev/ttyACM0 verilebilir.
+
+    sıralı     : her komut yanıtı beklenerek gönderilir (gidiş-dönüş gecikmesi)
+    boru hattı : kuyruk kapasitesi kadar komut art arda gönderilir (komut/s)
+
+    python -m benchmarks.firmware_loop [--port sim://] [--count 2000] [--text]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.serial_manager import SerialManager  # noqa: E402
+
+COMMANDS = ("ANA", "DIG", "STAT", "PWM 9,128", "13,1")
+
+
+def run_sequential(manager: SerialManager, count: int):
+    samples = []
+    for i in range(count):
+        t0 = time.perf_counter()
+        manager.request(COMMANDS[i % len(COMMANDS)]).result(2.0)
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def run_pipelined(manager: SerialManager, count: int) -> float:
+    batch = manager.send_queue.maxsize
+    t0 = time.perf_counter()
+    done = 0
+    while done < count:
+        n = min(batch, count - done)
+        futures = [manager.request(COMMANDS[(done + i) % len(COMMANDS)]) for i in range(n)]
+        for future in futures:
+            future.result(5.0)
+        done += n
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", default="sim://", help="sim://, pty://sim, tcp://host:port ya da seri port")
+    parser.add_argument("--count", type=int, default=2000, help="her ölçümdeki komut sayısı")
+    parser.add_argument("--text", action="store_true", help="ikili protokole geçme")
+    args = parser.parse_args()
+
+    manager = SerialManager(name="benchmark")
+    manager.auto_reconnect = False
+    if args.text:
+        manager.prefer_binary = False
+    if not manager.connect(args.port):
+        print(f"{args.port} bağlanamadı")
+        return
+    try:
+        print(f"port: {args.port}  protokol: {manager.protocol}  baud: {manager.link_baudrate}")
+        samples = sorted(run_sequential(manager, args.count))
+        p99 = samples[int(len(samples) * 0.99) - 1]
+        print(f"sıralı     n={len(samples):<6} ort={statistics.mean(samples) * 1e6:8.1f} µs  "
+              f"p50={statistics.median(samples) * 1e6:8.1f} µs  p99={p99 * 1e6:8.1f} µs")
+        elapsed = run_pipelined(manager, args.count)
+        print(f"boru hattı n={args.count:<6} süre={elapsed * 1000:8.1f} ms  {args.count / elapsed:10,.0f} komut/s")
+        stats = manager.stats_snapshot()
+        print(f"write()    çağrı={stats['tx_writes']:<6} komut/çağrı={stats['commands_per_write']:.2f}  "
+              f"zaman aşımı={stats['timeouts']}")
+    finally:
+        manager.disconnect()
+
+
+if __name__ == "__main__":
+    main()
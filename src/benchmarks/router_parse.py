@@ -0,0 +1,177 @@
+"""benchmarks.router_parse
+MessageRouter'ın satır ayrıştırma hızını ve ürettiği olayları ölçer.
+
+Satır korpusu varsayılan olarak core.firmware_model ile üretilir: rastgele
+komutlar modele verilir, Test_real.ino'nun vereceği yanıtlar toplanır
+(PIN x : v, PIN A0 : ON, PIN x:IN/OUT/PAS, PIN ALL, D.., A.., STAT).
+--capture ile satır satır kaydedilmiş gerçek bir Serial Monitor dökümü de
+kullanılabilir.
+
+    legacy   : startswith/split/isdigit zinciriyle çalışan önceki yönlendirici
+    table    : ilk kelime/karaktere göre tablo ile dağıtan core.protocol parser'ı
+    snapshot : table + DIG/ANA satırı başına tek digital/analog_snapshot olayı
+               (pin başına açılım kapalı, add_listener(..., snapshots=False))
+    *-pin    : yalnızca pin_state dinleyicisi (ör. dijital pin göstergeleri);
+               table, dinleyicisi olmayan A.. ve STAT satırlarını ayrıştırmaz
+
+Olay sayıları da karşılaştırılır: eski yönlendirici "PIN A0 : ON"
+satırlarını ve STAT'taki A0..A5 girdilerini kaçırır.
+
+    python -m benchmarks.router_parse [--lines 50000] [--capture dosya.txt]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.firmware_model import FirmwareModel  # noqa: E402
+from core.message_router import MessageRouter  # noqa: E402
+from core.serial_manager import SerialManager  # noqa: E402
+
+
+class LegacyRouter(MessageRouter):
+    """Karşılaştırma için önceki MessageRouter._on_serial_message'ın kopyası
+    (olay dağıtımı ve dinleyiciler MessageRouter ile ortak)"""
+
+    def _on_serial_message(self, source: str, line: str):
+        if source != "Alınan":
+            return
+        line = line.strip()
+        self._dispatch("raw", {"line": line})
+        if line.startswith("PIN "):
+            parts = line[4:].strip()
+            if parts.upper().startswith("ALL"):
+                return
+            if ':' not in parts:
+                return
+            pin_part, val_part = parts.split(':', 1)
+            pin_part = pin_part.strip()
+            val_part = val_part.strip()
+            if pin_part.isdigit():
+                pin = int(pin_part)
+                up_val = val_part.upper()
+                if val_part.isdigit():
+                    value = int(val_part)
+                elif up_val in ("ON", "OFF"):
+                    value = 1 if up_val == "ON" else 0
+                else:
+                    return
+                self._dispatch("pin_state", {"pin": pin, "value": value})
+            return
+        if line.startswith("D") and ':' in line:
+            entries = line.split(',')
+            for ent in entries:
+                if ':' in ent and ent.startswith("D"):
+                    p, v = ent.split(':')
+                    if p[1:].isdigit() and v.isdigit():
+                        self._dispatch("pin_state", {"pin": int(p[1:]), "value": int(v)})
+            return
+        if line.startswith("A0:"):
+            for ent in line.split(','):
+                if ':' in ent:
+                    name, val = ent.split(':')
+                    if val.isdigit():
+                        self._dispatch("analog_value", {"pin": name.strip(), "value": int(val)})
+            return
+        if ':' in line and ',' in line and not line.startswith(('A', 'D')):
+            entries: List[Tuple[int, int, int]] = []
+            for ent in line.split(','):
+                parts = ent.split(':')
+                if len(parts) >= 3 and parts[0].isdigit() and parts[1].isdigit() and parts[2].isdigit():
+                    entries.append((int(parts[0]), int(parts[1]), int(parts[2])))
+            if entries:
+                self._dispatch("stat", {"entries": entries})
+            return
+
+
+def firmware_corpus(count: int, seed: int = 1) -> List[str]:
+    """FirmwareModel'in rastgele komutlara verdiği yanıt satırları"""
+    rnd = random.Random(seed)
+    model = FirmwareModel()
+    for pin in (2, 4, 7, 8, 16, 17):
+        model.feed(f"MODE {pin},IN\n".encode())
+    lines: List[str] = []
+    while len(lines) < count:
+        model.analog_values = [rnd.randint(0, 1023) for _ in range(6)]
+        model.input_levels = [rnd.randint(0, 1) for _ in range(20)]
+        kind = rnd.random()
+        if kind < 0.3:
+            cmd = "ANA"
+        elif kind < 0.5:
+            cmd = "DIG"
+        elif kind < 0.6:
+            cmd = "STAT"
+        elif kind < 0.75:
+            cmd = f"PWM {rnd.choice((3, 5, 6, 9, 10, 11))},{rnd.randint(0, 255)}"
+        elif kind < 0.9:
+            cmd = f"{rnd.choice((12, 13, 14, 15, 18, 19))},{rnd.randint(0, 1)}"
+        elif kind < 0.97:
+            cmd = f"MODE {rnd.choice((12, 13, 15, 18))},{rnd.choice(('OUT', 'PAS', 'OUT'))}"
+        else:
+            cmd = f"ALL {rnd.randint(0, 1)}"
+        out = model.feed((cmd + "\n").encode()).decode()
+        lines.extend(line for line in out.split("\r\n") if line)
+        # Kapatılan pinleri tekrar çıkış yap ki yanıt üretmeye devam etsinler
+        model.feed(b"MODES 12:1,13:1,15:1,18:1\n")
+    return lines[:count]
+
+
+def run(router, lines: List[str]) -> float:
+    handle = router._on_serial_message
+    t0 = time.perf_counter()
+    for line in lines:
+        handle("Alınan", line)
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=50000, help="üretilecek satır sayısı")
+    parser.add_argument("--capture", help="satır satır kayıt dosyası (üretilen korpus yerine)")
+    args = parser.parse_args()
+
+    if args.capture:
+        with open(args.capture, encoding="utf-8", errors="ignore") as f:
+            lines = [line.strip() for line in f if line.strip()]
+    else:
+        lines = firmware_corpus(args.lines)
+    print(f"korpus: {len(lines)} satır")
+
+    serial = SerialManager(name="router_parse")
+    per_pin = ("pin_state", "analog_value", "stat")
+    snapshot = per_pin + ("digital_snapshot", "analog_snapshot")
+    for name, router, event_types, expand in (("legacy", LegacyRouter(serial), per_pin, True),
+                                              ("table", MessageRouter(serial), per_pin, True),
+                                              ("snapshot", MessageRouter(serial), snapshot, False),
+                                              ("legacy-pin", LegacyRouter(serial), ("pin_state",), True),
+                                              ("table-pin", MessageRouter(serial), ("pin_state",), True)):
+        serial.remove_message_callback(router._on_serial_message)
+        # Süre boş dinleyicilerle ölçülür (yalnızca ayrıştırma + dağıtım)
+        for event in event_types:
+            router.add_listener(event, _noop, snapshots=expand)
+        elapsed = min(run(router, lines) for _ in range(3))
+        # Olay sayıları ayrı bir geçişte sayılır (dinleyici çağrısı başına)
+        events: Counter = Counter()
+        for event in event_types:
+            router.remove_listener(event, _noop)
+            router.add_listener(event, lambda data, e=event: events.update({e: len(data.get("entries", ())) or 1}),
+                                snapshots=expand)
+        run(router, lines)
+        print(f"{name:<10} {len(lines) / elapsed:12,.0f} satır/s  {elapsed * 1e6 / len(lines):6.2f} µs/satır  "
+              f"pin_state={events['pin_state']} analog={events['analog_value']} "
+              f"snapshot={events['digital_snapshot'] + events['analog_snapshot']} stat girdisi={events['stat']}")
+
+
+def _noop(data):
+    pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""benchmarks.rx_lines
+Alım yolunun satır ayırma maliyetini ölçer.
+
+Aynı bayt akışı (varsayılan: firmware çıktısını taklit eden sentetik kayıt,
+ya da --capture ile gerçek bir port dökümü) USB paketleri büyüklüğünde
+parçalar halinde üç yoldan geçirilir:
+
+    readline : eski SerialThread - satır başına readline().decode().strip()
+               (pyserial gibi io.RawIOBase.readline, yani bayt başına read(1))
+    extend   : satır başına find + decode + del buf[:n] yapan önceki codec
+    split    : core.protocol.TextCodec - parça başına tek decode ve tek split
+
+    python -m benchmarks.rx_lines [--lines 20000] [--chunk 64] [--capture dosya.bin]
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+from typing import List, Optional, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.protocol import TextCodec  # noqa: E402
+
+
+class ExtendTextCodec:
+    """Karşılaştırma için önceki (extend + del) TextCodec.feed'in kopyası"""
+
+    def __init__(self, use_seq: bool = False):
+        self.sequenced = use_seq
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[Tuple[Optional[int], str]]:
+        buf = self._buffer
+        buf.extend(data)
+        out: List[Tuple[Optional[int], str]] = []
+        while True:
+            idx = buf.find(b'\n')
+            if idx < 0:
+                return out
+            line = buf[:idx].decode('utf-8', errors='ignore').strip()
+            del buf[:idx + 1]
+            seq = None
+            if self.sequenced and line.startswith('#'):
+                tag, _, line = line.partition(' ')
+                if tag[1:].isdigit():
+                    seq = int(tag[1:])
+                line = line.strip()
+            elif not line:
+                continue
+            out.append((seq, line))
+
+
+def synthetic_capture(count: int, seed: int = 1) -> bytes:
+    """Test_real.ino'nun sıra numaralı çıktısına benzeyen akış"""
+    rnd = random.Random(seed)
+    out = bytearray()
+    for i in range(count):
+        seq = i % 255 + 1
+        kind = rnd.random()
+        if kind < 0.4:
+            body = ",".join(f"A{a}:{rnd.randint(0, 1023)}" for a in range(6))
+        elif kind < 0.6:
+            body = "".join(f"D{p}:{rnd.randint(0, 1)}," for p in range(2, 20))
+        elif kind < 0.8:
+            body = f"PIN {rnd.randint(2, 13)} : {rnd.choice(('ON', 'OFF'))}"
+        else:
+            body = ""  # çıktısız komut onayı
+        out += (f"#{seq} {body}".rstrip() + "\r\n").encode()
+    return bytes(out)
+
+
+def run_codec(codec, stream: bytes, chunk: int) -> Tuple[float, int]:
+    t0 = time.perf_counter()
+    n = 0
+    for i in range(0, len(stream), chunk):
+        n += len(codec.feed(stream[i:i + chunk]))
+    return time.perf_counter() - t0, n
+
+
+class CapturedPort(io.RawIOBase):
+    """Kayıtlı akışı okutan port; readline() pyserial'deki gibi RawIOBase'den gelir"""
+
+    def __init__(self, stream: bytes):
+        self._view = memoryview(stream)
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self._view) - self._pos
+
+    def readinto(self, b) -> int:
+        n = min(len(b), self.in_waiting)
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+
+def run_readline(stream: bytes) -> Tuple[float, int]:
+    port = CapturedPort(stream)
+    t0 = time.perf_counter()
+    n = 0
+    while port.in_waiting:
+        line = port.readline().decode('utf-8', errors='ignore').strip()
+        if line:
+            n += 1
+    return time.perf_counter() - t0, n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=20000, help="sentetik akıştaki satır sayısı")
+    parser.add_argument("--chunk", type=int, default=64, help="tek read() ile gelen bayt sayısı")
+    parser.add_argument("--capture", help="ham bayt dökümü (sentetik akış yerine)")
+    args = parser.parse_args()
+
+    if args.capture:
+        with open(args.capture, "rb") as f:
+            stream = f.read()
+    else:
+        stream = synthetic_capture(args.lines)
+    print(f"akış: {len(stream)} bayt, parça: {args.chunk} bayt")
+
+    results = [
+        ("readline", run_readline(stream)),
+        ("extend", run_codec(ExtendTextCodec(use_seq=True), stream, args.chunk)),
+        ("split", run_codec(TextCodec(use_seq=True), stream, args.chunk)),
+    ]
+    for name, (elapsed, n) in results:
+        rate = n / elapsed if elapsed else float("inf")
+        print(f"{name:<9} satır={n:<7} süre={elapsed * 1000:8.1f} ms  {rate:12,.0f} satır/s  "
+              f"{elapsed * 1e6 / max(n, 1):6.2f} µs/satır")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""benchmarks.serial_latency
+pyserial'in ``loop://`` portu üzerinden komut gidiş-dönüş gecikmesini ölçer.
+
+Loopback port yazılan her satırı geri okuttuğu için her komut kendi "yanıtı"
+olur. Eski 5 ms uyku/poll döngüsü (``LegacySerialThread``) ile olay tabanlı
+``SerialThread`` aynı koşullarda karşılaştırılır.
+
+    python -m benchmarks.serial_latency [--count 500]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import queue
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import serial  # noqa: E402
+
+from core.serial_manager import OutgoingCommand, SerialThread  # noqa: E402
+
+
+class LegacySerialThread(threading.Thread):
+    """Karşılaştırma için eski sleep/poll döngüsünün birebir kopyası"""
+
+    def __init__(self, serial_port, send_queue, receive_queue):
+        super().__init__(daemon=True)
+        self.serial_port = serial_port
+        self.send_queue = send_queue
+        self.receive_queue = receive_queue
+        self.running = True
+        self._waiting_resp = False
+        self._last_send_ts = 0.0
+
+    def run(self):
+        while self.running:
+            if not self._waiting_resp:
+                try:
+                    message = self.send_queue.get_nowait()
+                    self.serial_port.write(message.encode('utf-8'))
+                    self.serial_port.flush()
+                    self._waiting_resp = True
+                    self._last_send_ts = time.time()
+                except queue.Empty:
+                    pass
+            if self.serial_port.in_waiting:
+                line = self.serial_port.readline().decode('utf-8', errors='ignore').strip()
+                if line:
+                    self.receive_queue.put(line)
+                    self._waiting_resp = False
+            if self._waiting_resp and (time.time() - self._last_send_ts) > 0.3:
+                self._waiting_resp = False
+            time.sleep(0.005)
+
+    def stop(self):
+        self.running = False
+
+
+def measure(thread_cls, count: int, wrap=str) -> list[float]:
+    """Her komut için gönderimden yanıta kadar geçen süreyi (ms) döndür"""
+    port = serial.serial_for_url("loop://", timeout=1)
+    send_q: queue.Queue = queue.Queue()
+    recv_q: queue.Queue = queue.Queue()
+    worker = thread_cls(port, send_q, recv_q)
+    worker.start()
+    samples = []
+    try:
+        for i in range(count):
+            t0 = time.perf_counter()
+            send_q.put(wrap(f"PWM 9,{i % 256}\n"))
+            recv_q.get(timeout=2)
+            samples.append((time.perf_counter() - t0) * 1000.0)
+    finally:
+        worker.stop()
+        worker.join(timeout=1)
+        port.close()
+    return samples
+
+
+def report(name: str, samples: list[float]):
+    ordered = sorted(samples)
+    p99 = ordered[int(len(ordered) * 0.99) - 1]
+    print(f"{name:<14} n={len(samples):<5} ort={statistics.mean(samples):7.3f} ms  "
+          f"medyan={statistics.median(samples):7.3f} ms  p99={p99:7.3f} ms  maks={ordered[-1]:7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=500, help="ölçülecek komut sayısı")
+    args = parser.parse_args()
+
+    report("önce (poll)", measure(LegacySerialThread, args.count))
+    report("sonra (olay)", measure(SerialThread, args.count, OutgoingCommand))
+
+
+if __name__ == "__main__":
+    main()
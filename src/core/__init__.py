@@ -1,3 +1,4 @@
 from .serial_manager import serial_manager, SerialManager
+from .async_serial_manager import AsyncSerialManager
 
-__all__ = ['serial_manager', 'SerialManager']
+__all__ = ['serial_manager', 'SerialManager', 'AsyncSerialManager']
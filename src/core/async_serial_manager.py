@@ -0,0 +1,354 @@
+"""core.async_serial_manager
+asyncio tabanlı serial yöneticisi.
+
+SerialManager'ın thread'li okuma/yazma döngüsü yerine portun dosya tanıtıcısı
+olay döngüsüne kaydedilir (loop.add_reader); böylece tek bir olay döngüsü,
+port başına thread açmadan birden çok kartı sürebilir. Ayrıştırma
+(core.protocol), çerçeveleme (TextCodec/BinaryCodec), sıra numaralı pencere
+(InflightWindow) ve istatistikler threaded sürümle aynıdır.
+
+Kullanım:
+    manager = AsyncSerialManager("/dev/ttyUSB0")
+    await manager.connect()
+    resp = await manager.request("ANA")
+    async for line in manager.lines():
+        ...
+
+fileno() desteklemeyen portlarda (Windows, loop:// vb.) okuma tek bir
+yardımcı thread'e düşer; gelen veri yine olay döngüsünde işlenir.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import AsyncIterator, Callable, List, Optional, Set
+
+import serial
+
+from core.protocol import BinaryCodec, RX_BUFFER_SIZE, Response, TextCodec, parse_response
+from core.serial_manager import InflightWindow, SerialThread
+from core.transport import boot_delay, open_transport
+from core.link_stats import LinkStats
+from core.send_queue import OutgoingCommand
+
+
+class AsyncSerialManager:
+    """Tek kart için asyncio uyumlu serial yöneticisi"""
+
+    # Threaded sürümle aynı yanıt zaman aşımı
+    RESPONSE_TIMEOUT = SerialThread.RESPONSE_TIMEOUT
+    # Port açıldıktan sonra Arduino'nun (reset sonrası) açılması için beklenen süre
+    BOOT_DELAY = 2.0
+
+    def __init__(self, port: Optional[str] = None, baudrate: int = 9600, window_size: int = 4):
+        self.port_name = port
+        self.baudrate = baudrate
+        self.window_size = window_size
+        self.prefer_binary = True
+        self.serial_port: Optional[serial.Serial] = None
+        self.is_connected = False
+        self.firmware_id: Optional[str] = None
+        self.firmware_caps: Set[str] = set()
+        self.protocol = "text"
+
+        self.codec = TextCodec()
+        self.link_stats = LinkStats()
+        self.window = InflightWindow(1, self.RESPONSE_TIMEOUT, False, self.link_stats)
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reader_thread: Optional[threading.Thread] = None
+        self._uses_fd = False
+        # lines() aboneleri
+        self._line_queues: List[asyncio.Queue] = []
+
+        # Callbacks (SerialManager ile aynı imza)
+        self.message_callbacks: List[Callable[[str, str], None]] = []
+        self.connection_callbacks: List[Callable[[bool], None]] = []
+
+        # Statistics
+        self.sent_count = 0
+        self.received_count = 0
+
+    # ----------------- Public API -----------------
+    async def connect(self, port: Optional[str] = None, baudrate: Optional[int] = None,
+                      test_connection: bool = True) -> bool:
+        """Portu aç, TEST/CAPS el sıkışmasını yap ve protokolü seç"""
+        if self.is_connected:
+            return True
+        if port:
+            self.port_name = port
+        if baudrate:
+            self.baudrate = baudrate
+        self._loop = asyncio.get_running_loop()
+        try:
+            # timeout=0: read() bloklamaz, yalnızca hazır baytları döndürür
+            self.serial_port = open_transport(self.port_name, self.baudrate, timeout=0)
+        except Exception:
+            return False
+
+        self._set_codec(TextCodec(), 1)
+        self.is_connected = True
+        self._start_reader()
+        if test_connection:
+            await asyncio.sleep(min(self.BOOT_DELAY, boot_delay(self.serial_port)))
+            self.serial_port.reset_input_buffer()
+            if not await self._handshake():
+                self._close(ConnectionError("TEST yanıtı alınamadı"), notify=False)
+                return False
+        self._notify_connection_callbacks(True)
+        return True
+
+    async def disconnect(self):
+        """Bağlantıyı kapat; bekleyen istekler ConnectionError ile biter"""
+        self._close(ConnectionError("Serial bağlantısı kapatıldı"))
+
+    async def send(self, message: str) -> bool:
+        """Yanıt beklemeden komut gönder (pencerede yer açılana kadar bekler)"""
+        if not self.is_connected or not self.codec.fits(message.strip()):
+            return False
+        future = await self._submit(message.strip(), None)
+        # Zaman aşımı/iptal hatası kimse beklemediği için burada tüketilir
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        return True
+
+    async def request(self, message: str, timeout: float = 1.0) -> Response:
+        """Komut gönder ve ayrıştırılmış yanıtı (core.protocol.Response) döndür.
+        Yanıt gelmezse TimeoutError, bağlantı koparsa ConnectionError, ikili
+        çerçevesi RX tamponuna sığmazsa ValueError fırlatır.
+        """
+        if not self.is_connected:
+            raise ConnectionError("Serial bağlantısı yok")
+        if not self.codec.fits(message.strip()):
+            raise ValueError(f"Komut firmware RX tamponuna ({RX_BUFFER_SIZE} bayt) sığmıyor")
+        # Bekleyen görev iptal edilirse Future da iptal edilir ve pencere yeri boşalır
+        return await (await self._submit(message.strip(), timeout))
+
+    async def lines(self) -> AsyncIterator[str]:
+        """Gelen tüm satırları sırayla veren akış; bağlantı kapanınca biter"""
+        lines: asyncio.Queue = asyncio.Queue()
+        self._line_queues.append(lines)
+        try:
+            while True:
+                line = await lines.get()
+                if line is None:
+                    return
+                yield line
+        finally:
+            if lines in self._line_queues:
+                self._line_queues.remove(lines)
+
+    def add_message_callback(self, callback: Callable[[str, str], None]):
+        """Mesaj alındığında çağrılacak callback ekle"""
+        if callback not in self.message_callbacks:
+            self.message_callbacks.append(callback)
+
+    def remove_message_callback(self, callback: Callable[[str, str], None]):
+        """Mesaj callback'ini kaldır"""
+        if callback in self.message_callbacks:
+            self.message_callbacks.remove(callback)
+
+    def add_connection_callback(self, callback: Callable[[bool], None]):
+        """Bağlantı durumu değiştiğinde çağrılacak callback ekle"""
+        if callback not in self.connection_callbacks:
+            self.connection_callbacks.append(callback)
+
+    def remove_connection_callback(self, callback: Callable[[bool], None]):
+        """Bağlantı callback'ini kaldır"""
+        if callback in self.connection_callbacks:
+            self.connection_callbacks.remove(callback)
+
+    def get_stats(self) -> dict:
+        """İstatistikleri döndür (SerialManager.get_stats ile ortak anahtarlar)"""
+        return {
+            'sent_count': self.sent_count,
+            'received_count': self.received_count,
+            'is_connected': self.is_connected,
+            'port_name': self.port_name,
+            'baudrate': self.baudrate,
+            'firmware_id': self.firmware_id,
+            'protocol': self.protocol,
+            'in_flight': self.window.in_flight,
+            **self.link_stats.snapshot(self.baudrate if self.is_connected else None)
+        }
+
+    # ----------------- Internal -----------------
+    async def _handshake(self) -> bool:
+        """TEST -> CAPS -> (SEQ / PROTO BIN) sırasıyla protokolü belirle"""
+        # Açılış mesajları (ör. HIL_REAL_READY) TEST yanıtı sanılmasın
+        for _ in range(3):
+            try:
+                if (await self.request("TEST", 1.0)).kind == "test":
+                    break
+            except TimeoutError:
+                pass
+        else:
+            return False
+
+        self.firmware_id = None
+        self.firmware_caps = set()
+        self.protocol = "text"
+        try:
+            reply = await self.request("CAPS", 0.5)
+        except TimeoutError:
+            return True  # Eski firmware: etiketsiz stop-and-wait
+        if reply.kind != "caps":
+            return True
+        self.firmware_id = reply.data["firmware"]
+        self.firmware_caps = {c.upper() for c in reply.data["caps"]}
+
+        if "SEQ" in self.firmware_caps:
+            self._set_codec(TextCodec(use_seq=True), self.window_size)
+        if self.prefer_binary and "BIN" in self.firmware_caps:
+            await self._negotiate_binary()
+        return True
+
+    async def _negotiate_binary(self):
+        """İkili çerçeveli moda geç ve bir TEST çerçevesiyle doğrula"""
+        try:
+            if (await self.request("PROTO BIN", 0.5)).line != "PROTO BIN":
+                return
+        except TimeoutError:
+            return
+        text_codec = self.codec
+        self._set_codec(BinaryCodec(), self.window_size)
+        try:
+            if (await self.request("TEST", 0.5)).kind == "test":
+                self.protocol = "binary"
+                return
+        except TimeoutError:
+            pass
+        # Doğrulama başarısız: firmware'i metin moduna geri al
+        self._write(self.codec.encode("PROTO TEXT"))
+        self._set_codec(text_codec, self.window_size if text_codec.sequenced else 1)
+
+    def _set_codec(self, codec, window_size: int):
+        """Çerçevelemeyi değiştir (yalnızca hatta bekleyen komut yokken)"""
+        self.codec = codec
+        self.window.size = max(1, window_size if codec.sequenced else 1)
+        self.window.use_seq = codec.sequenced
+        self._slots = asyncio.Semaphore(self.window.size)
+
+    async def _submit(self, text: str, timeout: Optional[float]) -> asyncio.Future:
+        """Pencerede yer ayır, komutu yaz ve yanıt Future'ını döndür"""
+        command = OutgoingCommand(text)
+        await self._slots.acquire()
+        slots = self._slots
+        future = self._loop.create_future()
+        seq = self.window.acquire(lambda: True, future, timeout, command)
+
+        def _done(_f, seq=seq):
+            # Yanıt, zaman aşımı veya iptal: pencere yerini bırak
+            self.window.discard(seq)
+            slots.release()
+        future.add_done_callback(_done)
+
+        try:
+            self._write(self.codec.encode(text + '\n', seq))
+        except Exception as e:
+            future.set_exception(ConnectionError(str(e)))
+            self._fail(e)
+            return future
+        self.sent_count += 1
+        self._notify_message_callbacks("Gönderilen", text)
+        self._loop.call_later(max(self.RESPONSE_TIMEOUT, timeout or 0.0) + 0.001, self.window.expire)
+        return future
+
+    def _write(self, data: bytes):
+        # flush() (tcdrain) olay döngüsünü hat boşalana kadar bloklayacağı için çağrılmaz
+        self.serial_port.write(data)
+        self.link_stats.on_tx(len(data))
+
+    def _start_reader(self):
+        try:
+            fd = self.serial_port.fileno()
+            self._loop.add_reader(fd, self._on_readable)
+            self._uses_fd = True
+        except (AttributeError, NotImplementedError, OSError, ValueError):
+            # fileno yok ya da döngü add_reader desteklemiyor (ör. Proactor)
+            self._uses_fd = False
+            self.serial_port.timeout = SerialThread.READ_TIMEOUT
+            self._reader_thread = threading.Thread(target=self._read_thread, daemon=True,
+                                                   name="AsyncSerialReader")
+            self._reader_thread.start()
+
+    def _on_readable(self):
+        try:
+            data = self.serial_port.read(self.serial_port.in_waiting or 1)
+        except Exception as e:
+            self._fail(e)
+            return
+        if data:
+            self._on_data(data)
+
+    def _read_thread(self):
+        port = self.serial_port
+        loop = self._loop
+        while self.is_connected and port is self.serial_port:
+            try:
+                data = port.read(port.in_waiting or 1)
+            except Exception as e:
+                if self.is_connected:
+                    loop.call_soon_threadsafe(self._fail, e)
+                return
+            if data:
+                loop.call_soon_threadsafe(self._on_data, data)
+
+    def _on_data(self, data: bytes):
+        self.link_stats.on_rx(len(data))
+        for seq, line in self.codec.feed(data):
+            # Sıra numaralı modda etiketsiz satırlar kendiliğinden gelen mesajlardır
+            if seq is None and self.codec.sequenced:
+                matched, future = False, None
+            else:
+                matched, future = self.window.release(seq)
+            if matched and future is not None and not future.done():
+                future.set_result(parse_response(line))
+            if line:
+                self.received_count += 1
+                self._notify_message_callbacks("Alınan", line)
+                for lines in self._line_queues:
+                    lines.put_nowait(line)
+
+    def _fail(self, error: Exception):
+        if self.is_connected:
+            self._close(ConnectionError("Serial bağlantısı koptu"))
+
+    def _close(self, error: BaseException, notify: bool = True):
+        was_connected = self.is_connected
+        self.is_connected = False
+        port, self.serial_port = self.serial_port, None
+        if port is not None:
+            if self._uses_fd:
+                try:
+                    self._loop.remove_reader(port.fileno())
+                except Exception:
+                    pass
+            else:
+                try:
+                    port.cancel_read()
+                except Exception:
+                    pass
+            try:
+                port.close()
+            except Exception:
+                pass
+        self.window.cancel_all(error)
+        for lines in self._line_queues:
+            lines.put_nowait(None)
+        if was_connected and notify:
+            self._notify_connection_callbacks(False)
+
+    def _notify_message_callbacks(self, source: str, message: str):
+        for callback in self.message_callbacks[:]:
+            try:
+                callback(source, message)
+            except Exception as e:
+                print(f"Message callback error: {e}")
+
+    def _notify_connection_callbacks(self, connected: bool):
+        for callback in self.connection_callbacks[:]:
+            try:
+                callback(connected)
+            except Exception as e:
+                print(f"Connection callback error: {e}")
+
@@ -0,0 +1,116 @@
+"""core.device_registry
+Birden çok Arduino'yu aynı süreçte sürmek için cihaz kayıt defteri.
+Her kart kendi SerialManager / MessageRouter / PinManager üçlüsüne sahiptir
+(ayrı gönderim kuyruğu, I/O thread'i, istatistikler ve pin durumu).
+Cihazlar ada göre ya da USB parmak izine göre bulunur.
+
+"default" cihazı uygulama genelindeki global örneklerdir
+(serial_manager, message_router, pin_manager); mevcut kod değişmeden çalışır.
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from core.serial_manager import SerialManager, serial_manager
+from core.message_router import MessageRouter, message_router
+from core.pin_manager import PinManager, pin_manager
+
+DEFAULT_DEVICE = "default"
+
+
+@dataclass
+class DeviceStack:
+    """Tek karta ait haberleşme yığını"""
+    name: str
+    serial: SerialManager
+    router: MessageRouter
+    pins: PinManager
+
+    @property
+    def is_connected(self) -> bool:
+        return self.serial.is_connected
+
+
+class DeviceRegistry:
+    _instance: 'DeviceRegistry' | None = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if hasattr(self, "_initialized"):
+            return
+        self._initialized = True
+        self._lock = threading.Lock()
+        self._devices: Dict[str, DeviceStack] = {
+            DEFAULT_DEVICE: DeviceStack(DEFAULT_DEVICE, serial_manager, message_router, pin_manager)
+        }
+
+    # ----------------- Public API -----------------
+    def create(self, name: str, fingerprint: Optional[dict] = None) -> DeviceStack:
+        """Ada ait yığını döndür; yoksa yeni bir yığın oluştur.
+        fingerprint verilirse (vid, pid, serial_number, location) yeni yönetici
+        find_arduino_port() içinde önce bu cihazı arar.
+        """
+        with self._lock:
+            stack = self._devices.get(name)
+            if stack is None:
+                serial = SerialManager(name=name)
+                router = MessageRouter(serial)
+                stack = DeviceStack(name, serial, router, PinManager(serial, router))
+                self._devices[name] = stack
+        if fingerprint:
+            stack.serial.last_device = dict(fingerprint)
+        return stack
+
+    def get(self, name: str = DEFAULT_DEVICE) -> Optional[DeviceStack]:
+        return self._devices.get(name)
+
+    def find_by_fingerprint(self, fingerprint: dict) -> Optional[DeviceStack]:
+        """USB parmak izi kayıtlı cihazla eşleşen yığını döndür"""
+        for stack in list(self._devices.values()):
+            if SerialManager._fingerprint_matches(stack.serial.last_device, fingerprint):
+                return stack
+        return None
+
+    def find_by_port(self, port: str) -> Optional[DeviceStack]:
+        for stack in list(self._devices.values()):
+            if stack.serial.is_connected and stack.serial.port_name == port:
+                return stack
+        return None
+
+    def names(self) -> List[str]:
+        return list(self._devices)
+
+    def devices(self) -> List[DeviceStack]:
+        return list(self._devices.values())
+
+    def remove(self, name: str):
+        """Cihazı kayıttan çıkar ve yığınını tamamen kapat: bağlantı, dağıtıcı
+        ve queued dinleyici thread'leri, abonelikler (varsayılan cihaz silinmez)
+        """
+        if name == DEFAULT_DEVICE:
+            return
+        with self._lock:
+            stack = self._devices.pop(name, None)
+        if stack:
+            stack.pins.close()
+            stack.router.close()
+            stack.serial.shutdown()
+
+    def disconnect_all(self):
+        for stack in self.devices():
+            if stack.serial.is_connected:
+                stack.serial.disconnect()
+
+    def get_stats(self) -> Dict[str, dict]:
+        """Cihaz adı -> SerialManager.get_stats()"""
+        return {stack.name: stack.serial.get_stats() for stack in self.devices()}
+
+
+# Global instance
+device_registry = DeviceRegistry()
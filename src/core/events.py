@@ -0,0 +1,202 @@
+"""core.events
+MessageRouter ve PinManager'ın yayınladığı olay nesneleri ve dinleyici tabloları.
+
+Olaylar __slots__ kullanan küçük sınıflardır: dict'e göre daha az bellek
+tutar ve alan erişimi daha hızlıdır. Eski dinleyiciler bozulmasın diye
+dict gibi de okunabilirler:
+
+    data["pin"], data.get("entries", ()), "values" in data, dict(data)
+
+Olay, yalnızca o tipe abone olan bir dinleyici varsa oluşturulur. Her
+dinleyici çağrısı yeni bir nesne alır; dinleyici olayı saklayabilir ya da
+başka bir thread'e (Tk kuyruğu) verebilir.
+
+ListenerTable bir olay tipinin dinleyicilerini tutar: tüm pinleri dinleyenler
+bir listede, add_listener(..., pins={2, 5, "A0"}) ile kaydolanlar pin
+indeksli bir dict'te. Pin olayının dağıtımı yalnızca o pine ilgi duyan
+dinleyicileri dolaşır. Listeler tuple olarak tutulur ve ekleme/silmede
+yenisiyle değiştirilir; dağıtım kopya almadan dolaşır, çağrı sırasında
+kendini kaldıran dinleyici sıradakini atlatmaz.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, TypeVar, Union
+
+from core.protocol import ANALOG_PIN_BASE, pin_label, pin_number
+
+E = TypeVar("E", bound="Event")
+
+
+class Event:
+    """Alanları __slots__ ile tanımlanan, dict gibi okunabilen olay tabanı"""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__slots__
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.__slots__
+
+    def copy(self: E) -> E:
+        return type(self)(*(getattr(self, name) for name in self.__slots__))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Event):
+            return type(self) is type(other) and all(
+                getattr(self, n) == getattr(other, n) for n in self.__slots__)
+        if isinstance(other, dict):
+            return dict(self) == other
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class PinState(Event):
+    """pin_state: dijital/PWM pinin değeri"""
+
+    __slots__ = ("pin", "value")
+
+    def __init__(self, pin: int, value: int):
+        self.pin = pin
+        self.value = value
+
+
+class AnalogValue(Event):
+    """analog_value: 'A0'..'A5' okuması"""
+
+    __slots__ = ("pin", "value")
+
+    def __init__(self, pin: str, value: int):
+        self.pin = pin
+        self.value = value
+
+
+class DigitalSnapshot(Event):
+    """digital_snapshot: bir DIG satırındaki tüm girişler.
+    changed: önceki snapshot'tan farklı (ya da ilk kez okunan) pinler, mask: aynı kümenin bitleri
+    """
+
+    __slots__ = ("values", "changed", "mask")
+
+    def __init__(self, values: Dict[int, int], changed: Tuple[int, ...] = (), mask: int = 0):
+        self.values = values
+        self.changed = changed
+        self.mask = mask
+
+
+class AnalogSnapshot(Event):
+    """analog_snapshot: bir ANA satırındaki tüm analog okumalar (changed/mask DigitalSnapshot gibi)"""
+
+    __slots__ = ("values", "changed", "mask")
+
+    def __init__(self, values: Dict[str, int], changed: Tuple[str, ...] = (), mask: int = 0):
+        self.values = values
+        self.changed = changed
+        self.mask = mask
+
+
+class Stat(Event):
+    """stat: (pin, durum, mod) üçlüleri"""
+
+    __slots__ = ("entries",)
+
+    def __init__(self, entries: List[Tuple[int, int, int]]):
+        self.entries = entries
+
+
+class RawLine(Event):
+    """raw: alınan ham satır"""
+
+    __slots__ = ("line",)
+
+    def __init__(self, line: str):
+        self.line = line
+
+
+# Analog pin adı -> snapshot maskesindeki bit (A0 = pin 14)
+_ANALOG_BITS = {f"A{i}": 1 << (ANALOG_PIN_BASE + i) for i in range(6)}
+
+
+def digital_mask(pins: Iterable[int]) -> int:
+    """Pin numaralarının bit maskesi (bit = Arduino pin numarası)"""
+    mask = 0
+    for pin in pins:
+        mask |= 1 << pin
+    return mask
+
+
+def analog_mask(names: Iterable[str]) -> int:
+    """Analog pin adlarının bit maskesi ("A0" = bit 14)"""
+    mask = 0
+    for name in names:
+        mask |= _ANALOG_BITS.get(name, 0)
+    return mask
+
+
+# Pin indeksli abonelik kabul eden olay tipleri ve anahtar biçimleri
+PIN_EVENTS = ("pin_state", "analog_value")
+
+
+def pin_keys(event_type: str, pins: Iterable[Union[int, str]]) -> Set[Union[int, str]]:
+    """Kullanıcının verdiği pinleri olaydaki 'pin' alanının biçimine çevir:
+    pin_state için numara ("A0" -> 14), analog_value için ad (14 -> "A0").
+    """
+    if event_type not in PIN_EVENTS:
+        raise ValueError(f"pins yalnızca {', '.join(PIN_EVENTS)} olayları için kullanılabilir")
+    if event_type == "analog_value":
+        return {pin_label(p) if isinstance(p, int) else p.strip().upper() for p in pins}
+    return {pin_number(p) if isinstance(p, str) else p for p in pins}
+
+
+class ListenerTable:
+    """Bir olay tipinin dinleyicileri: tüm pinler (all) + pin indeksli (by_pin).
+    Değişiklikler yeni tuple'larla yapılır (copy-on-write).
+    """
+
+    __slots__ = ("all", "by_pin")
+
+    def __init__(self):
+        self.all: Tuple[Callable[[Event], None], ...] = ()
+        self.by_pin: Dict[Union[int, str], Tuple[Callable[[Event], None], ...]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.all or self.by_pin)
+
+    def add(self, callback: Callable[[Event], None], pins: Optional[Iterable[Union[int, str]]] = None):
+        if pins is None:
+            self.all += (callback,)
+            return
+        for pin in pins:
+            self.by_pin[pin] = self.by_pin.get(pin, ()) + (callback,)
+
+    def remove(self, callback: Callable[[Event], None]):
+        """callback'in tüm kayıtlarını (pin bazlı olanlar dahil) sil"""
+        self.all = _without(self.all, callback)
+        for pin in [p for p, cbs in self.by_pin.items() if callback in cbs]:
+            cbs = _without(self.by_pin[pin], callback)
+            if cbs:
+                self.by_pin[pin] = cbs
+            else:
+                del self.by_pin[pin]
+
+
+def _without(callbacks: tuple, callback: Callable[[Event], None]) -> tuple:
+    """callback'in ilk kaydı çıkarılmış tuple (yoksa aynısı)"""
+    if callback not in callbacks:
+        return callbacks
+    i = callbacks.index(callback)
+    return callbacks[:i] + callbacks[i + 1:]
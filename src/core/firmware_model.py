@@ -0,0 +1,335 @@
+"""core.firmware_model
+Test_real.ino'nun (LCD hariç) Python modeli.
+
+Donanım olmadan SerialManager'ı uçtan uca çalıştırmak için kullanılır:
+core.transport içindeki "sim://" ve "pty://sim" taşıyıcıları host'un
+yazdığı baytları feed()'e verir ve dönen baytları host'a okutur.
+Metin protokolü (#seq etiketleri dahil), CAPS/BAUD/PROTO pazarlığı, toplu
+MODES/WRITE komutları ve COBS+CRC8 ikili çerçeveler firmware ile birebir
+aynı yanıtları üretir.
+
+    model = FirmwareModel()
+    model.analog_values[0] = 512       # analogRead(A0)
+    model.input_levels[7] = 1          # digitalRead(7)
+    model.feed(b"TEST\\n")              # -> b"1\\r\\n"
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Iterable, List, Optional
+
+from core.protocol import (
+    OP_ALL, OP_ANA, OP_DIG, OP_DWRITE, OP_MODE, OP_MODES, OP_PWM, OP_STAT, OP_TEST, OP_TEXT, OP_WRITE,
+    OP_R_ACK, OP_R_ALL, OP_R_ANA, OP_R_BATCH, OP_R_DIG, OP_R_DIGITAL, OP_R_MODE, OP_R_PWM, OP_R_STAT,
+    OP_R_TEXT, RX_BUFFER_SIZE, cobs_decode, cobs_encode, crc8, pin_label,
+)
+
+PWM_PINS = (3, 5, 6, 9, 10, 11)
+BAUD_RATES = (9600, 115200, 250000, 1000000)
+# Bu hızın üstünde loop() gelen patlamayı okuyamadan RX tamponu dolar
+RX_DRAIN_BAUD = 115200
+# Yeni hızda bu süre içinde TEST gelmezse önceki hıza dönülür (BAUD_CONFIRM_MS)
+BAUD_CONFIRM_S = 1.0
+
+
+def _to_int(text: str) -> int:
+    """Arduino String.toInt() gibi: baştaki tamsayıyı al, yoksa 0"""
+    text = text.strip()
+    end = 1 if text[:1] in ("-", "+") else 0
+    while end < len(text) and text[end].isdigit():
+        end += 1
+    try:
+        return int(text[:end])
+    except ValueError:
+        return 0
+
+
+class FirmwareModel:
+    """Test_real.ino ile aynı komutları işleyen yazılım kartı"""
+
+    FIRMWARE_ID = "FNSS_TEST/5"
+    CAPS = ("SEQ", "BIN", "BATCH", "BAUD")
+
+    def __init__(self, caps: Optional[Iterable[str]] = None, legacy: bool = False):
+        # legacy=True: CAPS/#seq/PROTO bilmeyen eski firmware
+        self.legacy = legacy
+        self.caps = tuple(caps) if caps is not None else self.CAPS
+        self.analog_values: List[int] = [0] * 6
+        self.input_levels: List[int] = [0] * 20
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Kart resetlendi: setup() sonrası duruma dön"""
+        # setup(): 2..19 arası tüm pinler OUTPUT ve LOW
+        self.pin_modes: List[int] = [0, 0] + [1] * 18
+        self.pin_states: List[int] = [0] * 20
+        self.bin_mode = False
+        self.baudrate = BAUD_RATES[0]
+        # Onay bekleyen hız değişimi: (önceki hız, son tarih) ya da None
+        self._baud_pending = None
+        self.command_count = 0
+        self.rx_overflow_bytes = 0
+        self._rx = bytearray()
+        self._out = bytearray()
+        self._seq = -1
+        self._tag_sent = False
+
+    # ----------------- Public API -----------------
+    def uart_baudrate(self) -> int:
+        """UART'ın o anki hızı; süresi dolan onaysız hız değişimini geri alır"""
+        with self.lock:
+            if self._baud_pending is not None and time.monotonic() > self._baud_pending[1]:
+                self.baudrate = self._baud_pending[0]
+                self._baud_pending = None
+            return self.baudrate
+
+    def feed(self, data: bytes) -> bytes:
+        """Host'tan gelen baytları işle, kartın gönderdiği baytları döndür.
+        Tek çağrı tek yazma patlamasıdır: yüksek hızda RX_BUFFER_SIZE'ı aşan
+        kısmı kaybolur (rx_overflow_bytes).
+        """
+        self.uart_baudrate()
+        with self.lock:
+            if self.baudrate > RX_DRAIN_BAUD and len(data) > RX_BUFFER_SIZE:
+                self.rx_overflow_bytes += len(data) - RX_BUFFER_SIZE
+                data = data[:RX_BUFFER_SIZE]
+            self._rx += data
+            while True:
+                sep = b'\x00' if self.bin_mode else b'\n'
+                idx = self._rx.find(sep)
+                if idx < 0:
+                    break
+                chunk = bytes(self._rx[:idx])
+                del self._rx[:idx + 1]
+                if self.bin_mode:
+                    if len(chunk) <= RX_BUFFER_SIZE:  # Sığmayan çerçeve rxOverflow ile atılır
+                        self._handle_frame(chunk)
+                else:
+                    self._handle_line(chunk.decode('utf-8', errors='ignore'))
+            out = bytes(self._out)
+            self._out.clear()
+            return out
+
+    # ----------------- Metin protokolü -----------------
+    def _handle_line(self, cmd: str):
+        cmd = cmd.strip()
+        self._seq = -1
+        self._tag_sent = False
+        if cmd.startswith('#') and not self.legacy:
+            sp = cmd.find(' ')
+            if sp < 0:
+                self._seq, cmd = _to_int(cmd[1:]), ""
+            else:
+                self._seq, cmd = _to_int(cmd[1:sp]), cmd[sp + 1:].strip()
+        self.command_count += 1
+        self._handle_command(cmd)
+        self._reply_ack()
+
+    def _handle_command(self, cmd: str):
+        has = (lambda cap: not self.legacy and cap in self.caps)
+        if cmd == "TEST":
+            self._baud_pending = None  # Yeni hızda ilk TEST hızı onaylar
+            self._reply("1")
+        elif cmd == "CAPS" and not self.legacy:
+            self._reply(" ".join(("CAPS", self.FIRMWARE_ID) + self.caps))
+        elif cmd.startswith("BAUD ") and has("BAUD"):
+            rate = _to_int(cmd[5:])
+            if rate not in BAUD_RATES:
+                self._reply("BAUD ERR")
+                return
+            self._reply(f"BAUD OK {rate}")
+            self._baud_pending = (self.baudrate, time.monotonic() + BAUD_CONFIRM_S)
+            self.baudrate = rate
+        elif cmd == "PROTO BIN" and has("BIN"):
+            self._reply("PROTO BIN")
+            self.bin_mode = True
+        elif cmd == "PROTO TEXT" and not self.legacy:
+            self._reply("PROTO TEXT")
+            self.bin_mode = False
+        elif cmd.startswith("MODES ") and has("BATCH"):
+            self._batch_text(0, cmd[6:])
+        elif cmd.startswith("WRITE ") and has("BATCH"):
+            self._batch_text(1, cmd[6:])
+        elif cmd.startswith("MODE "):
+            c = cmd.find(',')
+            if c <= 5:
+                return
+            val = cmd[c + 1:].strip().upper()
+            if val in ("2", "PAS", "PASS", "PASIF"):
+                mode = 2
+            else:
+                mode = 1 if val in ("1", "OUT", "OUTPUT") else 0
+            self._do_mode(_to_int(cmd[5:c]), mode)
+        elif cmd.find(',') > 0 and cmd[:1].isdigit():
+            c = cmd.find(',')
+            self._do_digital(_to_int(cmd[:c]), _to_int(cmd[c + 1:]))
+        elif cmd.startswith("PWM "):
+            c = cmd.find(',')
+            if c > 4:
+                self._do_pwm(_to_int(cmd[4:c]), _to_int(cmd[c + 1:]))
+        elif cmd.startswith("ALL "):
+            self._do_all(_to_int(cmd[4:]))
+        elif cmd == "STAT":
+            self._send_stat()
+        elif cmd == "DIG":
+            self._send_dig()
+        elif cmd == "ANA":
+            self._send_ana()
+
+    def _batch_text(self, kind: int, body: str):
+        count = 0
+        for ent in body.split(','):
+            pin, sep, val = ent.partition(':')
+            if sep and pin:
+                apply = self._apply_mode if kind == 0 else self._apply_write
+                if apply(_to_int(pin), _to_int(val)):
+                    count += 1
+        self._reply_batch(kind, count)
+
+    # ----------------- İkili protokol -----------------
+    def _handle_frame(self, raw: bytes):
+        try:
+            f = cobs_decode(raw)
+        except ValueError:
+            return
+        if len(f) < 3 or crc8(f[:-1]) != f[-1]:
+            return  # Bozuk çerçeve sessizce atılır
+        op, p = f[0], f[2:-1]
+        self._seq = f[1] if f[1] else -1
+        self._tag_sent = False
+        self.command_count += 1
+        if op == OP_TEST:
+            self._baud_pending = None
+            self._reply("1")
+        elif op == OP_MODE and len(p) >= 2:
+            self._do_mode(p[0], p[1])
+        elif op == OP_DWRITE and len(p) >= 2:
+            self._do_digital(p[0], p[1])
+        elif op == OP_PWM and len(p) >= 2:
+            self._do_pwm(p[0], p[1])
+        elif op == OP_ALL and len(p) >= 1:
+            self._do_all(p[0])
+        elif op == OP_STAT:
+            self._send_stat()
+        elif op == OP_DIG:
+            self._send_dig()
+        elif op == OP_ANA:
+            self._send_ana()
+        elif op in (OP_MODES, OP_WRITE):
+            apply = self._apply_mode if op == OP_MODES else self._apply_write
+            count = sum(1 for i in range(0, len(p) - 1, 2) if apply(p[i], p[i + 1]))
+            self._reply_batch(0 if op == OP_MODES else 1, count)
+        elif op == OP_TEXT:
+            self._handle_command(p.decode('utf-8', errors='ignore').strip())
+        self._reply_ack()
+
+    def _frame(self, op: int, payload: bytes = b""):
+        frame = bytes((op, 0 if self._seq < 0 else self._seq & 0xFF)) + payload
+        self._out += cobs_encode(frame + bytes((crc8(frame),))) + b'\x00'
+        self._tag_sent = True
+
+    # ----------------- Yanıt yardımcıları -----------------
+    def _reply_begin(self):
+        if self._seq >= 0 and not self._tag_sent:
+            self._out += f"#{self._seq} ".encode()
+        self._tag_sent = True
+
+    def _reply(self, text: str):
+        if self.bin_mode:
+            self._frame(OP_R_TEXT, text.encode('utf-8'))
+            return
+        self._reply_begin()
+        self._out += text.encode('utf-8') + b"\r\n"
+
+    def _reply_ack(self):
+        if self._seq < 0 or self._tag_sent:
+            return
+        if self.bin_mode:
+            self._frame(OP_R_ACK)
+            return
+        self._out += f"#{self._seq}\r\n".encode()
+
+    def _reply_batch(self, kind: int, count: int):
+        if self.bin_mode:
+            self._frame(OP_R_BATCH, bytes((kind, count & 0xFF)))
+        else:
+            self._reply(f"{'MODES' if kind == 0 else 'WRITE'} OK {count}")
+
+    # ----------------- Pin işlemleri -----------------
+    def _apply_mode(self, pin: int, mode: int) -> bool:
+        if pin < 2 or pin > 19:
+            return False
+        self.pin_modes[pin] = mode if 0 <= mode <= 2 else 0
+        return True
+
+    def _apply_write(self, pin: int, value: int) -> bool:
+        if not (2 <= pin <= 19 and self.pin_modes[pin]):
+            return False
+        self.pin_states[pin] = value if pin in PWM_PINS else (1 if value else 0)
+        return True
+
+    def _do_mode(self, pin: int, mode: int):
+        if not self._apply_mode(pin, mode):
+            return
+        mode = self.pin_modes[pin]
+        if self.bin_mode:
+            self._frame(OP_R_MODE, bytes((pin, mode)))
+        else:
+            self._reply(f"PIN {pin_label(pin)}:{('IN', 'OUT', 'PAS')[mode]}")
+
+    def _do_digital(self, pin: int, state: int):
+        if not (2 <= pin <= 19 and self.pin_modes[pin]):
+            return
+        self.pin_states[pin] = state
+        if self.bin_mode:
+            self._frame(OP_R_DIGITAL, bytes((pin, 1 if state else 0)))
+        else:
+            self._reply(f"PIN {pin_label(pin)} : {'ON' if state else 'OFF'}")
+
+    def _do_pwm(self, pin: int, value: int):
+        if not (pin in PWM_PINS and self.pin_modes[pin]):
+            return
+        self.pin_states[pin] = value
+        if self.bin_mode:
+            self._frame(OP_R_PWM, bytes((pin, value & 0xFF)))
+        else:
+            self._reply(f"PIN {pin_label(pin)} : {value}")
+
+    def _do_all(self, state: int):
+        for pin in range(2, 20):
+            if not self.pin_modes[pin]:
+                continue
+            if pin in PWM_PINS:
+                self.pin_states[pin] = 255 if state else 0
+            else:
+                self.pin_states[pin] = 1 if state else 0
+        if self.bin_mode:
+            self._frame(OP_R_ALL, bytes((1 if state else 0,)))
+        else:
+            self._reply(f"PIN ALL: {'ON' if state else 'OFF'}")
+
+    def _send_stat(self):
+        if self.bin_mode:
+            payload = bytearray()
+            for pin in range(2, 20):
+                payload += bytes((self.pin_states[pin] & 0xFF, self.pin_modes[pin]))
+            self._frame(OP_R_STAT, bytes(payload))
+            return
+        self._reply(",".join(f"{pin_label(p)}:{self.pin_states[p]}:{self.pin_modes[p]}" for p in range(2, 20)))
+
+    def _send_dig(self):
+        inputs = [p for p in range(2, 20) if not self.pin_modes[p]]
+        if self.bin_mode:
+            mask = sum(1 << p for p in inputs)
+            values = sum(1 << p for p in inputs if self.input_levels[p])
+            self._frame(OP_R_DIG, mask.to_bytes(3, 'little') + values.to_bytes(3, 'little'))
+            return
+        self._reply("".join(f"D{p}:{1 if self.input_levels[p] else 0}," for p in inputs))
+
+    def _send_ana(self):
+        if self.bin_mode:
+            self._frame(OP_R_ANA, b"".join((v & 0xFFFF).to_bytes(2, 'little') for v in self.analog_values))
+            return
+        self._reply(",".join(f"A{i}:{v}" for i, v in enumerate(self.analog_values)))
@@ -0,0 +1,245 @@
+"""core.link_stats
+Seri hat istatistikleri: komut türü başına gecikme histogramları,
+yön başına bayt hızı, zaman aşımları ve hat doluluğu.
+
+Her komut için üç süre ölçülür (mikrosaniye):
+    queue : kuyruğa girişten hatta yazılana kadar (pencere beklemesi dahil)
+    wire  : hatta yazılmasından yanıtın gelmesine kadar
+    total : kuyruğa girişten yanıta kadar
+
+Histogramlar HDR tarzıdır: her ikinin kuvveti aralığı 32 alt kovaya bölünür
+(~%3 çözünürlük), kovalar seyrek bir dict'te tutulur. Kayıt O(1)'dir;
+snapshot() yalnızca dolu kovaları kopyalar, yüzdelikler snapshot üzerinde
+hesaplanır.
+
+    stats = serial_manager.stats_snapshot()
+    stats['latency']['ANA']['total']['p99_us']
+    stats['rx_bytes_per_s'], stats['link_utilization']
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Her ikinin kuvveti aralığındaki alt kova sayısı (2^5 = 32)
+SUB_BUCKET_BITS = 5
+_SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+_LINEAR_LIMIT = _SUB_BUCKETS * 2
+
+# 8N1: bayt başına başlangıç + 8 veri + bitiş biti
+BITS_PER_BYTE = 10
+
+COMMAND_KINDS = ("MODE", "PWM", "DIGITAL", "ALL", "DIG", "ANA", "STAT", "MODES", "WRITE", "TEST", "OTHER")
+
+
+def command_kind(text: str) -> str:
+    """Komut metninden histogram adını çıkar ("13,1" -> DIGITAL)"""
+    if text[:1].isdigit():
+        return "DIGITAL"
+    parts = text.split(None, 1)
+    head = parts[0] if parts else ""
+    return head if head in COMMAND_KINDS else "OTHER"
+
+
+def _bucket_index(value: int) -> int:
+    if value < _LINEAR_LIMIT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return shift * _SUB_BUCKETS + (value >> shift)
+
+
+def _bucket_value(index: int) -> int:
+    """Kovanın alt sınırı"""
+    if index < _LINEAR_LIMIT:
+        return index
+    shift = index // _SUB_BUCKETS - 1
+    return (index - shift * _SUB_BUCKETS) << shift
+
+
+class LatencyHistogram:
+    """Mikrosaniye cinsinden log-lineer (HDR tarzı) gecikme histogramı"""
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def record(self, micros: int):
+        micros = max(0, int(micros))
+        idx = _bucket_index(micros)
+        self.counts[idx] = self.counts.get(idx, 0) + 1
+        if not self.count or micros < self.min:
+            self.min = micros
+        if micros > self.max:
+            self.max = micros
+        self.count += 1
+        self.total += micros
+
+    def copy(self) -> 'LatencyHistogram':
+        other = LatencyHistogram()
+        other.counts = dict(self.counts)
+        other.count, other.total, other.min, other.max = self.count, self.total, self.min, self.max
+        return other
+
+    def percentile(self, pct: float) -> int:
+        """Yüzdelik değeri (kovanın alt sınırı, en fazla max)"""
+        if not self.count:
+            return 0
+        target = max(1, int(round(self.count * pct / 100.0)))
+        seen = 0
+        for idx in sorted(self.counts):
+            seen += self.counts[idx]
+            if seen >= target:
+                return min(max(_bucket_value(idx), self.min), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            'count': self.count,
+            'mean_us': self.total // self.count if self.count else 0,
+            'min_us': self.min,
+            'p50_us': self.percentile(50),
+            'p90_us': self.percentile(90),
+            'p99_us': self.percentile(99),
+            'max_us': self.max,
+        }
+
+
+class RateMeter:
+    """Son birkaç saniyedeki bayt/s (saniyelik kovalar)"""
+
+    def __init__(self, window: int = 5):
+        self.window = window
+        self.total = 0
+        self._counts: List[int] = [0] * window
+        self._seconds: List[int] = [-1] * window
+
+    def add(self, n: int, now: float):
+        sec = int(now)
+        i = sec % self.window
+        if self._seconds[i] != sec:
+            self._seconds[i] = sec
+            self._counts[i] = 0
+        self._counts[i] += n
+        self.total += n
+
+    def rate(self, now: float) -> float:
+        sec = int(now)
+        recent = sum(c for s, c in zip(self._seconds, self._counts) if sec - self.window < s <= sec)
+        # İçinde bulunulan saniye kısmi: geçen süreye böl
+        return recent / (self.window - 1 + (now - sec))
+
+
+class _KindStats:
+    __slots__ = ("queue", "wire", "total", "timeouts")
+
+    def __init__(self):
+        self.queue = LatencyHistogram()
+        self.wire = LatencyHistogram()
+        self.total = LatencyHistogram()
+        self.timeouts = 0
+
+
+class LinkStats:
+    """Tek bir seri hattın istatistikleri (SerialManager başına bir tane).
+    on_send/on_reply/on_timeout InflightWindow'dan, on_tx/on_rx I/O
+    thread'lerinden çağrılır.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._kinds: Dict[str, _KindStats] = {}
+            # seq -> (tür, kuyruğa giriş, yazma zamanı)
+            self._inflight: Dict[int, Tuple[str, float, float]] = {}
+            self._tx = RateMeter()
+            self._rx = RateMeter()
+            self.timeout_count = 0
+            # write() çağrısı sayısı ve gönderilen komut sayısı (yazma birleştirme oranı)
+            self.tx_writes = 0
+            self.tx_commands = 0
+
+    # ----------------- Kayıt -----------------
+    def on_send(self, seq: int, text: str, enqueued_at: Optional[float] = None):
+        now = time.perf_counter()
+        with self._lock:
+            self._inflight[seq] = (command_kind(text), enqueued_at or now, now)
+            self.tx_commands += 1
+
+    def on_reply(self, seq: int):
+        now = time.perf_counter()
+        with self._lock:
+            entry = self._inflight.pop(seq, None)
+            if entry is None:
+                return
+            kind, enqueued, sent = entry
+            stats = self._kinds.get(kind)
+            if stats is None:
+                stats = self._kinds[kind] = _KindStats()
+            stats.queue.record((sent - enqueued) * 1e6)
+            stats.wire.record((now - sent) * 1e6)
+            stats.total.record((now - enqueued) * 1e6)
+
+    def on_timeout(self, seq: int):
+        with self._lock:
+            entry = self._inflight.pop(seq, None)
+            self.timeout_count += 1
+            if entry is not None:
+                stats = self._kinds.get(entry[0])
+                if stats is None:
+                    stats = self._kinds[entry[0]] = _KindStats()
+                stats.timeouts += 1
+
+    def on_cancel(self, seq: Optional[int] = None):
+        """Yanıtı artık beklenmeyen komut (seq=None: hepsi)"""
+        with self._lock:
+            if seq is None:
+                self._inflight.clear()
+            else:
+                self._inflight.pop(seq, None)
+
+    def on_tx(self, n: int):
+        with self._lock:
+            self._tx.add(n, time.monotonic())
+            self.tx_writes += 1
+
+    def on_rx(self, n: int):
+        with self._lock:
+            self._rx.add(n, time.monotonic())
+
+    # ----------------- Public API -----------------
+    def snapshot(self, baudrate: Optional[int] = None) -> dict:
+        """Tutarlı bir kopya al; yüzdelikler kilit dışında hesaplanır"""
+        now = time.monotonic()
+        with self._lock:
+            kinds = {k: (s.queue.copy(), s.wire.copy(), s.total.copy(), s.timeouts)
+                     for k, s in self._kinds.items()}
+            tx_rate, rx_rate = self._tx.rate(now), self._rx.rate(now)
+            tx_total, rx_total = self._tx.total, self._rx.total
+            timeouts = self.timeout_count
+            writes, commands = self.tx_writes, self.tx_commands
+        latency = {
+            kind: {'queue': q.summary(), 'wire': w.summary(), 'total': t.summary(), 'timeouts': n}
+            for kind, (q, w, t, n) in kinds.items()
+        }
+        capacity = baudrate / BITS_PER_BYTE if baudrate else 0
+        return {
+            'latency': latency,
+            'tx_bytes': tx_total,
+            'rx_bytes': rx_total,
+            'tx_bytes_per_s': round(tx_rate, 1),
+            'rx_bytes_per_s': round(rx_rate, 1),
+            'timeouts': timeouts,
+            'tx_writes': writes,
+            'commands_per_write': round(commands / writes, 2) if writes else 0.0,
+            # Tam çift yönlü hat: dolu olan yön belirleyicidir
+            'link_utilization': round(max(tx_rate, rx_rate) / capacity, 4) if capacity else 0.0,
+        }
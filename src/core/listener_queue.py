@@ -0,0 +1,158 @@
+"""core.listener_queue
+Dinleyicileri kendi sınırlı kuyruğu ve worker thread'i ile çalıştıran teslim modu.
+
+SerialManager ve MessageRouter callback'leri normalde çağıran thread'de
+(dağıtıcı) sırayla çalışır; yavaş bir dinleyici (her satırda flush eden
+log dosyası, Tk'ye metin ekleyen monitör) ayrıştırmayı herkes için
+bekletir. queued=True ile kaydedilen dinleyicinin çağrıları kendi
+kuyruğuna alınır ve ayrı bir thread'de sırasıyla çalıştırılır; dağıtıcı
+hiç beklemez.
+
+Kuyruk dolduğunda:
+    drop_oldest : en eski bekleyen çağrı atılır
+    conflate    : aynı anahtarlı bekleyen çağrının argümanları yenisiyle
+                  değiştirilir (sırası korunur); eşi yoksa en eski atılır
+Varsayılan anahtar pin olaylarında (olay tipi, pin), diğer olaylarda olay
+tipidir; SerialManager satırlarında yalnızca birebir aynı satırlar birleşir.
+
+    serial_manager.add_message_callback(self._log, queued=True)
+    router.add_listener("analog_value", cb, queued=True, overflow="conflate")
+    router.listener_stats()   # derinlik, atılan/birleşen, gecikme (ms)
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, Optional
+
+from core.events import Event
+
+DROP_OLDEST = "drop_oldest"
+CONFLATE = "conflate"
+LISTENER_POLICIES = (DROP_OLDEST, CONFLATE)
+
+DEFAULT_MAXSIZE = 1024
+
+
+def default_key(args: tuple) -> Hashable:
+    """Birleştirme anahtarı: pin olayları için (tip, pin), diğer olaylar için tip"""
+    if len(args) == 1 and isinstance(args[0], Event):
+        event = args[0]
+        return type(event), event.get("pin")
+    return args
+
+
+def callback_name(callback: Callable[..., Any]) -> str:
+    return getattr(callback, "__qualname__", None) or repr(callback)
+
+
+class QueuedListener:
+    """callback'i sınırlı bir kuyruk ve ayrı bir worker thread'i üzerinden çağırır.
+    Çağrı (__call__) hiçbir zaman beklemez; sıra dinleyici başına korunur.
+    """
+
+    def __init__(self, callback: Callable[..., Any], maxsize: int = DEFAULT_MAXSIZE,
+                 overflow: str = DROP_OLDEST, key: Optional[Callable[[tuple], Hashable]] = None,
+                 name: Optional[str] = None):
+        if overflow not in LISTENER_POLICIES:
+            raise ValueError(f"Bilinmeyen taşma politikası: {overflow}")
+        self.callback = callback
+        self.maxsize = max(1, maxsize)
+        self.overflow = overflow
+        self.key = key or default_key
+        self.name = name or callback_name(callback)
+        # Bekleyen çağrılar: [anahtar, argümanlar, kuyruğa giriş zamanı]
+        self._pending: Deque[list] = deque()
+        self._by_key: Dict[Hashable, list] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        # İstatistikler
+        self.delivered = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.errors = 0
+        self.max_depth = 0
+        self._lag_total = 0.0
+        self._lag_max = 0.0
+        self._thread = threading.Thread(target=self._run, daemon=True, name=f"Listener-{self.name}")
+        self._thread.start()
+
+    def __call__(self, *args):
+        if self._closed:
+            return
+        now = time.perf_counter()
+        with self._cond:
+            conflate = self.overflow == CONFLATE
+            key = self.key(args) if conflate else None
+            if len(self._pending) >= self.maxsize:
+                pending = self._by_key.get(key) if conflate else None
+                if pending is not None:
+                    # Aynı anahtarlı bekleyen çağrı: yalnızca argümanları güncelle
+                    pending[1] = args
+                    self.conflated += 1
+                    return
+                old = self._pending.popleft()
+                if conflate and self._by_key.get(old[0]) is old:
+                    del self._by_key[old[0]]
+                self.dropped += 1
+            item = [key, args, now]
+            self._pending.append(item)
+            if conflate:
+                self._by_key[key] = item
+            if len(self._pending) > self.max_depth:
+                self.max_depth = len(self._pending)
+            self._cond.notify()
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def close(self):
+        """Bekleyen çağrıları at ve worker'ı durdur"""
+        with self._cond:
+            self._closed = True
+            self._pending.clear()
+            self._by_key.clear()
+            self._cond.notify()
+
+    def stats(self) -> dict:
+        """Derinlik, sayaçlar ve gecikme (kuyruğa girişten callback başlangıcına, ms)"""
+        now = time.perf_counter()
+        with self._cond:
+            oldest = self._pending[0][2] if self._pending else now
+            return {
+                'depth': len(self._pending),
+                'max_depth': self.max_depth,
+                'capacity': self.maxsize,
+                'overflow': self.overflow,
+                'delivered': self.delivered,
+                'dropped': self.dropped,
+                'conflated': self.conflated,
+                'errors': self.errors,
+                'lag_now_ms': round((now - oldest) * 1000, 3),
+                'lag_avg_ms': round(self._lag_total / self.delivered * 1000, 3) if self.delivered else 0.0,
+                'lag_max_ms': round(self._lag_max * 1000, 3),
+            }
+
+    # ----------------- Internal -----------------
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                key, args, enqueued = item = self._pending.popleft()
+                if self._by_key.get(key) is item:
+                    del self._by_key[key]
+                lag = time.perf_counter() - enqueued
+                self.delivered += 1
+                self._lag_total += lag
+                if lag > self._lag_max:
+                    self._lag_max = lag
+            try:
+                self.callback(*args)
+            except Exception as e:
+                self.errors += 1
+                print(f"Listener error ({self.name}): {e}")
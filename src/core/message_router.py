@@ -1,106 +1,236 @@
 """core.message_router
 SerialManager'dan gelen ham satırları ayrıştırır ve olaylara dönüştürür.
 Basit bir publish/subscribe mekanizması sağlar.
-Olay tipleri:
-    • pin_state   : {'pin': int, 'value': int}
-    • analog_value: {'pin': str, 'value': int}
-    • stat        : {'entries': List[Tuple[int, int, int]]}
-    • raw         : {'line': str}
+Olay tipleri (core.events; dict gibi de okunabilir):
+    • pin_state       : PinState(pin: int, value: int)
+    • analog_value    : AnalogValue(pin: str, value: int)
+    • digital_snapshot: DigitalSnapshot(values, changed, mask)  (satır başına bir "D2:1,D3:0,...")
+    • analog_snapshot : AnalogSnapshot(values, changed, mask)   (satır başına bir "A0:..,A5:..")
+    • stat            : Stat(entries: List[Tuple[int, int, int]])
+    • raw             : RawLine(line: str)
+DIG/ANA satırları uyumluluk için ayrıca pin başına pin_state/analog_value
+olaylarına açılır; snapshot olaylarını dinleyenler bu açılımı
+add_listener(..., snapshots=False) ile kapatabilir. Snapshot'ların changed/mask
+alanları bu yönlendiricinin yayınladığı önceki snapshot'a göredir (ölü bant
+yok; abone olunduktan sonraki ilk snapshot'ta tüm pinler değişmiş sayılır).
+pin_state/analog_value için add_listener(..., pins={2, 5, "A0"}) yalnızca
+o pinlerin olaylarını iletir; abonelikler pin indeksli tutulur, dağıtım
+maliyeti tüm dinleyicilerle değil ilgili olanlarla büyür.
+add_listener(..., queued=True) dinleyiciyi kendi sınırlı kuyruğu ve
+thread'iyle çalıştırır (bkz. core.listener_queue); yavaş bir dinleyici
+ayrıştırmayı bekletmez. Gecikme ölçümleri listener_stats() ile alınır.
+Olaylar yalnızca o tipin dinleyicisi varsa oluşturulur; hiçbir dinleyicinin
+ilgilenmediği satırlar (ilk karakterine göre) ayrıştırılmaz bile.
 """
 from __future__ import annotations
 
-from typing import Callable, Dict, List, Tuple, Any
+from typing import Callable, Dict, Iterable, List, Optional, Any, Tuple, Union
 
-from core.serial_manager import serial_manager
+from core.events import (AnalogSnapshot, AnalogValue, DigitalSnapshot, Event, ListenerTable, PinState,
+                         RawLine, Stat, analog_mask, digital_mask, pin_keys)
+from core.listener_queue import DEFAULT_MAXSIZE, DROP_OLDEST, QueuedListener, callback_name
+from core.protocol import parse_response
+from core.serial_manager import SerialManager, serial_manager
+
+# Olay tipi -> o olayı üretebilecek satırların ilk karakterleri
+# (PIN.., D.., A.., STAT satırları rakamla başlar)
+_LINE_PREFIXES = {
+    "pin_state": "PD",
+    "analog_value": "A",
+    "digital_snapshot": "D",
+    "analog_snapshot": "A",
+    "stat": "0123456789",
+}
 
 
 class MessageRouter:
     _instance: 'MessageRouter' | None = None
 
-    def __new__(cls):
+    def __new__(cls, serial: Optional[SerialManager] = None):
+        if serial is not None:
+            # Belirli bir cihaza bağlı bağımsız yönlendirici (core.device_registry)
+            return super().__new__(cls)
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self):
+    def __init__(self, serial: Optional[SerialManager] = None):
         if hasattr(self, "_initialized"):
             return
         self._initialized = True
-        self._listeners: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+        self.serial = serial or serial_manager
+        self._listeners: Dict[str, ListenerTable] = {}
+        # DIG/ANA satırlarının pin başına açılımını alan dinleyiciler (_listeners'ın alt kümesi)
+        self._expand: Dict[str, ListenerTable] = {}
+        # (olay tipi, callback) -> kendi kuyruğuyla çalışan sarmalayıcı
+        self._queued: Dict[Tuple[str, Callable[[Event], None]], QueuedListener] = {}
+        # Dinleyicisi olan olay tiplerinin satır ön ekleri; "raw" dinleyicisi varsa None (tümü)
+        self._wanted: Optional[frozenset] = frozenset()
+        # Snapshot changed/mask hesabı için son yayınlanan değerler
+        self._last_snapshot: Dict[str, dict] = {"digital_snapshot": {}, "analog_snapshot": {}}
         # SerialManager callback kaydı
-        serial_manager.add_message_callback(self._on_serial_message)
+        self.serial.add_message_callback(self._on_serial_message)
 
     # ----------------- Public API -----------------
-    def add_listener(self, event_type: str, callback: Callable[[Dict[str, Any]], None]):
-        self._listeners.setdefault(event_type, []).append(callback)
+    def add_listener(self, event_type: str, callback: Callable[[Event], None],
+                     snapshots: bool = True, pins: Optional[Iterable[Union[int, str]]] = None,
+                     queued: bool = False, overflow: str = DROP_OLDEST, maxsize: int = DEFAULT_MAXSIZE):
+        """snapshots=False: pin_state/analog_value için yalnızca tekil yanıtları
+        ("PIN 7 : ON") al; DIG/ANA satırları *_snapshot olaylarıyla gelir.
+        pins: yalnızca bu pinlerin olayları (ör. {2, 5, "A0"}; A0 = 14)
+        queued: callback kendi kuyruğu/thread'inde çalışır; kuyruk (maxsize)
+        dolunca overflow uygulanır ("drop_oldest" ya da "conflate")
+        """
+        keys = None if pins is None else pin_keys(event_type, pins)
+        if event_type in self._last_snapshot and not self._listeners.get(event_type):
+            # Dinleyicisiz geçen sürede satırlar ayrıştırılmadı: eski değerlerle karşılaştırma
+            self._last_snapshot[event_type] = {}
+        if queued:
+            if (event_type, callback) in self._queued:
+                return
+            wrapper = QueuedListener(callback, maxsize, overflow, name=f"{event_type}:{callback_name(callback)}")
+            self._queued[(event_type, callback)] = wrapper
+            callback = wrapper
+        self._listeners.setdefault(event_type, ListenerTable()).add(callback, keys)
+        if snapshots:
+            self._expand.setdefault(event_type, ListenerTable()).add(callback, keys)
+        self._update_wanted()
+
+    def remove_listener(self, event_type: str, callback: Callable[[Event], None]):
+        wrapper = self._queued.pop((event_type, callback), None)
+        if wrapper is not None:
+            wrapper.close()
+            callback = wrapper
+        for tables in (self._listeners, self._expand):
+            table = tables.get(event_type)
+            if table is not None:
+                table.remove(callback)
+        self._update_wanted()
 
-    def remove_listener(self, event_type: str, callback: Callable[[Dict[str, Any]], None]):
-        lst = self._listeners.get(event_type)
-        if lst and callback in lst:
-            lst.remove(callback)
+    def listener_stats(self) -> Dict[str, dict]:
+        """queued dinleyicilerin kuyruk derinliği, atılan/birleşen sayıları ve gecikmesi"""
+        return {wrapper.name: wrapper.stats() for wrapper in list(self._queued.values())}
+
+    def close(self):
+        """SerialManager aboneliğini bırak, tüm dinleyicileri ve queued thread'leri kapat"""
+        self.serial.remove_message_callback(self._on_serial_message)
+        for wrapper in self._queued.values():
+            wrapper.close()
+        self._queued.clear()
+        self._listeners.clear()
+        self._expand.clear()
+        self._update_wanted()
 
     # ----------------- Internal -----------------
-    def _dispatch(self, event_type: str, data: Dict[str, Any]):
-        for cb in self._listeners.get(event_type, []):
+    def _update_wanted(self):
+        if self._listeners.get("raw"):
+            self._wanted = None
+            return
+        self._wanted = frozenset("".join(prefix for event_type, prefix in _LINE_PREFIXES.items()
+                                         if self._listeners.get(event_type)))
+
+    def _emit(self, listeners: Tuple[Callable[[Event], None], ...], event_type: str, event: Event):
+        # ListenerTable tuple'ları değişmez: dinleyici çağrı sırasında kendini kaldırabilir
+        for cb in listeners:
             try:
-                cb(data)
+                cb(event)
             except Exception as e:
                 print(f"MessageRouter listener error ({event_type}): {e}")
 
+    def _dispatch(self, event_type: str, data: Event):
+        table = self._listeners.get(event_type)
+        if table:
+            self._emit(table.all, event_type, data)
+
+    def _emit_pin(self, table: ListenerTable, event_type: str, cls, pin, value):
+        # Tüm pinleri dinleyenler + yalnızca bu pine abone olanlar
+        pinned = table.by_pin.get(pin)
+        if table.all or pinned:
+            self._emit(table.all + pinned if pinned else table.all, event_type, self._new(cls, pin, value))
+
+    def _emit_pins(self, table: ListenerTable, event_type: str, cls, values: Dict[Any, int]):
+        """DIG/ANA satırının pin başına açılımı (_emit_pin'in satır başına döngüsü)"""
+        every, by_pin = table.all, table.by_pin
+        new = self._new
+        for pin, value in values.items():
+            pinned = by_pin.get(pin) if by_pin else None
+            listeners = every + pinned if pinned else every
+            if not listeners:
+                continue
+            event = new(cls, pin, value)
+            for cb in listeners:
+                try:
+                    cb(event)
+                except Exception as e:
+                    print(f"MessageRouter listener error ({event_type}): {e}")
+
+    def _changed(self, snapshot_type: str, values: Dict[Any, int]) -> tuple:
+        """Önceki snapshot'tan farklı pinler; son değerleri günceller"""
+        last = self._last_snapshot[snapshot_type]
+        if last == values:
+            return ()  # Periyodik sorgularda en sık durum
+        changed = tuple([pin for pin, value in values.items() if last.get(pin) != value])
+        last.update(values)
+        return changed
+
+    def _new(self, cls, *args) -> Event:
+        return cls(*args)
+
     def _on_serial_message(self, source: str, line: str):
         if source != "Alınan":
             return
-        line = line.strip()
-        self._dispatch("raw", {"line": line})
-        # Parse pin state messages e.g. "PIN 7  : ON" or "PIN 11 : 127"
-        if line.startswith("PIN "):  # state change feedback
-            parts = line[4:].strip()
-            if parts.upper().startswith("ALL"):
-                return  # toplu mesajı atla
-            if ':' not in parts:
-                return
-            pin_part, val_part = parts.split(':', 1)
-            pin_part = pin_part.strip()
-            val_part = val_part.strip()
-            if pin_part.isdigit():
-                pin = int(pin_part)
-                up_val = val_part.upper()
-                if val_part.isdigit():
-                    value = int(val_part)
-                elif up_val in ("ON", "OFF"):
-                    value = 1 if up_val == "ON" else 0
-                else:
-                    # IN, OUT, PAS gibi mod değişim mesajlarını görmezden gel
-                    return
-                self._dispatch("pin_state", {"pin": pin, "value": value})
-            return
-        # Dijital okuma: "D2:1,D3:0,..."
-        if line.startswith("D") and ':' in line:
-            entries = line.split(',')
-            for ent in entries:
-                if ':' in ent and ent.startswith("D"):
-                    p, v = ent.split(':')
-                    if p[1:].isdigit() and v.isdigit():
-                        self._dispatch("pin_state", {"pin": int(p[1:]), "value": int(v)})
-            return
-        # Analog okuma: "A0:123,A1:456,..."
-        if line.startswith("A0:"):
-            for ent in line.split(','):
-                if ':' in ent:
-                    name, val = ent.split(':')
-                    if val.isdigit():
-                        self._dispatch("analog_value", {"pin": name.strip(), "value": int(val)})
-            return
-        # STAT cevabı: "2:1:1,3:0:1,..."
-        if ':' in line and ',' in line and not line.startswith(('A', 'D')):
-            entries: List[Tuple[int, int, int]] = []
-            for ent in line.split(','):
-                parts = ent.split(':')
-                if len(parts) >= 3 and parts[0].isdigit() and parts[1].isdigit() and parts[2].isdigit():
-                    entries.append((int(parts[0]), int(parts[1]), int(parts[2])))
-            if entries:
-                self._dispatch("stat", {"entries": entries})
+        wanted = self._wanted
+        if wanted is not None and line[:1] not in wanted:
             return
+        resp = parse_response(line)
+        table = self._listeners.get("raw")
+        if table:
+            self._emit(table.all, "raw", self._new(RawLine, resp.line))
+        handler = self._HANDLERS.get(resp.kind)
+        if handler is not None:
+            handler(self, resp.data)
+
+    # Yanıt tipi -> olay üreten işleyici (pin_mode, all, batch vb. olay üretmez)
+    def _on_pin_state(self, data: Dict[str, Any]):
+        # "PIN 7 : ON", "PIN 11 : 127", "PIN A0 : OFF"
+        table = self._listeners.get("pin_state")
+        if table:
+            self._emit_pin(table, "pin_state", PinState, data["pin"], data["value"])
+
+    def _on_digital(self, data: Dict[str, Any]):
+        # "D2:1,D3:0,..." -> tek digital_snapshot (+ uyumluluk için pin başına pin_state)
+        values = data["values"]
+        table = self._listeners.get("digital_snapshot")
+        if table:
+            changed = self._changed("digital_snapshot", values)
+            self._emit(table.all, "digital_snapshot", self._new(DigitalSnapshot, values, changed, digital_mask(changed)))
+        table = self._expand.get("pin_state")
+        if table:
+            self._emit_pins(table, "pin_state", PinState, values)
+
+    def _on_analog(self, data: Dict[str, Any]):
+        # "A0:123,A1:456,..." -> tek analog_snapshot (+ pin başına analog_value)
+        values = data["values"]
+        table = self._listeners.get("analog_snapshot")
+        if table:
+            changed = self._changed("analog_snapshot", values)
+            self._emit(table.all, "analog_snapshot", self._new(AnalogSnapshot, values, changed, analog_mask(changed)))
+        table = self._expand.get("analog_value")
+        if table:
+            self._emit_pins(table, "analog_value", AnalogValue, values)
+
+    def _on_stat(self, data: Dict[str, Any]):
+        # "2:1:1,3:0:1,...,A0:0:0,..." (analog pinler 14..19 olarak)
+        table = self._listeners.get("stat")
+        if table:
+            self._emit(table.all, "stat", self._new(Stat, data["entries"]))
+
+    _HANDLERS = {
+        "pin_state": _on_pin_state,
+        "digital": _on_digital,
+        "analog": _on_analog,
+        "stat": _on_stat,
+    }
 
 
 # Global instance
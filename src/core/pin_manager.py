@@ -1,36 +1,76 @@
 """core.pin_manager
 Üst seviye pin işlemleri (mode, dijital yaz/oku, pwm yaz/oku) için tek giriş noktası.
 SerialManager üzerinden haberleşir, MessageRouter'dan gelen olaylarla dahili durumu günceller.
+
+Olaylar core.events sınıflarıdır (dict gibi de okunabilir). DIG/ANA yanıtları
+satır başına tek olay olarak yayınlanır:
+    • digital_snapshot: DigitalSnapshot(values: Dict[int, int], changed: Tuple[int, ...], mask: int)
+    • analog_snapshot : AnalogSnapshot(values: Dict[str, int], changed: Tuple[str, ...], mask: int)
+changed bilinen son değerden farklı (ya da ilk kez okunan) pinlerdir; mask
+aynı kümenin bit maskesidir (bit = Arduino pin numarası, A0 = 14).
+Periyodik DIG/ANA sorguları çoğunlukla aynı değerleri tekrarlar; bu yüzden
+olaylar yalnızca değişimde üretilir: hiçbir pin değişmediyse snapshot
+yayınlanmaz, pin başına olaylar yalnızca değişen pinler için gelir. Analog
+pinlerde değişim, son yayınlanan değerden pin başına ölü banttan
+(set_analog_deadband) fazla sapmadır. Her örneği isteyen dinleyiciler
+add_listener(..., force=True) ile kaydolur. Tekil yanıtlar ("PIN 7 : ON")
+her zaman iletilir.
+Pin başına pin_state/analog_value olayları uyumluluk için sürer;
+add_listener(..., snapshots=False) yalnızca tekil yanıtları iletir;
+add_listener("pin_state", cb, pins={2, 5, "A0"}) yalnızca o pinlerin
+olaylarını pin indeksli tablodan iletir.
+Olaylar yalnızca dinleyici varsa oluşturulur.
 """
 from __future__ import annotations
 
-from typing import Dict, Callable, Any
+from typing import Dict, Callable, Any, Iterable, Optional, Union
 
-from core.serial_manager import serial_manager
-from core.message_router import message_router
+from core.events import (AnalogSnapshot, AnalogValue, DigitalSnapshot, Event, ListenerTable, PinState,
+                         analog_mask, digital_mask, pin_keys)
+from core.serial_manager import SerialManager, serial_manager
+from core.message_router import MessageRouter, message_router
 
 
 class PinManager:
     _instance: 'PinManager' | None = None
 
-    def __new__(cls):
+    def __new__(cls, serial: Optional[SerialManager] = None, router: Optional[MessageRouter] = None):
+        if serial is not None or router is not None:
+            # Belirli bir cihaza bağlı bağımsız pin durumu (core.device_registry)
+            return super().__new__(cls)
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self):
+    def __init__(self, serial: Optional[SerialManager] = None, router: Optional[MessageRouter] = None):
         if hasattr(self, "_initialized"):
             return
         self._initialized = True
+        self.serial = serial or (router.serial if router else serial_manager)
+        self.router = router or (MessageRouter(self.serial) if serial else message_router)
         # Dahili durum tabloları
         self.pin_modes: Dict[int, int] = {}      # 0=input, 1=output
         self.pin_states: Dict[int, int] = {}     # 0/1 veya pwm değeri (0-255)
         self.analog_values: Dict[str, int] = {}
-        # Event dinleyici listesi
-        self._listeners: Dict[str, list[Callable[[Any], None]]] = {}
-        # Mesaj yönlendirici aboneliği
-        message_router.add_listener("pin_state", self._on_pin_state)
-        message_router.add_listener("analog_value", self._on_analog_value)
+        # Analog ölü bant (ADC adımı): son yayınlanan değerden en az bu kadar
+        # fazla sapmayan okumalar olay üretmez (0 = her değişim)
+        self.analog_deadband: Dict[str, int] = {}
+        self.default_analog_deadband = 0
+        self._analog_reported: Dict[str, int] = {}
+        # Event dinleyici listesi (yalnızca değişimler)
+        self._listeners: Dict[str, ListenerTable] = {}
+        # Snapshot satırlarının pin başına açılımını alan dinleyiciler
+        self._expand: Dict[str, ListenerTable] = {}
+        # force=True dinleyiciler: DIG/ANA satırlarının her örneği
+        self._force: Dict[str, ListenerTable] = {}
+        self._force_expand: Dict[str, ListenerTable] = {}
+        # Mesaj yönlendirici aboneliği (DIG/ANA satırları snapshot olarak gelir;
+        # firmware'in tekil analog yanıtı yok, analog değerler yalnızca ANA'dan)
+        self.router.add_listener("pin_state", self._on_pin_state, snapshots=False)
+        self.router.add_listener("digital_snapshot", self._on_digital_snapshot)
+        self.router.add_listener("analog_snapshot", self._on_analog_snapshot)
+        # Otomatik yeniden bağlantıdan sonra son bilinen durumu karta geri yükle
+        self.serial.add_reconnect_callback(self.restore_state)
 
     # --------------- Public API ---------------
     def set_mode(self, pin: int, mode: int):
@@ -39,25 +79,50 @@ class PinManager:
         """
         if mode not in (0, 1, 2):
             mode = 0
-        serial_manager.send_mode_command(pin, mode)
+        self.serial.send_mode_command(pin, mode)
         self.pin_modes[pin] = mode
 
     # set_all_modes kaldırıldı – ALLMODE komutu desteklenmiyor
 
-    def write_digital(self, pin: int, value: int):
-        serial_manager.send_command(pin, 1 if value else 0)
+    def set_modes(self, modes: Dict[int, int]):
+        """Birden çok pinin modunu tek toplu komutla ayarla.
+        modes: {pin: mode}. Firmware onayını (MODES OK n) bekleyen Future döndürür.
+        """
+        modes = {pin: (mode if mode in (0, 1, 2) else 0) for pin, mode in modes.items()}
+        future = self.serial.send_modes_command(modes)
+        self.pin_modes.update(modes)
+        return future
+
+    def write_many(self, values: Dict[int, int]):
+        """Birden çok dijital/PWM çıkışa tek toplu komutla yaz.
+        PWM pinlerinde değer 0-255, diğerlerinde 0/1 olarak saklanır.
+        """
+        from core.config import PWM_DIGITAL_PINS
+        clean = {}
+        for pin, value in values.items():
+            if pin in PWM_DIGITAL_PINS:
+                clean[pin] = max(0, min(255, int(value)))
+            else:
+                clean[pin] = 1 if value else 0
+        future = self.serial.send_write_command(clean)
+        self.pin_states.update(clean)
+        return future
+
+    def write_digital(self, pin: int, value: int, ttl: Optional[float] = None):
+        """ttl: saniye; hat geride kalırsa bu sürede yazılamayan komut atılır"""
+        self.serial.send_command(pin, 1 if value else 0, ttl=ttl)
         self.pin_states[pin] = 1 if value else 0
 
-    def write_pwm(self, pin: int, value: int):
+    def write_pwm(self, pin: int, value: int, ttl: Optional[float] = None):
         value = max(0, min(255, int(value)))
-        serial_manager.send_pwm_command(pin, value)
+        self.serial.send_pwm_command(pin, value, ttl)
         self.pin_states[pin] = value
 
     def request_digital_read(self):
-        serial_manager.send_message("DIG")
+        self.serial.send_message("DIG")
 
     def request_analog_read(self):
-        serial_manager.send_message("ANA")
+        self.serial.send_message("ANA")
 
     def get_pin_state(self, pin: int):
         return self.pin_states.get(pin, 0)
@@ -65,71 +130,154 @@ class PinManager:
     def get_analog_value(self, name: str):
         return self.analog_values.get(name, 0)
 
+    def set_analog_deadband(self, pin: Union[int, str], counts: int):
+        """pin: "A0" ya da 14. counts ADC adımından küçük ya da eşit
+        sapmalar olay üretmez (0 = her değişim olay üretir).
+        """
+        for name in pin_keys("analog_value", (pin,)):
+            self.analog_deadband[name] = max(0, int(counts))
+
     # Listener kayıt
-    def add_listener(self, event_type: str, callback: Callable[[Any], None]):
-        self._listeners.setdefault(event_type, []).append(callback)
+    def add_listener(self, event_type: str, callback: Callable[[Any], None], snapshots: bool = True,
+                     pins: Optional[Iterable[Union[int, str]]] = None, force: bool = False):
+        """snapshots=False: pin_state/analog_value için DIG/ANA satırlarının
+        pin başına açılımını alma (*_snapshot dinleyenler için)
+        pins: yalnızca bu pinlerin pin_state/analog_value olayları (A0 = 14)
+        force: değişmemiş olsa da DIG/ANA satırlarının her örneğini al
+        """
+        keys = None if pins is None else pin_keys(event_type, pins)
+        listeners, expand = (self._force, self._force_expand) if force else (self._listeners, self._expand)
+        listeners.setdefault(event_type, ListenerTable()).add(callback, keys)
+        if snapshots:
+            expand.setdefault(event_type, ListenerTable()).add(callback, keys)
 
     def remove_listener(self, event_type: str, callback: Callable[[Any], None]):
-        lst = self._listeners.get(event_type)
-        if lst and callback in lst:
-            lst.remove(callback)
+        for tables in (self._listeners, self._expand, self._force, self._force_expand):
+            table = tables.get(event_type)
+            if table is not None:
+                table.remove(callback)
+
+    def close(self):
+        """Yönlendirici ve SerialManager aboneliklerini bırak, dinleyicileri sil"""
+        self.router.remove_listener("pin_state", self._on_pin_state)
+        self.router.remove_listener("digital_snapshot", self._on_digital_snapshot)
+        self.router.remove_listener("analog_snapshot", self._on_analog_snapshot)
+        self.serial.remove_reconnect_callback(self.restore_state)
+        for tables in (self._listeners, self._expand, self._force, self._force_expand):
+            tables.clear()
+
+    def restore_state(self):
+        """Son bilinen pin modlarını ve çıkış değerlerini toplu komutlarla
+        (bir MODES + bir WRITE) yeniden gönder. Bağlantı kopup kart
+        resetlendiğinde durumu geri kazanmak için kullanılır.
+        """
+        if self.pin_modes:
+            self.serial.send_modes_command(dict(self.pin_modes))
+        outputs = {pin: value for pin, value in self.pin_states.items() if self.pin_modes.get(pin) == 1}
+        if outputs:
+            self.serial.send_write_command(outputs)
 
     # --------------- Config Apply ---------------
     def apply_config(self, config_data: dict):
-        """Verilen konfigürasyondaki pin modlarını Arduino'ya gönderir.
+        """Verilen konfigürasyondaki pin modlarını Arduino'ya tek toplu
+        komutla (MODES) gönderir. Onayı bekleyen Future döndürür.
         config_data: load_config() çıktısı formatında sözlük
         """
         # Lazy import burada yapılır ki döngüsel import sorunu olmasın
         from core.config import DIGITAL_PINS, ANALOG_PINS
 
-        import time  # Gerektiğinde küçük gecikme eklemek için
+        mode_map = {"pas": 2, "output": 1}
+        modes: Dict[int, int] = {}
 
         # Dijital pinler (2-13)
         for pin in DIGITAL_PINS:
             conf = config_data.get("pins", {}).get(str(pin), {})
-            mode_str = conf.get("mode", "output")
-            if mode_str == "pas":
-                self.set_mode(pin, 2)
-            elif mode_str == "output":
-                self.set_mode(pin, 1)
-            else:
-                self.set_mode(pin, 0)
-            # no delay here
+            modes[pin] = mode_map.get(conf.get("mode", "output"), 0)
 
         # Analog pinler (A0-A5 -> 14-19)
         for idx, name in enumerate(ANALOG_PINS):
             conf = config_data.get("pins", {}).get(name, {})
-            arduino_pin = 14 + idx
-            mode_str = conf.get("mode", "input")
-            if mode_str == "pas":
-                self.set_mode(arduino_pin, 2)
-            elif mode_str == "output":
-                self.set_mode(arduino_pin, 1)
-            else:
-                self.set_mode(arduino_pin, 0)
-            # no delay
+            modes[14 + idx] = mode_map.get(conf.get("mode", "input"), 0)
 
-        # Durum tablosu zaten set_mode içinde güncelleniyor
+        # Durum tablosu set_modes içinde güncelleniyor
+        return self.set_modes(modes)
 
     # --------------- Internal Callbacks ---------------
     def _notify(self, event_type: str, data: Any):
-        for cb in self._listeners.get(event_type, []):
+        table = self._listeners.get(event_type)
+        if table:
+            self._emit(table.all, event_type, data)
+
+    @staticmethod
+    def _emit(listeners: tuple, event_type: str, event: Event):
+        # ListenerTable tuple'ları değişmez: dinleyici çağrı sırasında kendini kaldırabilir
+        for cb in listeners:
             try:
-                cb(data)
+                cb(event)
             except Exception as e:
                 print(f"PinManager listener error ({event_type}): {e}")
 
-    def _on_pin_state(self, data: Dict[str, Any]):
-        pin = data["pin"]
-        value = data["value"]
-        self.pin_states[pin] = value
-        self._notify("pin_state", data)
+    def _new(self, cls, *args) -> Event:
+        return cls(*args)
 
-    def _on_analog_value(self, data: Dict[str, Any]):
-        name = data["pin"]
-        value = data["value"]
-        self.analog_values[name] = value
-        self._notify("analog_value", data)
+    def _emit_pin(self, table: ListenerTable, event_type: str, cls, pin, value, event: Optional[Event] = None):
+        # Tüm pinleri dinleyenler + yalnızca bu pine abone olanlar
+        pinned = table.by_pin.get(pin)
+        if table.all or pinned:
+            if event is None:
+                event = self._new(cls, pin, value)
+            if table.all:
+                self._emit(table.all, event_type, event)
+            if pinned:
+                self._emit(pinned, event_type, event)
+
+    def _on_pin_state(self, data: PinState):
+        # Tekil yanıtlar (yazma onayları) değişim filtresinden geçmez
+        self.pin_states[data.pin] = data.value
+        for table in (self._listeners.get("pin_state"), self._force.get("pin_state")):
+            if table:
+                self._emit_pin(table, "pin_state", PinState, data.pin, data.value, data)
+
+    def _on_digital_snapshot(self, data: DigitalSnapshot):
+        values = data.values
+        states = self.pin_states
+        changed = tuple(pin for pin, value in values.items() if states.get(pin) != value)
+        states.update(values)
+        self._publish(values, changed, digital_mask, "digital_snapshot", DigitalSnapshot, "pin_state", PinState)
+
+    def _on_analog_snapshot(self, data: AnalogSnapshot):
+        values = data.values
+        self.analog_values.update(values)
+        reported = self._analog_reported
+        deadband = self.analog_deadband
+        default = self.default_analog_deadband
+        changed = tuple(name for name, value in values.items()
+                        if name not in reported or abs(value - reported[name]) > deadband.get(name, default))
+        for name in changed:
+            reported[name] = values[name]
+        self._publish(values, changed, analog_mask, "analog_snapshot", AnalogSnapshot, "analog_value", AnalogValue)
+
+    def _publish(self, values: dict, changed: tuple, mask_of: Callable[[tuple], int],
+                 snapshot_type: str, snapshot_cls, pin_type: str, pin_cls):
+        """Snapshot'ı ve pin başına olayları yayınla: normal dinleyicilere
+        yalnızca değişenler, force dinleyicilere her örnek.
+        """
+        table = self._listeners.get(snapshot_type) if changed else None
+        forced = self._force.get(snapshot_type)
+        if table or forced:
+            event = self._new(snapshot_cls, values, changed, mask_of(changed))
+            if table:
+                self._emit(table.all, snapshot_type, event)
+            if forced:
+                self._emit(forced.all, snapshot_type, event)
+        table = self._expand.get(pin_type)
+        if table:
+            for pin in changed:
+                self._emit_pin(table, pin_type, pin_cls, pin, values[pin])
+        table = self._force_expand.get(pin_type)
+        if table:
+            for pin, value in values.items():
+                self._emit_pin(table, pin_type, pin_cls, pin, value)
 
 
 # Global instance
@@ -0,0 +1,394 @@
+"""core.protocol
+Arduino firmware'inin (Test_real.ino) seri protokolü için ortak yardımcılar.
+Metin/ikili kodlayıcılar (codec) ve yanıt satırlarını tipli Response
+nesnelerine ayrıştıran parser burada bulunur.
+
+İkili mod (el sıkışmada "PROTO BIN" ile açılır) her mesajı
+[opcode][seq][payload...][crc8] olarak paketler, COBS ile kodlar ve 0x00 ile
+sonlandırır. Gelen ikili çerçeveler metin firmware'inin ürettiği satırlarla
+birebir aynı metne çevrilir; böylece üst katmanlar iki modu ayırt etmez.
+
+Yanıt tipleri:
+    • test      : {}                                   ("1")
+    • caps      : {'firmware': str, 'caps': List[str]} ("CAPS FNSS_TEST/2 SEQ")
+    • pin_state : {'pin': int, 'value': int}          ("PIN 11 : 127", "PIN A0 : ON")
+    • pin_mode  : {'pin': int, 'mode': int}           ("PIN 7:OUT")
+    • all       : {'value': int}                      ("PIN ALL: ON")
+    • digital   : {'values': Dict[int, int]}          ("D2:1,D3:0,")
+    • analog    : {'values': Dict[str, int]}          ("A0:123,A1:456,...")
+    • stat      : {'entries': List[Tuple[int, int, int]]} ("2:0:1,...,A0:0:0,...")
+    • batch     : {'command': str, 'count': int}       ("MODES OK 18", "WRITE OK 5")
+    • ack       : {}                                   (çıktısız komut onayı)
+    • raw       : {}                                   (tanınmayan satır)
+"""
+from __future__ import annotations
+
+import struct
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# Arduino analog pinleri 14..19 = A0..A5
+ANALOG_PIN_BASE = 14
+# Arduino HardwareSerial RX tamponu (bayt). Yüksek hızda firmware loop()'u
+# tamponu boşaltmadan gelen bir yazma patlaması bunu aşarsa baytlar kaybolur.
+RX_BUFFER_SIZE = 64
+_MODE_NAMES = {"IN": 0, "OUT": 1, "PAS": 2}
+
+
+class Response(NamedTuple):
+    kind: str
+    data: Dict[str, Any]
+    line: str
+
+
+def pin_number(label: str) -> int:
+    """'7' -> 7, 'A0' -> 14; geçersizse ValueError"""
+    label = label.strip()
+    if label[:1] in ("A", "a"):
+        return ANALOG_PIN_BASE + int(label[1:])
+    return int(label)
+
+
+# ---------------------------------------------------------------------------
+# Yanıt ayrıştırıcı (tablo tabanlı)
+# ---------------------------------------------------------------------------
+# Firmware yanıtlarının ilk karakteri tipini belirler (PIN, CAPS, MODES,
+# WRITE, D.., A.., rakam); satır tek bir dict aramasıyla ilgili işleyiciye
+# gider. Pin etiketleri ("7", "A0", "D7") ve sabit kelimeler (ON/OFF,
+# IN/OUT/PAS) önceden hazırlanmış tablolardan çözülür; kalıba uymayan satır
+# KeyError/ValueError ile "raw" olarak kalır.
+
+_PIN_LABELS: Dict[str, int] = {str(p): p for p in range(20)}
+_PIN_LABELS.update({f"A{i}": ANALOG_PIN_BASE + i for i in range(6)})
+_DIGITAL_LABELS: Dict[str, int] = {f"D{p}": p for p in range(20)}
+_ON_OFF = {"ON": 1, "OFF": 0}
+
+
+def _parse_pin(line: str) -> Response:
+    # "PIN 7 : ON", "PIN 11 : 127", "PIN A0 : OFF", "PIN 7:OUT", "PIN ALL: ON"
+    if not line.startswith("PIN "):
+        return Response("raw", {}, line)
+    label, sep, value = line[4:].partition(':')
+    if not sep:
+        return Response("raw", {}, line)
+    label = label.strip()
+    value = value.strip().upper()
+    if label == "ALL":
+        return Response("all", {"value": 1 if value == "ON" else 0}, line)
+    pin = _PIN_LABELS[label]
+    state = _ON_OFF.get(value)
+    if state is not None:
+        return Response("pin_state", {"pin": pin, "value": state}, line)
+    mode = _MODE_NAMES.get(value)
+    if mode is not None:
+        return Response("pin_mode", {"pin": pin, "mode": mode}, line)
+    return Response("pin_state", {"pin": pin, "value": int(value)}, line)
+
+
+def _parse_caps(line: str) -> Response:
+    parts = line.split()
+    if parts[0] != "CAPS":
+        return Response("raw", {}, line)
+    return Response("caps", {"firmware": parts[1], "caps": parts[2:]}, line)
+
+
+def _parse_batch(line: str) -> Response:
+    # "MODES OK 18" / "WRITE OK 5"
+    command, status, count = line.split()
+    if status != "OK" or command not in ("MODES", "WRITE"):
+        return Response("raw", {}, line)
+    return Response("batch", {"command": command, "count": int(count)}, line)
+
+
+def _parse_digital(line: str) -> Response:
+    # "D2:1,D3:0," (sondaki virgül firmware'den gelir)
+    parts = line.rstrip(',').replace(',', ':').split(':')
+    if len(parts) % 2:
+        raise ValueError(line)
+    values = dict(zip(map(_DIGITAL_LABELS.__getitem__, parts[0::2]), map(int, parts[1::2])))
+    return Response("digital", {"values": values}, line)
+
+
+def _parse_analog(line: str) -> Response:
+    # "A0:123,A1:456,..."
+    parts = line.replace(',', ':').split(':')
+    if len(parts) % 2:
+        raise ValueError(line)
+    return Response("analog", {"values": dict(zip(parts[0::2], map(int, parts[1::2])))}, line)
+
+
+def _parse_stat(line: str) -> Response:
+    # "2:0:1,3:1:1,...,A0:0:0,...,A5:0:1" ya da TEST yanıtı "1"
+    if line == "1":
+        return Response("test", {}, line)
+    parts = line.replace(',', ':').split(':')
+    if len(parts) % 3 or line.count(',') + 1 != len(parts) // 3:
+        raise ValueError(line)
+    entries = list(zip(map(_PIN_LABELS.__getitem__, parts[0::3]), map(int, parts[1::3]), map(int, parts[2::3])))
+    return Response("stat", {"entries": entries}, line)
+
+
+# İlk karakter yanıt tipini belirler: P(IN), C(APS), M(ODES), W(RITE), D.., A.., rakam (STAT/TEST)
+_PARSERS = {"P": _parse_pin, "C": _parse_caps, "M": _parse_batch, "W": _parse_batch,
+            "D": _parse_digital, "A": _parse_analog}
+_PARSERS.update({d: _parse_stat for d in "0123456789"})
+
+
+def parse_response(line: str) -> Response:
+    """Firmware'den gelen tek bir satırı ayrıştır"""
+    line = line.strip()
+    if not line:
+        return Response("ack", {}, line)
+    handler = _PARSERS.get(line[0])
+    if handler is not None:
+        try:
+            return handler(line)
+        except (KeyError, ValueError, IndexError):
+            pass
+    return Response("raw", {}, line)
+
+
+# ---------------------------------------------------------------------------
+# Codec'ler
+# ---------------------------------------------------------------------------
+
+def pin_label(pin: int) -> str:
+    """14 -> 'A0', 7 -> '7' (firmware'deki pinLabel ile aynı)"""
+    if ANALOG_PIN_BASE <= pin < ANALOG_PIN_BASE + 6:
+        return f"A{pin - ANALOG_PIN_BASE}"
+    return str(pin)
+
+
+class TextCodec:
+    """Satır tabanlı metin protokolü; use_seq ise "#<seq> " etiketi kullanılır"""
+
+    name = "text"
+
+    def __init__(self, use_seq: bool = False):
+        self.sequenced = use_seq
+        self._buffer = bytearray()
+
+    def encode(self, text: str, seq: Optional[int] = None) -> bytes:
+        if self.sequenced and seq:
+            text = f"#{seq} {text}"
+        return text.encode('utf-8')
+
+    @staticmethod
+    def fits(text: str) -> bool:
+        """Metin modunda firmware satırı String ile okur; sabit sınır yok"""
+        return True
+
+    def feed(self, data: bytes) -> List[Tuple[Optional[int], str]]:
+        """Gelen baytları ekle, tamamlanan (seq, satır) çiftlerini döndür.
+        Satır içermeyen parça yalnızca tampona eklenir; tamamlanan satırlar
+        tek decode ve tek split ile ayrılır, yarım satır tamponda kalır.
+        """
+        buf = self._buffer
+        buf += data
+        end = buf.rfind(b'\n')
+        if end < 0:
+            return []
+        text = buf[:end].decode('utf-8', errors='ignore')
+        del buf[:end + 1]
+        sequenced = self.sequenced
+        out: List[Tuple[Optional[int], str]] = []
+        for line in text.split('\n'):
+            if sequenced and line[:1] == '#':
+                # "#<seq> <yanıt>" veya yalnızca "#<seq>" (çıktısız komut onayı)
+                tag, _, line = line.partition(' ')
+                tag = tag[1:].strip()
+                out.append((int(tag) if tag.isdigit() else None, line.strip()))
+                continue
+            line = line.strip()
+            if line:
+                out.append((None, line))
+        return out
+
+
+# İkili protokol opcode'ları (Test_real.ino ile aynı)
+(OP_TEST, OP_MODE, OP_DWRITE, OP_PWM, OP_ALL, OP_STAT, OP_DIG, OP_ANA, OP_TEXT,
+ OP_MODES, OP_WRITE) = range(0x01, 0x0C)
+(OP_R_ACK, OP_R_DIGITAL, OP_R_PWM, OP_R_MODE, OP_R_ALL, OP_R_DIG, OP_R_ANA, OP_R_STAT, OP_R_TEXT,
+ OP_R_BATCH) = range(0x81, 0x8B)
+
+_SIMPLE_OPS = {"TEST": OP_TEST, "STAT": OP_STAT, "DIG": OP_DIG, "ANA": OP_ANA}
+_MODE_LABELS = {0: "IN", 1: "OUT", 2: "PAS"}
+_BATCH_OPS = {"MODES": OP_MODES, "WRITE": OP_WRITE}
+_BATCH_NAMES = ("MODES", "WRITE")
+_MODE_WORDS = {"0": 0, "IN": 0, "INPUT": 0, "1": 1, "OUT": 1, "OUTPUT": 1, "2": 2, "PAS": 2, "PASS": 2, "PASIF": 2}
+
+
+def _make_crc8_table() -> bytes:
+    table = bytearray(256)
+    for i in range(256):
+        c = i
+        for _ in range(8):
+            c = ((c << 1) ^ 0x07) & 0xFF if c & 0x80 else (c << 1) & 0xFF
+        table[i] = c
+    return bytes(table)
+
+
+_CRC8_TABLE = _make_crc8_table()
+
+
+def crc8(data: bytes) -> int:
+    """CRC-8 (polinom 0x07, başlangıç 0)"""
+    c = 0
+    for b in data:
+        c = _CRC8_TABLE[c ^ b]
+    return c
+
+
+def cobs_encode(data: bytes) -> bytes:
+    """COBS kodlama. 254 bayttan uzun sıfırsız diziler 0xFF kodlu bloklara
+    bölünür (0xFF bloğundan sonra sıfır eklenmez)."""
+    out = bytearray()
+    for group in bytes(data).split(b'\x00'):
+        while len(group) >= 0xFE:
+            out.append(0xFF)
+            out.extend(group[:0xFE])
+            group = group[0xFE:]
+        out.append(len(group) + 1)
+        out.extend(group)
+    return bytes(out)
+
+
+def cobs_decode(data: bytes) -> bytes:
+    out = bytearray()
+    i, n = 0, len(data)
+    while i < n:
+        code = data[i]
+        if code == 0 or i + code > n:
+            raise ValueError("Geçersiz COBS çerçevesi")
+        out.extend(data[i + 1:i + code])
+        i += code
+        if i < n and code != 0xFF:
+            out.append(0)
+    return bytes(out)
+
+
+class BinaryCodec:
+    """COBS çerçeveli, CRC8 korumalı ikili protokol"""
+
+    name = "binary"
+    sequenced = True
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.crc_errors = 0
+
+    # ---- Gönderim ----
+    @staticmethod
+    def pack(text: str) -> Tuple[int, bytes]:
+        """Metin komutu (opcode, payload) ikilisine çevir; bilinmeyenler OP_TEXT"""
+        cmd = text.strip()
+        try:
+            if cmd in _SIMPLE_OPS:
+                return _SIMPLE_OPS[cmd], b""
+            name, _, body = cmd.partition(' ')
+            if name in _BATCH_OPS:
+                payload = bytearray()
+                for ent in body.split(','):
+                    pin, value = ent.split(':')
+                    payload += bytes((int(pin), int(value)))
+                return _BATCH_OPS[name], bytes(payload)
+            if cmd.startswith("MODE "):
+                pin, mode = cmd[5:].split(',')
+                return OP_MODE, bytes((int(pin), _MODE_WORDS[mode.strip().upper()]))
+            if cmd.startswith("PWM "):
+                pin, value = cmd[4:].split(',')
+                return OP_PWM, bytes((int(pin), int(value)))
+            if cmd.startswith("ALL "):
+                return OP_ALL, bytes((1 if int(cmd[4:]) else 0,))
+            if cmd[:1].isdigit() and ',' in cmd:
+                pin, state = cmd.split(',')
+                return OP_DWRITE, bytes((int(pin), 1 if int(state) else 0))
+        except (ValueError, KeyError):
+            pass
+        return OP_TEXT, cmd.encode('utf-8')
+
+    def encode(self, text: str, seq: Optional[int] = None) -> bytes:
+        opcode, payload = self.pack(text)
+        frame = bytes((opcode, seq or 0)) + payload
+        return cobs_encode(frame + bytes((crc8(frame),))) + b'\x00'
+
+    def fits(self, text: str) -> bool:
+        """Çerçeve (0x00 hariç) firmware'in rxBuf'ına sığar mı? Sığmayanı
+        firmware taşma olarak sessizce atar."""
+        return len(self.encode(text)) - 1 <= RX_BUFFER_SIZE
+
+    # ---- Alım ----
+    def feed(self, data: bytes) -> List[Tuple[Optional[int], str]]:
+        buf = self._buffer
+        buf += data
+        end = buf.rfind(b'\x00')
+        if end < 0:
+            return []
+        frames = bytes(buf[:end]).split(b'\x00')
+        del buf[:end + 1]
+        out: List[Tuple[Optional[int], str]] = []
+        for raw in frames:
+            decoded = self.decode_frame(raw)
+            if decoded is not None:
+                out.append(decoded)
+        return out
+
+    def decode_frame(self, raw: bytes) -> Optional[Tuple[Optional[int], str]]:
+        """Tek COBS çerçevesini (seq, metin satırı) olarak çöz; bozuksa None"""
+        try:
+            frame = cobs_decode(raw)
+        except ValueError:
+            self.crc_errors += 1
+            return None
+        if len(frame) < 3 or crc8(frame[:-1]) != frame[-1]:
+            self.crc_errors += 1
+            return None
+        opcode, seq, payload = frame[0], frame[1], frame[2:-1]
+        try:
+            line = self.render(opcode, payload)
+        except (IndexError, struct.error):
+            self.crc_errors += 1
+            return None
+        return (seq or None), line
+
+    @staticmethod
+    def render(opcode: int, p: bytes) -> str:
+        """Yanıt çerçevesini metin firmware'inin ürettiği satıra çevir"""
+        if opcode == OP_R_ACK:
+            return ""
+        if opcode == OP_R_DIGITAL:
+            return f"PIN {pin_label(p[0])} : {'ON' if p[1] else 'OFF'}"
+        if opcode == OP_R_PWM:
+            return f"PIN {pin_label(p[0])} : {p[1]}"
+        if opcode == OP_R_MODE:
+            return f"PIN {pin_label(p[0])}:{_MODE_LABELS.get(p[1], 'IN')}"
+        if opcode == OP_R_ALL:
+            return f"PIN ALL: {'ON' if p[0] else 'OFF'}"
+        if opcode == OP_R_BATCH:
+            return f"{_BATCH_NAMES[p[0]]} OK {p[1]}"
+        if opcode == OP_R_DIG:
+            mask = int.from_bytes(p[0:3], 'little')
+            values = int.from_bytes(p[3:6], 'little')
+            return "".join(f"D{pin}:{(values >> pin) & 1}," for pin in range(2, 20) if mask >> pin & 1)
+        if opcode == OP_R_ANA:
+            return ",".join(f"A{i}:{v}" for i, v in enumerate(struct.unpack('<6H', p[:12])))
+        if opcode == OP_R_STAT:
+            return ",".join(f"{pin_label(pin)}:{p[2 * i]}:{p[2 * i + 1]}" for i, pin in enumerate(range(2, 20)))
+        return p.decode('utf-8', errors='ignore').strip()
+
+
+def coalesce_key(text: str) -> Optional[Tuple[str, int]]:
+    """Aynı pine yazan komutlar için birleştirme anahtarı ("PWM 9,10" ve
+    "9,1" -> ("out", 9)); birleştirilemeyen komutlar için None"""
+    try:
+        if text.startswith("PWM "):
+            return "out", int(text[4:].split(',', 1)[0])
+        if text[:1].isdigit() and ',' in text:
+            return "out", int(text.split(',', 1)[0])
+    except ValueError:
+        pass
+    return None
+
+
+def format_batch(name: str, values: Dict[int, int]) -> str:
+    """Toplu komut metni, ör. format_batch("MODES", {2: 1, 3: 0}) -> 'MODES 2:1,3:0'"""
+    return f"{name} " + ",".join(f"{pin}:{value}" for pin, value in values.items())
@@ -0,0 +1,316 @@
+"""core.send_queue
+Seri hatta gönderilecek komutlar için sınırlı (bounded) gönderim kuyruğu.
+    • İki öncelik şeridi vardır: URGENT (ALL, HIL güvenlik çıkışları) ve
+      NORMAL (slider, pattern adımları, sorgular). Acil komutlar normal
+      trafiğin önüne geçer; normal şerit aç kalmasın diye art arda
+      urgent_burst acil komuttan sonra bir normal komut gönderilir.
+    • Aynı pine giden bekleyen PWM/dijital yazma komutları birleştirilir
+      (coalescing): kuyrukta yalnızca en yeni değer kalır, sırası korunur.
+      Acil bir yazma, aynı pine bekleyen normal yazmayı; acil ALL ise
+      bekleyen tüm normal pin yazmalarını geçersiz kılar (sonradan yazılıp
+      acil değeri ezmesinler diye).
+    • Kuyruk dolduğunda yapılandırılabilir taşma politikası uygulanır:
+        block       : yer açılana kadar (en fazla block_timeout) bekle
+        drop_oldest : en eski bekleyen komutu at (önce normal şeritten)
+        reject      : yeni komutu reddet (put False döner)
+      Acil komut için normal şeritte komut varsa politika ne olursa olsun
+      en eski normal komut atılarak yer açılır.
+    • Komut isteğe bağlı bir yaşam süresi (ttl, saniye) taşıyabilir. Süresi
+      dolan komut hatta yazılmadan atılır ve expired_count'a sayılır;
+      bağlantı geride kaldığında kart geçmişi değil güncel durumu alır.
+queue.Queue ile aynı get()/put() arayüzünü sunar; OutgoingCommand olmayan
+nesneler (ör. thread durdurma işaretleri) sınır ve birleştirme dışında tutulur.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Deque, Dict, List, Optional, Tuple
+
+from core.protocol import coalesce_key
+
+BLOCK = "block"
+DROP_OLDEST = "drop_oldest"
+REJECT = "reject"
+OVERFLOW_POLICIES = (BLOCK, DROP_OLDEST, REJECT)
+
+# Öncelik şeritleri (küçük değer önce gönderilir)
+URGENT = 0
+NORMAL = 1
+PRIORITY_NAMES = ("urgent", "normal")
+
+
+def default_priority(text: str) -> int:
+    """Öncelik verilmemiş komutun şeridi: ALL acil, diğerleri normal"""
+    return URGENT if text.startswith("ALL ") else NORMAL
+
+
+class OutgoingCommand:
+    """Gönderim kuyruğundaki tek komut (isteğe bağlı yanıt Future'ı ile)"""
+
+    __slots__ = ("text", "future", "timeout", "key", "enqueued_at", "priority", "deadline")
+
+    def __init__(self, text: str, future: Optional[Future] = None, timeout: Optional[float] = None,
+                 priority: Optional[int] = None, ttl: Optional[float] = None):
+        self.text = text
+        self.future = future
+        self.timeout = timeout
+        # Gecikme istatistikleri için (time.perf_counter)
+        self.enqueued_at = time.perf_counter()
+        self.priority = default_priority(text) if priority is None else priority
+        # Bu andan sonra yazılmamışsa komut bayattır (perf_counter, None = süresiz)
+        self.deadline: Optional[float] = None if ttl is None else self.enqueued_at + ttl
+        # Yanıt bekleyen istekler birleştirilmez
+        self.key: Optional[Tuple[str, int]] = None if future else coalesce_key(text)
+
+    def expired(self, now: Optional[float] = None) -> bool:
+        if self.deadline is None:
+            return False
+        return (now or time.perf_counter()) > self.deadline
+
+
+class _LaneStats:
+    __slots__ = ("enqueued", "sent", "dropped", "expired", "wait_total", "wait_max")
+
+    def __init__(self):
+        self.enqueued = 0
+        self.sent = 0
+        self.dropped = 0
+        self.expired = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+
+class SendQueue:
+    """Öncelik şeritli, pin bazında birleştiren, sınırlı gönderim kuyruğu"""
+
+    def __init__(self, maxsize: int = 64, overflow: str = DROP_OLDEST, block_timeout: float = 1.0,
+                 urgent_burst: int = 8):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Bilinmeyen taşma politikası: {overflow}")
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        # Normal şerit beklerken art arda gönderilebilecek acil komut sayısı
+        self.urgent_burst = max(1, urgent_burst)
+        self._lanes: Tuple[Deque[object], Deque[object]] = (deque(), deque())
+        # Şerit başına birleştirme anahtarı -> kuyruktaki bekleyen komut
+        self._by_key: Tuple[Dict[Tuple[str, int], OutgoingCommand], ...] = ({}, {})
+        self._size = 0  # yalnızca OutgoingCommand sayısı
+        self._urgent_streak = 0
+        self._cond = threading.Condition()
+        # İstatistikler
+        self.coalesced_count = 0
+        self.dropped_count = 0
+        self.rejected_count = 0
+        self.superseded_count = 0
+        self.starvation_count = 0  # acil komut beklerken araya alınan normal komutlar
+        self.expired_count = 0  # süresi dolduğu için yazılmadan atılanlar
+        self._lane_stats: List[_LaneStats] = [_LaneStats(), _LaneStats()]
+
+    def qsize(self) -> int:
+        return self._size
+
+    def empty(self) -> bool:
+        return not (self._lanes[URGENT] or self._lanes[NORMAL])
+
+    def lane_depth(self, priority: int) -> int:
+        return sum(1 for item in self._lanes[priority] if isinstance(item, OutgoingCommand))
+
+    def lane_stats(self) -> Dict[str, dict]:
+        """Şerit başına derinlik, sayaçlar ve kuyrukta bekleme süreleri (ms)"""
+        with self._cond:
+            out = {}
+            for lane, name in enumerate(PRIORITY_NAMES):
+                st = self._lane_stats[lane]
+                out[name] = {
+                    'depth': self.lane_depth(lane),
+                    'enqueued': st.enqueued,
+                    'sent': st.sent,
+                    'dropped': st.dropped,
+                    'expired': st.expired,
+                    'wait_avg_ms': round(st.wait_total / st.sent * 1000, 3) if st.sent else 0.0,
+                    'wait_max_ms': round(st.wait_max * 1000, 3),
+                }
+            return out
+
+    def put(self, item, block: Optional[bool] = None) -> bool:
+        """Komutu kuyruğa ekle. Reddedilirse False döner."""
+        with self._cond:
+            if not isinstance(item, OutgoingCommand):
+                # Kontrol işaretleri sınırın dışında, beklemeden iletilir
+                self._lanes[URGENT].append(item)
+                self._cond.notify_all()
+                return True
+            lane = URGENT if item.priority == URGENT else NORMAL
+            by_key = self._by_key[lane]
+            if item.key is not None:
+                pending = by_key.get(item.key)
+                if pending is not None:
+                    # Aynı pine bekleyen yazma var: yalnızca değeri (ve süresini) güncelle
+                    pending.text = item.text
+                    pending.deadline = item.deadline
+                    self.coalesced_count += 1
+                    return True
+            else:
+                # Mod/ALL gibi komutlar bariyerdir: sonraki yazmalar öncekilerle birleşmez
+                by_key.clear()
+            if lane == URGENT:
+                self._supersede(item)
+            if self.maxsize > 0 and self._size >= self.maxsize and not self._make_room(block, lane):
+                self.rejected_count += 1
+                return False
+            self._lanes[lane].append(item)
+            self._size += 1
+            self._lane_stats[lane].enqueued += 1
+            if item.key is not None:
+                by_key[item.key] = item
+            self._cond.notify_all()
+            return True
+
+    def get(self, block: bool = True, timeout: Optional[float] = None):
+        """queue.Queue.get ile aynı; zaman aşımında queue.Empty fırlatır.
+        Süresi dolmuş komutlar atlanır (bkz. expire()).
+        """
+        with self._cond:
+            deadline = None if timeout is None else time.time() + timeout
+            while True:
+                item, lane = self._pop(deadline, block)
+                if not isinstance(item, OutgoingCommand):
+                    return item
+                now = time.perf_counter()
+                if item.expired(now):
+                    self.expire(item)
+                    continue
+                st = self._lane_stats[lane]
+                st.sent += 1
+                wait = now - item.enqueued_at
+                st.wait_total += wait
+                if wait > st.wait_max:
+                    st.wait_max = wait
+                return item
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def requeue(self, item: OutgoingCommand):
+        """get() ile alınıp gönderilemeyen komutu şeridinin başına geri koy.
+        Sınır ve birleştirme uygulanmaz; aynı pine sonradan girmiş yazma
+        varsa o daha yeni olduğundan anahtar onda kalır.
+        """
+        with self._cond:
+            lane = URGENT if item.priority == URGENT else NORMAL
+            self._lanes[lane].appendleft(item)
+            self._size += 1
+            self._lane_stats[lane].sent -= 1
+            if item.key is not None:
+                self._by_key[lane].setdefault(item.key, item)
+            self._cond.notify_all()
+
+    def expire(self, item: OutgoingCommand):
+        """Süresi dolan komutu say ve varsa Future'ını hata ile bitir"""
+        with self._cond:
+            self.expired_count += 1
+            self._lane_stats[URGENT if item.priority == URGENT else NORMAL].expired += 1
+        if item.future is not None and not item.future.done():
+            try:
+                item.future.set_exception(TimeoutError("Komutun süresi gönderilmeden doldu"))
+            except Exception:
+                pass
+
+    def clear(self):
+        """Bekleyen tüm komutları at"""
+        with self._cond:
+            for lane in self._lanes:
+                for item in lane:
+                    if isinstance(item, OutgoingCommand):
+                        self._fail(item, "Gönderim kuyruğu temizlendi")
+                lane.clear()
+            for by_key in self._by_key:
+                by_key.clear()
+            self._size = 0
+            self._cond.notify_all()
+
+    # ----------------- Internal -----------------
+    def _pop(self, deadline: Optional[float], block: bool) -> Tuple[object, int]:
+        """Sıradaki öğeyi (öğe, şerit) olarak çıkar; kilit tutulurken çağrılır"""
+        urgent, normal = self._lanes
+        while not (urgent or normal):
+            if not block:
+                raise queue.Empty
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                raise queue.Empty
+            self._cond.wait(remaining)
+        if urgent and (not normal or self._urgent_streak < self.urgent_burst):
+            lane = URGENT
+            self._urgent_streak = self._urgent_streak + 1 if normal else 0
+        else:
+            lane = NORMAL
+            if urgent:
+                self.starvation_count += 1
+            self._urgent_streak = 0
+        item = self._lanes[lane].popleft()
+        if isinstance(item, OutgoingCommand):
+            self._size -= 1
+            if item.key is not None and self._by_key[lane].get(item.key) is item:
+                del self._by_key[lane][item.key]
+        self._cond.notify_all()
+        return item, lane
+
+    def _supersede(self, item: OutgoingCommand):
+        """Acil yazmadan önce kuyruğa girmiş normal pin yazmalarını at"""
+        if item.key is None and not item.text.startswith("ALL "):
+            return
+        lane = self._lanes[NORMAL]
+        pending = self._by_key[NORMAL]
+        stale = [old for old in lane if isinstance(old, OutgoingCommand) and old.key is not None
+                 and (item.key is None or old.key == item.key)]
+        for old in stale:
+            lane.remove(old)
+            if pending.get(old.key) is old:
+                del pending[old.key]
+            self._size -= 1
+            self.superseded_count += 1
+
+    def _make_room(self, block: Optional[bool], lane: int = NORMAL) -> bool:
+        if lane == URGENT and self._drop_oldest(NORMAL):
+            return True
+        policy = BLOCK if block else self.overflow
+        if policy == REJECT or (policy == BLOCK and block is False):
+            return False
+        if policy == BLOCK:
+            deadline = time.time() + self.block_timeout
+            while self._size >= self.maxsize:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+        # DROP_OLDEST: önce normal şeritten
+        return self._drop_oldest(NORMAL) or self._drop_oldest(URGENT)
+
+    def _drop_oldest(self, lane: int) -> bool:
+        items = self._lanes[lane]
+        for idx, old in enumerate(items):
+            if isinstance(old, OutgoingCommand):
+                del items[idx]
+                self._size -= 1
+                if old.key is not None and self._by_key[lane].get(old.key) is old:
+                    del self._by_key[lane][old.key]
+                self.dropped_count += 1
+                self._lane_stats[lane].dropped += 1
+                self._fail(old, "Gönderim kuyruğu dolu: komut atıldı")
+                return True
+        return False
+
+    @staticmethod
+    def _fail(item: OutgoingCommand, reason: str):
+        if item.future is not None and not item.future.done():
+            try:
+                item.future.set_exception(queue.Full(reason))
+            except Exception:
+                pass
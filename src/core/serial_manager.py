@@ -3,53 +3,118 @@ import time
 import serial
 import serial.tools.list_ports
 import queue
-from typing import Optional, Callable, List
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Callable, Dict, List, Set
 from datetime import datetime
 import json
 import os
-from core.config import get_config_path
+from core.config import get_config_path, PWM_DIGITAL_PINS
+from core.send_queue import URGENT, OutgoingCommand, SendQueue
+from core.protocol import (BinaryCodec, RX_BUFFER_SIZE, Response, TextCodec, format_batch, parse_response,
+                           pin_number)
+from core.transport import boot_delay, open_transport
+from core.link_stats import LinkStats
+from core.listener_queue import DEFAULT_MAXSIZE, DROP_OLDEST, QueuedListener
 
 class SerialManager:
     """Merkezi serial haberleşme yöneticisi"""
     
+    # Port taramasında aynı anda denenecek en fazla port sayısı
+    MAX_PARALLEL_PROBES = 8
+    # BAUD pazarlığında önerilen hızlar (yüksekten düşüğe) ve firmware'in
+    # yeni hızda TEST beklediği süre (Test_real.ino: BAUD_CONFIRM_MS + pay)
+    BAUD_RATES = (1000000, 250000, 115200)
+    BAUD_CONFIRM_TIMEOUT = 1.1
+    
     _instance = None
     _lock = threading.Lock()
+    # Süreçteki tüm yöneticilerin kullandığı portlar; taramada atlanır ki
+    # birden çok kart sürülürken bir yönetici diğerinin portunu denemesin
+    _ports_in_use: Set[str] = set()
     
-    def __new__(cls):
+    def __new__(cls, name: Optional[str] = None):
+        if name is not None:
+            # Adlandırılmış örnekler bağımsızdır (bkz. core.device_registry)
+            return super().__new__(cls)
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:
                     cls._instance = super().__new__(cls)
         return cls._instance
     
-    def __init__(self):
+    def __init__(self, name: Optional[str] = None):
         if hasattr(self, '_initialized'):
             return
         
         self._initialized = True
+        # Cihaz adı; None ise uygulama genelindeki varsayılan yönetici
+        self.name = name
         
         # Serial connection
         self.serial_port: Optional[serial.Serial] = None
         self.serial_thread: Optional[SerialThread] = None
         self.is_connected = False
         self.port_name = "COM4"
+        # El sıkışma (TEST/CAPS) hızı; kart resetlendiğinde firmware bu hızla açılır
         self.baudrate = 9600
+        # Hattın o anki hızı (BAUD pazarlığından sonra daha yüksek olabilir)
+        self.link_baudrate = self.baudrate
+        # Firmware BAUD yeteneği bildiriyorsa önerilecek en yüksek hız (None = pazarlık yok).
+        # 1000000'de firmware loop()'u yavaşsa 64 baytlık RX tamponu taşabilir;
+        # varsayılan bu yüzden 250000, daha yüksek hız isteğe bağlıdır.
+        self.preferred_baudrate: Optional[int] = 250000
+        
+        # Pipeline: yanıtı beklenen en fazla kaç komut hatta olabilir.
+        # Arduino'nun 64 baytlık RX tamponunu taşırmamak için küçük tutulur.
+        self.window_size = 4
+        # Firmware kimliği ve yetenekleri (TEST sonrası CAPS ile öğrenilir)
+        self.firmware_id: Optional[str] = None
+        self.firmware_caps: Set[str] = set()
+        # Firmware destekliyorsa ikili (COBS + CRC8) protokole geç
+        self.prefer_binary = True
+        self.protocol = "text"
         
         # Son başarılı port bilgisini yükle
         self.last_successful_port = None
+        # Son cihazın USB parmak izi (vid, pid, serial_number, location) + firmware kimliği
+        self.last_device: Optional[dict] = None
         self._load_last_successful_port()
         
         # Queues
-        self.send_queue = queue.Queue()
+        # Gönderim kuyruğu sınırlıdır; aynı pine bekleyen yazmalar birleştirilir.
+        # Taşma politikası send_queue.overflow ile değiştirilebilir (block/drop_oldest/reject).
+        self.send_queue = SendQueue(maxsize=64, overflow="drop_oldest")
         self.receive_queue = queue.Queue()
+        # Alınan satırları callback'lere gelir gelmez ileten thread (ilk bağlantıda başlar)
+        self._dispatcher: Optional[MessageDispatcher] = None
         
         # Callbacks
         self.message_callbacks: List[Callable[[str, str], None]] = []
+        # queued=True ile eklenen callback -> kendi kuyruğuyla çalışan sarmalayıcı
+        self._queued_callbacks: Dict[Callable[[str, str], None], QueuedListener] = {}
         self.connection_callbacks: List[Callable[[bool], None]] = []
+        # Otomatik yeniden bağlantı başarılı olduğunda çağrılır (durum geri yükleme için)
+        self.reconnect_callbacks: List[Callable[[], None]] = []
+        
+        # Bağlantı koparsa geri çekilmeli (backoff) otomatik yeniden bağlan
+        self.auto_reconnect = True
+        self._reconnect_supervisor: Optional[ReconnectSupervisor] = None
         
         # Statistics
         self.sent_count = 0
         self.received_count = 0
+        self.link_stats = LinkStats()
+    
+    def _config_section(self, config: dict) -> dict:
+        """Bu yöneticinin port bilgisinin tutulduğu bölüm.
+        Varsayılan yönetici kök anahtarları, adlandırılmış cihazlar
+        config["devices"][ad] bölümünü kullanır.
+        """
+        if self.name is None:
+            return config
+        return config.setdefault("devices", {}).setdefault(self.name, {})
     
     def _load_last_successful_port(self):
         """Son başarılı port bilgisini dosyadan yükle"""
@@ -57,8 +122,9 @@ class SerialManager:
             config_path = get_config_path()
             if os.path.exists(config_path):
                 with open(config_path, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+                    config = self._config_section(json.load(f))
                     self.last_successful_port = config.get("last_successful_port")
+                    self.last_device = config.get("last_device")
         except Exception:
             pass
     
@@ -71,20 +137,36 @@ class SerialManager:
                 with open(config_path, 'r', encoding='utf-8') as f:
                     config = json.load(f)
             
-            config["last_successful_port"] = self.last_successful_port
+            section = self._config_section(config)
+            section["last_successful_port"] = self.last_successful_port
+            section["last_device"] = self.last_device
             
             with open(config_path, 'w', encoding='utf-8') as f:
                 json.dump(config, f, indent=2, ensure_ascii=False)
         except Exception:
             pass
     
-    def add_message_callback(self, callback: Callable[[str, str], None]):
-        """Mesaj alındığında çağrılacak callback ekle"""
+    def add_message_callback(self, callback: Callable[[str, str], None], queued: bool = False,
+                             overflow: str = DROP_OLDEST, maxsize: int = DEFAULT_MAXSIZE):
+        """Mesaj alındığında çağrılacak callback ekle.
+        queued=True: callback kendi sınırlı kuyruğu ve thread'inde çalışır
+        (yavaş log/GUI dağıtıcıyı bekletmez); kuyruk dolunca overflow uygulanır.
+        """
+        if queued:
+            if callback in self._queued_callbacks:
+                return
+            wrapper = QueuedListener(callback, maxsize, overflow)
+            self._queued_callbacks[callback] = wrapper
+            callback = wrapper
         if callback not in self.message_callbacks:
             self.message_callbacks.append(callback)
     
     def remove_message_callback(self, callback: Callable[[str, str], None]):
         """Mesaj callback'ini kaldır"""
+        wrapper = self._queued_callbacks.pop(callback, None)
+        if wrapper is not None:
+            wrapper.close()
+            callback = wrapper
         if callback in self.message_callbacks:
             self.message_callbacks.remove(callback)
     
@@ -98,6 +180,16 @@ class SerialManager:
         if callback in self.connection_callbacks:
             self.connection_callbacks.remove(callback)
     
+    def add_reconnect_callback(self, callback: Callable[[], None]):
+        """Otomatik yeniden bağlantıdan sonra çağrılacak callback ekle"""
+        if callback not in self.reconnect_callbacks:
+            self.reconnect_callbacks.append(callback)
+    
+    def remove_reconnect_callback(self, callback: Callable[[], None]):
+        """Yeniden bağlantı callback'ini kaldır"""
+        if callback in self.reconnect_callbacks:
+            self.reconnect_callbacks.remove(callback)
+    
     def get_available_ports(self) -> List[str]:
         """Gerçekten mevcut (takılı) seri portları döndürür"""
         try:
@@ -105,99 +197,375 @@ class SerialManager:
         except Exception:
             return []
     
+    @staticmethod
+    def _port_fingerprint(port_info) -> Optional[dict]:
+        """list_ports girdisinden USB parmak izi (USB olmayan portlar için None)"""
+        if getattr(port_info, "vid", None) is None:
+            return None
+        return {
+            "vid": port_info.vid,
+            "pid": port_info.pid,
+            "serial_number": port_info.serial_number,
+            "location": port_info.location,
+        }
+    
+    @staticmethod
+    def _fingerprint_matches(saved: dict, current: Optional[dict]) -> bool:
+        if not saved or not current:
+            return False
+        if (saved.get("vid"), saved.get("pid")) != (current["vid"], current["pid"]):
+            return False
+        # Seri numarası varsa kesin eşleşme, yoksa USB konumuna (hub portu) bak
+        if saved.get("serial_number") and current["serial_number"]:
+            return saved["serial_number"] == current["serial_number"]
+        return bool(saved.get("location")) and saved.get("location") == current["location"]
+    
+    def _find_known_device(self) -> Optional[str]:
+        """Kayıtlı parmak izine uyan, şu an takılı portu döndür"""
+        if not self.last_device:
+            return None
+        try:
+            for info in serial.tools.list_ports.comports():
+                if self._fingerprint_matches(self.last_device, self._port_fingerprint(info)):
+                    return info.device
+        except Exception:
+            pass
+        return None
+    
+    def _remember_device(self, port: str):
+        """Bağlanılan portun parmak izini firmware kimliğiyle birlikte kaydet"""
+        self.last_successful_port = port
+        fingerprint = None
+        try:
+            for info in serial.tools.list_ports.comports():
+                if info.device == port:
+                    fingerprint = self._port_fingerprint(info)
+                    break
+        except Exception:
+            pass
+        if fingerprint:
+            fingerprint["port"] = port
+            fingerprint["firmware_id"] = self.firmware_id
+            fingerprint["baudrate"] = self.link_baudrate
+            self.last_device = fingerprint
+        self._save_last_successful_port()
+    
+    def _open_without_reset(self, port: str, timeout: float = 0.1, baudrate: Optional[int] = None):
+        """Portu DTR/RTS düşük tutularak aç (çoğu kartta otomatik reset olmaz)"""
+        return open_transport(port, baudrate or self.baudrate, timeout, reset=False)
+    
+    def _fast_connect(self, port: str, timeout: float = 0.5, cancel: Optional[threading.Event] = None) -> bool:
+        """Bilinen cihaza reset beklemeden bağlan; TEST yanıtı yoksa False.
+        Kart resetlenmediyse firmware hâlâ son pazarlık edilen hızda ve
+        protokolde olabilir; önce o hız, sonra el sıkışma hızı denenir.
+        cancel set edildiyse (disconnect) port bağlanmadan kapatılır.
+        """
+        rates = []
+        # Kopan oturumun hızı, kayıtlı cihazın hızı, el sıkışma hızı
+        for rate in (self.link_baudrate, (self.last_device or {}).get("baudrate"), self.baudrate):
+            if rate and rate not in rates:
+                rates.append(rate)
+        for rate in rates:
+            port_obj = None
+            try:
+                port_obj = self._open_without_reset(port, baudrate=rate)
+                port_obj.reset_input_buffer()
+                # Önceki oturumdan ikili modda kalmış kart metin TEST'ini görmez:
+                # önce çerçeveli PROTO TEXT gönderilir. Metin modundaki kart için
+                # araya giren '\n' çerçeveyi tek bir geçersiz satırda bırakır.
+                port_obj.write(BinaryCodec().encode("PROTO TEXT") + b"\nTEST\n")
+                port_obj.flush()
+                deadline = time.time() + timeout
+                while time.time() < deadline:
+                    line = port_obj.readline().rsplit(b'\x00', 1)[-1]
+                    if line.decode('utf-8', errors='ignore').strip() == "1":
+                        if cancel is not None and cancel.is_set():
+                            self._close_quietly(port_obj)
+                            return False
+                        self._attach_port(port_obj, port)
+                        return True
+            except Exception:
+                pass
+            self._close_quietly(port_obj)
+        # Kart yine de resetlendiyse ya da cihaz farklıysa tam taramaya düş
+        return False
+    
     def find_arduino_port(self, timeout: float = 3.0) -> Optional[str]:
-        """Arduino portunu bul - basit ve hızlı"""
+        """Arduino portunu bul - tüm aday portlar paralel denenir.
+        Kayıtlı USB parmak izine uyan cihaz varsa önce reset beklemeden ona
+        bağlanılır. Aksi halde ilk TEST yanıtı veren port kazanır; diğer
+        denemeler iptal edilip kapatılır.
+        """
         # Eğer zaten bağlıysa, mevcut portu döndür
         if self.is_connected:
             return self.port_name
+        
+        # Hızlı yol: parmak izi eşleşen cihaza doğrudan bağlan
+        known_port = self._find_known_device()
+        if known_port and self._fast_connect(known_port):
+            self._remember_device(known_port)
+            return known_port
             
-        available_ports = self.get_available_ports()
+        # Başka bir yöneticinin kullandığı portlar denenmez
+        available_ports = [p for p in self.get_available_ports() if p not in self._ports_in_use]
         
         if not available_ports:
             return None
         
-        # Son başarılı portu ilk sıraya al
+        # Son başarılı portu ilk sıraya al (havuzda ilk o başlar)
         if self.last_successful_port and self.last_successful_port in available_ports:
             available_ports.remove(self.last_successful_port)
             available_ports.insert(0, self.last_successful_port)
         
-        for port in available_ports:
-            if self._test_port_quick(port, timeout):
-                self.last_successful_port = port
-                self._save_last_successful_port()
-                return port
+        cancel = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=min(self.MAX_PARALLEL_PROBES, len(available_ports)),
+                                      thread_name_prefix="PortProbe")
+        futures = {executor.submit(self._probe_port, port, timeout, cancel): port for port in available_ports}
+        # İlk açık portu dönen deneme kazanır; kazanan seçildikten sonra (iptal
+        # işareti görülmeden) yanıt almış diğer denemelerin portları kapatılır
+        winner: list = []
+        remaining = [len(futures)]
+        lock = threading.Lock()
+        settled = threading.Event()
+
+        def _on_probe_done(future):
+            port_obj = None if future.cancelled() else future.result()
+            with lock:
+                remaining[0] -= 1
+                won = port_obj is not None and not winner
+                if won:
+                    winner.append((futures[future], port_obj))
+                if won or remaining[0] == 0:
+                    settled.set()
+            if won:
+                cancel.set()
+            elif port_obj is not None:
+                self._close_quietly(port_obj)
+
+        found_port = None
+        try:
+            for future in futures:
+                future.add_done_callback(_on_probe_done)
+            settled.wait()
+            if winner:
+                found_port, port_obj = winner[0]
+                for other in futures:
+                    other.cancel()  # Henüz başlamamış denemeler
+                self._attach_port(port_obj, found_port)
+        finally:
+            cancel.set()
+            # Kalan denemeler iptal işaretini görüp portlarını kendileri kapatır
+            executor.shutdown(wait=False)
         
-        return None
+        if found_port:
+            self._remember_device(found_port)
+        return found_port
+    
+    @staticmethod
+    def _close_quietly(port_obj):
+        try:
+            if port_obj and port_obj.is_open:
+                port_obj.close()
+        except Exception:
+            pass
     
-    def _test_port_quick(self, port: str, timeout: float) -> bool:
-        """Portu hızlıca test et"""
+    def _probe_port(self, port: str, timeout: float, cancel: Optional[threading.Event] = None):
+        """Portu aç, Arduino'nun açılmasını bekle ve TEST gönder.
+        Başarılıysa açık portu, aksi halde (ya da iptal edilirse) None döndürür.
+        """
+        cancel = cancel or threading.Event()
         test_serial = None
         response_received = False
         try:
             # Portu aç
-            test_serial = serial.Serial(port, self.baudrate, timeout=timeout)
-            time.sleep(0.2)  # Kısa bağlantı stabilizasyonu
+            test_serial = open_transport(port, self.baudrate, timeout=0.1)
+            delay = boot_delay(test_serial)
             
             # Port açıldı mı kontrol et
-            if not test_serial.is_open:
-                return False
+            if not test_serial.is_open or cancel.wait(min(0.2, delay)):  # Kısa bağlantı stabilizasyonu
+                return None
             
             # Önce mevcut veriyi temizle
             test_serial.reset_input_buffer()
             test_serial.reset_output_buffer()
             
-            # Arduino'nun tam olarak başlaması için bekle
-            time.sleep(2.0)  # Arduino'nun başlaması için 2 saniye bekle
+            # Arduino'nun tam olarak başlaması için bekle (iptal edilebilir)
+            if cancel.wait(delay):
+                return None
             
             # Test mesajı gönder
-            test_message = "TEST\n"
-            test_serial.write(test_message.encode('utf-8'))
+            test_serial.write(b"TEST\n")
             test_serial.flush()
             
-            # Yanıt bekle
-            start_time = time.time()
-            
-            while time.time() - start_time < timeout:
-                if test_serial.in_waiting:
-                    try:
-                        response = test_serial.readline().decode('utf-8', errors='ignore').strip()
-                        
-                        if response == "1":
-                            response_received = True
-                            break
-                        elif response:  # Boş olmayan başka bir yanıt
-                            pass # Debug mesajları kaldırıldı
-                    except Exception as e:
-                        pass # Debug mesajları kaldırıldı
-                time.sleep(0.1)
-            
-            if response_received:
-                # Test başarılı! Bu bağlantıyı kullan
-                self.serial_port = test_serial
-                self.port_name = port
-                self.is_connected = True
-                
-                # Start serial thread
-                self.serial_thread = SerialThread(self.serial_port, self.send_queue, self.receive_queue)
-                self.serial_thread.start()
-                
-                # Notify callbacks
-                self._notify_connection_callbacks(True)
-                
-                return True
-            
-            return False
+            # Yanıt bekle (readline en fazla port timeout'u kadar bloklar)
+            deadline = time.time() + timeout
+            while time.time() < deadline and not cancel.is_set():
+                response = test_serial.readline().decode('utf-8', errors='ignore').strip()
+                if response == "1":
+                    response_received = True
+                    return test_serial
+            return None
             
-        except Exception as e:
+        except Exception:
             # Port açılamadı
-            return False
+            return None
         finally:
             # Sadece başarısız olursa kapat
-            if not response_received and test_serial and test_serial.is_open:
+            if not response_received:
+                self._close_quietly(test_serial)
+    
+    def _attach_port(self, port_obj, port: str):
+        """TEST'i geçmiş portu aktif bağlantı yap"""
+        # Firmware yeteneklerini öğren (eski firmware yanıt vermez)
+        self._negotiate_features(port_obj)
+        
+        # Test başarılı! Bu bağlantıyı kullan
+        self.serial_port = port_obj
+        self._ports_in_use.discard(self.port_name)  # Cihaz başka porta geçmiş olabilir
+        self.port_name = port
+        self.is_connected = True
+        self._ports_in_use.add(port)
+        
+        # Start serial thread
+        self._start_serial_thread()
+        
+        # Notify callbacks
+        self._notify_connection_callbacks(True)
+    
+    def _test_port_quick(self, port: str, timeout: float, cancel: Optional[threading.Event] = None) -> bool:
+        """Tek portu test et ve başarılıysa bağlan"""
+        port_obj = self._probe_port(port, timeout, cancel)
+        if port_obj is None:
+            return False
+        if cancel is not None and cancel.is_set():
+            self._close_quietly(port_obj)
+            return False
+        self._attach_port(port_obj, port)
+        return True
+    
+    def _query_line(self, port_obj, command: str, prefix: str, timeout: float = 0.5) -> Optional[str]:
+        """Komutu gönder ve prefix ile başlayan ilk satırı döndür (yoksa None)"""
+        old_timeout = port_obj.timeout
+        try:
+            port_obj.timeout = 0.05
+            port_obj.write(f"{command}\n".encode('utf-8'))
+            port_obj.flush()
+            deadline = time.time() + timeout
+            while time.time() < deadline:
+                line = port_obj.readline().decode('utf-8', errors='ignore').strip()
+                if line.startswith(prefix):
+                    return line
+            return None
+        finally:
+            port_obj.timeout = old_timeout
+    
+    def _negotiate_features(self, port_obj):
+        """TEST el sıkışmasından sonra firmware yeteneklerini sorgula.
+        Beklenen yanıt: "CAPS <kimlik> <yetenek> ..." ör. "CAPS FNSS_TEST/2 SEQ"
+        """
+        self.firmware_id = None
+        self.firmware_caps = set()
+        self.protocol = "text"
+        self.link_baudrate = port_obj.baudrate
+        try:
+            reply = self._query_line(port_obj, "CAPS", "CAPS ")
+        except Exception:
+            reply = None
+        if not reply:
+            return
+        parts = reply.split()
+        if len(parts) >= 2:
+            self.firmware_id = parts[1]
+            self.firmware_caps = {p.upper() for p in parts[2:]}
+        if self.preferred_baudrate and "BAUD" in self.firmware_caps:
+            self._negotiate_baud(port_obj)
+        if self.prefer_binary and "BIN" in self.firmware_caps:
+            self._negotiate_binary(port_obj)
+    
+    def _verify_link(self, port_obj, attempts: int = 3, timeout: float = 0.3) -> bool:
+        """Hız değişiminden sonra hattı TEST ile doğrula (ilk baytlar bozuk olabilir)"""
+        for _ in range(attempts):
+            try:
+                port_obj.reset_input_buffer()
+                if self._query_line(port_obj, "TEST", "1", timeout) == "1":
+                    return True
+            except Exception:
+                return False
+        return False
+    
+    def _negotiate_baud(self, port_obj):
+        """Firmware'e daha yüksek hız öner: "BAUD <hız>" -> "BAUD OK <hız>".
+        İki taraf da yeni hıza geçer ve host TEST ile doğrular. Firmware yeni
+        hızda BAUD_CONFIRM_TIMEOUT içinde TEST almazsa önceki hıza kendisi döner;
+        doğrulama başarısızsa host da önceki hıza döner. Bir hızda doğrulama
+        başarısız olursa (ör. USB-seri köprü desteklemiyor) pazarlık bırakılır;
+        firmware'in reddettiği hızlarda ise bir alt hız denenir.
+        """
+        previous = port_obj.baudrate
+        for rate in self.BAUD_RATES:
+            if rate > self.preferred_baudrate:
+                continue
+            if rate <= previous:
+                break
+            try:
+                if self._query_line(port_obj, f"BAUD {rate}", "BAUD ") != f"BAUD OK {rate}":
+                    continue
+                port_obj.baudrate = rate
+                time.sleep(0.02)  # Firmware'in UART'ı yeniden başlatması için
+                if self._verify_link(port_obj):
+                    self.link_baudrate = rate
+                    return
+                # Geri al: firmware onay gelmeyince eski hıza döner
+                port_obj.baudrate = previous
+                time.sleep(self.BAUD_CONFIRM_TIMEOUT)
+                self._verify_link(port_obj)
+                return
+            except Exception:
                 try:
-                    test_serial.close()
+                    port_obj.baudrate = previous
                 except Exception:
                     pass
+                return
+    
+    def _negotiate_binary(self, port_obj):
+        """İkili çerçeveli moda geç ve bir TEST çerçevesiyle doğrula"""
+        try:
+            if not self._query_line(port_obj, "PROTO BIN", "PROTO BIN"):
+                return
+            codec = BinaryCodec()
+            port_obj.write(codec.encode("TEST", 1))
+            port_obj.flush()
+            deadline = time.time() + 0.5
+            old_timeout = port_obj.timeout
+            port_obj.timeout = 0.05
+            try:
+                while time.time() < deadline:
+                    data = port_obj.read(port_obj.in_waiting or 1)
+                    if data and (1, "1") in codec.feed(data):
+                        self.protocol = "binary"
+                        return
+            finally:
+                port_obj.timeout = old_timeout
+            # Doğrulama başarısız: firmware'i metin moduna geri al
+            port_obj.write(codec.encode("PROTO TEXT"))
+            port_obj.flush()
+        except Exception:
+            self.protocol = "text"
+    
+    def _start_serial_thread(self):
+        """Açık port için okuma/yazma thread'lerini başlat"""
+        self._ensure_dispatcher()
+        if self.protocol == "binary":
+            codec = BinaryCodec()
+        else:
+            codec = TextCodec(use_seq="SEQ" in self.firmware_caps)
+        # Sıra numarası desteklenmiyorsa eski stop-and-wait davranışına dön
+        window = self.window_size if codec.sequenced else 1
+        self.serial_thread = SerialThread(self.serial_port, self.send_queue, self.receive_queue,
+                                          window_size=window, codec=codec,
+                                          on_connection_lost=self.handle_connection_lost,
+                                          stats=self.link_stats)
+        self.serial_thread.start()
     
     def connect(self, port: str = None, baudrate: int = None, test_connection: bool = True) -> bool:
         """Serial bağlantısını aç"""
@@ -221,14 +589,19 @@ class SerialManager:
     def _connect_direct(self, port: str, baudrate: int = None) -> bool:
         """Direkt bağlantı kur (test yapmadan)"""
         try:
-            self.serial_port = serial.Serial(port, self.baudrate, timeout=1)
-            time.sleep(1)  # Connection stabilization
+            self.serial_port = open_transport(port, self.baudrate, timeout=1)
+            time.sleep(min(1.0, boot_delay(self.serial_port)))  # Connection stabilization
             
             self.is_connected = True
+            self._ports_in_use.add(port)
+            # Test yapılmadığı için firmware yetenekleri bilinmiyor
+            self.firmware_id = None
+            self.firmware_caps = set()
+            self.protocol = "text"
+            self.link_baudrate = self.baudrate
             
             # Start serial thread
-            self.serial_thread = SerialThread(self.serial_port, self.send_queue, self.receive_queue)
-            self.serial_thread.start()
+            self._start_serial_thread()
             
             # Notify callbacks
             self._notify_connection_callbacks(True)
@@ -242,6 +615,30 @@ class SerialManager:
 
     def disconnect(self):
         """Serial bağlantısını kapat"""
+        # Kullanıcı isteğiyle kapatılıyor: yeniden bağlanma denemelerini durdur
+        self._stop_reconnect_supervisor()
+        self._detach()
+        # Kalan satırlar iletildikten sonra dağıtıcı thread biter (connect yeniden başlatır)
+        self._stop_dispatcher()
+
+    def shutdown(self):
+        """Yöneticiyi tamamen kapat: bağlantı, dağıtıcı thread ve queued
+        callback thread'leri. Artık kullanılmayacak adlandırılmış yöneticiler
+        (ör. DeviceRegistry.remove) için.
+        """
+        self._stop_reconnect_supervisor()
+        if self.is_connected:
+            self._detach()
+        self._stop_dispatcher()
+        for wrapper in self._queued_callbacks.values():
+            wrapper.close()
+        self._queued_callbacks.clear()
+        self.message_callbacks.clear()
+        self.connection_callbacks.clear()
+        self.reconnect_callbacks.clear()
+
+    def _detach(self):
+        """Thread'leri durdur, portu kapat ve bağlantı kesildi bildir"""
         if self.serial_thread:
             self.serial_thread.stop()
             self.serial_thread = None
@@ -253,10 +650,15 @@ class SerialManager:
                 pass  # Port zaten kapanmış olabilir
         
         self.is_connected = False
+        self._ports_in_use.discard(self.port_name)
         self._notify_connection_callbacks(False)
     
-    def send_message(self, message: str) -> bool:
-        """Mesaj gönder"""
+    def send_message(self, message: str, priority: Optional[int] = None, ttl: Optional[float] = None) -> bool:
+        """Mesaj gönder.
+        priority: URGENT ya da NORMAL (core.send_queue); verilmezse ALL acil,
+        diğer komutlar normal şeride girer.
+        ttl: saniye; bu süre içinde hatta yazılamazsa komut atılır.
+        """
         if not self.is_connected:
             return False
         
@@ -264,8 +666,11 @@ class SerialManager:
             # Add newline if not present
             if not message.endswith('\n'):
                 message += '\n'
+            if not self._fits(message):
+                return False
             
-            self.send_queue.put(message)
+            if not self.send_queue.put(OutgoingCommand(message, priority=priority, ttl=ttl)):
+                return False
             self.sent_count += 1
             # GÖNDERİLEN MESAJI CALLBACK İLE YAZDIR
             self._notify_message_callbacks("Gönderilen", message.strip())
@@ -275,7 +680,43 @@ class SerialManager:
         except Exception as e:
             return False
     
-    def send_command(self, pin, state):
+    def request(self, message: str, timeout: float = 1.0, priority: Optional[int] = None,
+                ttl: Optional[float] = None) -> Future:
+        """Komut gönder ve yanıtı Future olarak döndür.
+        Future, ayrıştırılmış yanıtla (core.protocol.Response) tamamlanır; ör.
+        request("ANA").result().data["values"]["A0"]. Komut hatta yazıldıktan
+        sonra timeout saniye içinde yanıt gelmezse, ya da ttl verilmişse ve
+        komut ttl saniye içinde yazılamazsa TimeoutError ile biter.
+        Sıra numarası desteklemeyen firmware'de komuttan sonraki ilk satır
+        yanıt kabul edilir. İkili modda çerçevesi firmware'in RX tamponuna
+        (RX_BUFFER_SIZE) sığmayan komut gönderilmez, ValueError ile biter.
+        """
+        future: Future = Future()
+        if not self.is_connected:
+            future.set_exception(ConnectionError("Serial bağlantısı yok"))
+            return future
+        message = message.strip()
+        if not self._fits(message):
+            future.set_exception(ValueError(f"Komut firmware RX tamponuna ({RX_BUFFER_SIZE} bayt) sığmıyor"))
+            return future
+        if not self.send_queue.put(OutgoingCommand(message + '\n', future, timeout, priority, ttl)):
+            future.set_exception(queue.Full("Gönderim kuyruğu dolu"))
+            return future
+        self.sent_count += 1
+        self._notify_message_callbacks("Gönderilen", message)
+        return future
+    
+    def _fits(self, message: str) -> bool:
+        """İkili modda firmware'in rxBuf'ına sığmayan çerçeve kuyruğa alınmaz"""
+        thread = self.serial_thread
+        return thread is None or thread.codec.fits(message.strip())
+
+    async def request_async(self, message: str, timeout: float = 1.0, priority: Optional[int] = None,
+                            ttl: Optional[float] = None) -> Response:
+        """request() için asyncio uyumlu sürüm (priority/ttl request() ile aynı)"""
+        return await asyncio.wrap_future(self.request(message, timeout, priority, ttl))
+    
+    def send_command(self, pin, state, priority: Optional[int] = None, ttl: Optional[float] = None):
         """Pin durumu komutu gönder"""
         # Analog pinler için A0->14, A1->15 ...
         if isinstance(pin, str) and pin.startswith("A"):
@@ -283,9 +724,9 @@ class SerialManager:
         else:
             pin_num = pin
         cmd = f"{pin_num},{state}\n"
-        return self.send_message(cmd)
+        return self.send_message(cmd, priority, ttl)
     
-    def send_pwm_command(self, pin, value):
+    def send_pwm_command(self, pin, value, ttl: Optional[float] = None):
         """PWM komutu gönder"""
         # Pin modunu değiştirme, sadece PWM değerini gönder
         if isinstance(pin, str) and pin.startswith("A"):
@@ -293,7 +734,7 @@ class SerialManager:
         else:
             pin_num = pin
         cmd = f"PWM {pin_num},{value}\n"
-        return self.send_message(cmd)
+        return self.send_message(cmd, ttl=ttl)
     
     def send_mode_command(self, pin, mode):
         """Pin modu komutu gönder"""
@@ -306,22 +747,102 @@ class SerialManager:
 
     # send_all_mode_command kaldırıldı – ALLMODE artık desteklenmiyor
     
+    def send_modes_command(self, modes: dict, timeout: float = 1.0) -> Future:
+        """Birden çok pinin modunu tek çerçevede gönder ("MODES 2:1,3:0,...").
+        modes: {pin: mode}; pin int veya "A0" biçiminde olabilir.
+        Firmware toplu komutu desteklemiyorsa tek tek MODE gönderilir; dönen
+        Future hepsi onaylanınca toplu yanıtla aynı biçimde ("batch", count)
+        tamamlanır, herhangi biri hata verirse o hatayla biter.
+        """
+        return self._send_batch("MODES", "MODE {pin},{value}", modes, timeout)
+    
+    def send_write_command(self, values: dict, timeout: float = 1.0) -> Future:
+        """Birden çok pine tek çerçevede değer yaz ("WRITE 2:1,9:128,...").
+        PWM pinlerine 0-255, diğer pinlere 0/1 yazılır.
+        """
+        return self._send_batch("WRITE", None, values, timeout)
+    
+    def _send_batch(self, name: str, single_fmt: Optional[str], values: dict, timeout: float) -> Future:
+        values = {pin_number(str(pin)): int(value) for pin, value in values.items()}
+        if "BATCH" in self.firmware_caps or not values:
+            # İkili çerçeve (en fazla 20 pin: 45 bayt) her zaman tampona sığar
+            chunks = [values] if self.protocol == "binary" else self._batch_chunks(name, values)
+            if len(chunks) == 1:
+                return self.request(format_batch(name, chunks[0]), timeout)
+            futures = [self.request(format_batch(name, chunk), timeout) for chunk in chunks]
+            return _combine(futures, Response("batch", {"command": name, "count": len(values)}, ""))
+        # Eski firmware: tek tek gönder, sonuçları tek Future'da topla
+        futures = []
+        for pin, value in values.items():
+            if single_fmt:
+                cmd = single_fmt.format(pin=pin, value=value)
+            elif pin in PWM_DIGITAL_PINS:
+                cmd = f"PWM {pin},{value}"
+            else:
+                cmd = f"{pin},{1 if value else 0}"
+            futures.append(self.request(cmd, timeout))
+        return _combine(futures, Response("batch", {"command": name, "count": len(futures)}, ""))
+    
+    @staticmethod
+    def _batch_chunks(name: str, values: dict) -> List[dict]:
+        """Toplu komutu, her parçası "#<seq> " etiketiyle RX tamponuna sığacak şekilde böl"""
+        limit = RX_BUFFER_SIZE - len("#255 \n")
+        chunks, current, size = [], {}, len(name)
+        for pin, value in values.items():
+            entry = len(f" {pin}:{value}")
+            if current and size + entry > limit:
+                chunks.append(current)
+                current, size = {}, len(name)
+            current[pin] = value
+            size += entry
+        chunks.append(current)
+        return chunks
+    
     def send_all_command(self, state: int):
-        """Tüm pinleri aynı anda aç/kapat (state 0 veya 1)"""
+        """Tüm pinleri aynı anda aç/kapat (state 0 veya 1); acil şeritten gider"""
         state = 1 if state else 0
         cmd = f"ALL {state}\n"
-        return self.send_message(cmd)
+        return self.send_message(cmd, URGENT)
     
     def poll_messages(self):
-        """Alınan mesajları işle"""
+        """Alınan mesajları işle.
+        Dağıtıcı thread çalışırken satırlar zaten anında iletildiği için
+        hiçbir şey yapmaz; eski çağıranlarla uyumluluk için duruyor.
+        """
+        if self._dispatcher and self._dispatcher.is_alive():
+            return
         try:
             while True:
                 message = self.receive_queue.get_nowait()
-                self.received_count += 1
-                self._notify_message_callbacks("Alınan", message)
+                if message is MessageDispatcher._WAKE:
+                    # Durmakta olan dağıtıcının işareti: kalanı o iletir
+                    self.receive_queue.put(message)
+                    return
+                self._deliver(message)
         except queue.Empty:
             pass
     
+    def _deliver(self, message: str):
+        """Alınan satırı say ve callback'lere ilet"""
+        self.received_count += 1
+        self._notify_message_callbacks("Alınan", message)
+    
+    def _ensure_dispatcher(self):
+        old = self._dispatcher
+        if old is not None and old.is_alive():
+            if old.running:
+                return
+            # Durdurulan dağıtıcı kuyruktaki satırları bitirsin; iki thread aynı anda dağıtmasın
+            if old is not threading.current_thread():
+                old.join(1.0)
+        self._dispatcher = MessageDispatcher(self)
+        self._dispatcher.start()
+
+    def _stop_dispatcher(self):
+        dispatcher, self._dispatcher = self._dispatcher, None
+        if dispatcher is not None:
+            dispatcher.stop()
+    
     def _notify_message_callbacks(self, source: str, message: str):
         """Mesaj callback'lerini çağır"""
         for callback in self.message_callbacks[:]:  # Copy list to avoid modification during iteration
@@ -339,77 +860,508 @@ class SerialManager:
                 print(f"Connection callback error: {e}")
     
     def get_stats(self) -> dict:
-        """İstatistikleri döndür"""
+        """İstatistikleri döndür.
+        Hat ölçümleri (gecikme, bayt/s, zaman aşımları) stats_snapshot()'tan
+        gelir; her değer tek bir anahtarda bulunur.
+        """
         return {
             'sent_count': self.sent_count,
             'received_count': self.received_count,
             'is_connected': self.is_connected,
             'port_name': self.port_name,
-            'baudrate': self.baudrate,
-            'last_successful_port': self.last_successful_port
+            'baudrate': self.link_baudrate if self.is_connected else self.baudrate,
+            'last_successful_port': self.last_successful_port,
+            'last_device': self.last_device,
+            'firmware_id': self.firmware_id,
+            'protocol': self.protocol,
+            'in_flight': self.serial_thread.window.in_flight if self.serial_thread else 0,
+            'queue_depth': self.send_queue.qsize(),
+            'queue_capacity': self.send_queue.maxsize,
+            'queue_coalesced': self.send_queue.coalesced_count,
+            'queue_dropped': self.send_queue.dropped_count,
+            'queue_rejected': self.send_queue.rejected_count,
+            'queue_superseded': self.send_queue.superseded_count,
+            'queue_expired': self.send_queue.expired_count,
+            'queue_starvation_grants': self.send_queue.starvation_count,
+            'queue_lanes': self.send_queue.lane_stats(),
+            # queued=True ile eklenen mesaj callback'lerinin kuyruk/gecikme ölçümleri
+            'callback_queues': {w.name: w.stats() for w in list(self._queued_callbacks.values())},
+            **self.stats_snapshot()
         }
+
+    def stats_snapshot(self) -> dict:
+        """Hat istatistikleri: komut türü başına gecikme histogramı özetleri,
+        bayt/s, zaman aşımları ve hat doluluğu (bkz. core.link_stats)
+        """
+        return self.link_stats.snapshot(self.link_baudrate if self.is_connected else None)
     
     def reset_stats(self):
         """İstatistikleri sıfırla"""
         self.sent_count = 0
         self.received_count = 0
+        self.link_stats.reset()
+
+    def _notify_reconnect_callbacks(self):
+        """Yeniden bağlantı callback'lerini çağır"""
+        for callback in self.reconnect_callbacks[:]:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Reconnect callback error: {e}")
 
     def handle_connection_lost(self):
+        """I/O thread'i bağlantının koptuğunu bildirdi"""
+        was_connected = self.is_connected
         self.is_connected = False
+        if self.serial_thread:
+            self.serial_thread.stop()
+            self.serial_thread = None
+        if self.serial_port:
+            self._close_quietly(self.serial_port)
         self._notify_connection_callbacks(False)
+        if self.auto_reconnect and was_connected:
+            # Port, yeniden bağlanma süresince bu yöneticiye ayrılmış kalır
+            self._start_reconnect_supervisor()
+        else:
+            self._ports_in_use.discard(self.port_name)
+
+    def _start_reconnect_supervisor(self):
+        if self._reconnect_supervisor and self._reconnect_supervisor.is_alive():
+            return
+        self._reconnect_supervisor = ReconnectSupervisor(self)
+        self._reconnect_supervisor.start()
+
+    def _stop_reconnect_supervisor(self):
+        if self._reconnect_supervisor:
+            self._reconnect_supervisor.stop()
+            self._reconnect_supervisor = None
+
+    def _reconnect_once(self, attempt: int, cancel: Optional[threading.Event] = None) -> bool:
+        """Kopan cihaza tek bir yeniden bağlantı denemesi.
+        İlk denemeler reset beklemeden (DTR düşük) yapılır; kart resetlendiyse
+        sonraki denemelerde tam TEST taraması (açılış beklemeli) kullanılır.
+        cancel: set edilirse (disconnect) bulunan port bağlanmadan kapatılır.
+        """
+        candidates = []
+        for port in (self._find_known_device(), self.port_name):
+            if port and port not in candidates:
+                candidates.append(port)
+        for port in candidates:
+            if attempt < ReconnectSupervisor.FAST_ATTEMPTS:
+                ok = self._fast_connect(port, cancel=cancel)
+            else:
+                ok = self._test_port_quick(port, 1.0, cancel)
+            if ok:
+                self._remember_device(port)
+                return True
+        return False
+
+
+class MessageDispatcher(threading.Thread):
+    """receive_queue'yu bekleyip gelen her satırı hemen callback'lere ileten thread.
+    Okuma thread'i yavaş callback'ler (GUI, log) yüzünden beklemesin diye ayrıdır.
+    Callback'ler bu thread'de çalışır; Tk için gui.tk_dispatch.TkMarshal kullanılır.
+    """
+
+    # stop() çağrısında kuyruğa bırakılan işaret (önceki satırlar yine iletilir)
+    _WAKE = object()
+
+    def __init__(self, manager: SerialManager):
+        super().__init__(daemon=True, name=f"SerialDispatch-{manager.name or 'default'}")
+        self.manager = manager
+        self.running = True
+
+    def run(self):
+        receive_queue = self.manager.receive_queue
+        while True:
+            message = receive_queue.get()
+            if message is self._WAKE:
+                if not self.running:
+                    return
+                continue
+            try:
+                self.manager._deliver(message)
+            except Exception as e:
+                print(f"Dispatch error: {e}")
+
+    def stop(self):
+        self.running = False
+        self.manager.receive_queue.put(self._WAKE)
+
+
+class ReconnectSupervisor(threading.Thread):
+    """Bağlantı koptuğunda üstel geri çekilmeyle yeniden bağlanmayı dener"""
+
+    INITIAL_DELAY = 0.05
+    MAX_DELAY = 5.0
+    # Bu kadar hızlı denemeden sonra kartın resetlendiği varsayılır
+    FAST_ATTEMPTS = 4
+
+    def __init__(self, manager: SerialManager):
+        super().__init__(daemon=True, name="SerialReconnect")
+        self.manager = manager
+        self._stop_event = threading.Event()
+
+    def run(self):
+        delay = self.INITIAL_DELAY
+        attempt = 0
+        while not self._stop_event.wait(delay):
+            if self.manager.is_connected:
+                return
+            try:
+                if self.manager._reconnect_once(attempt, self._stop_event):
+                    if self._stop_event.is_set():
+                        # disconnect() bağlanma sırasında geldi: bağlantıyı geri al
+                        self.manager._detach()
+                        self.manager._stop_dispatcher()
+                    else:
+                        self.manager._notify_reconnect_callbacks()
+                    return
+            except Exception as e:
+                print(f"Reconnect error: {e}")
+            attempt += 1
+            delay = min(delay * 2, self.MAX_DELAY)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def _combine(futures: List[Future], result) -> Future:
+    """Tüm futures bitince result ile, ilk hatada o hatayla tamamlanan Future"""
+    combined: Future = Future()
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def _done(f: Future):
+        error = f.exception() if not f.cancelled() else TimeoutError("Komut iptal edildi")
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if error is not None:
+            _resolve(combined, error=error)
+        elif last:
+            _resolve(combined, result)
+
+    for f in futures:
+        f.add_done_callback(_done)
+    return combined
+
+
+def _resolve(future: Optional[Future], result=None, error: Optional[BaseException] = None):
+    """Future'ı (iptal edilmemişse) tamamla"""
+    if future is None or future.done():
+        return
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except Exception:
+        pass  # Aynı anda iptal edilmiş olabilir
+
+
+class InflightWindow:
+    """Hatta yanıtı beklenen komutları izleyen kayan pencere.
+
+    Sıra numaralı modda yanıtlar "#<seq> ..." etiketiyle eşleştirilir;
+    etiketsiz (kendiliğinden gelen) satırlar pencereyi boşaltmaz. Eski
+    firmware ile (use_seq=False) pencere 1'dir ve gelen her satır en eski
+    komutu tamamlar.
+    """
+
+    # Sıra numaraları 1..255 arasında döner (0 = etiketsiz)
+    SEQ_MODULO = 256
+
+    def __init__(self, size: int, timeout: float, use_seq: bool, stats: Optional[LinkStats] = None):
+        self.size = max(1, int(size))
+        self.timeout = timeout
+        self.use_seq = use_seq
+        self.timeout_count = 0
+        # Gecikme ölçümü (isteğe bağlı): gönderim/yanıt/zaman aşımı olayları
+        self.stats = stats
+        self._cond = threading.Condition()
+        # seq -> (son geçerlilik zamanı, yanıt Future'ı)
+        self._pending: "OrderedDict[int, tuple]" = OrderedDict()
+        self._last_seq = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    @property
+    def free_slots(self) -> int:
+        return self.size - len(self._pending)
+
+    def acquire(self, is_running: Callable[[], bool], future: Optional[Future] = None,
+                timeout: Optional[float] = None, command: Optional[OutgoingCommand] = None) -> Optional[int]:
+        """Pencerede yer açılana kadar bekle ve yeni sıra numarasını ayır"""
+        with self._cond:
+            while is_running():
+                self.expire()
+                if len(self._pending) < self.size:
+                    self._last_seq = self._last_seq % (self.SEQ_MODULO - 1) + 1
+                    deadline = time.time() + max(self.timeout, timeout or 0.0)
+                    self._pending[self._last_seq] = (deadline, future)
+                    if self.stats and command is not None:
+                        self.stats.on_send(self._last_seq, command.text, command.enqueued_at)
+                    return self._last_seq
+                self._cond.wait(self.time_to_expiry())
+            return None
+
+    def release(self, seq: Optional[int] = None) -> tuple:
+        """Yanıt geldi: ilgili (seq yoksa en eski) komutu pencereden çıkar.
+        (eşleşti_mi, Future) döndürür.
+        """
+        with self._cond:
+            if seq is None:
+                if self.use_seq or not self._pending:
+                    return False, None
+                seq, (_, future) = self._pending.popitem(last=False)
+            else:
+                entry = self._pending.pop(seq, None)
+                if entry is None:
+                    return False, None
+                future = entry[1]
+            if self.stats:
+                self.stats.on_reply(seq)
+            self._cond.notify_all()
+            return True, future
+
+    def discard(self, seq: Optional[int]):
+        """Artık beklenmeyen (iptal edilmiş) komutu pencereden çıkar"""
+        with self._cond:
+            if self._pending.pop(seq, None) is not None:
+                if self.stats:
+                    self.stats.on_cancel(seq)
+                self._cond.notify_all()
+
+    def time_to_expiry(self) -> Optional[float]:
+        """En yakın zaman aşımına kalan süre (bekleyen komut yoksa None)"""
+        with self._cond:
+            if not self._pending:
+                return None
+            return max(0.0, min(d for d, _ in self._pending.values()) - time.time())
+
+    def wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def expire(self):
+        # Zaman aşımına uğrayan komutlar: yanıt gelmedi, yerlerini boşalt
+        with self._cond:
+            now = time.time()
+            for seq in [s for s, (d, _) in self._pending.items() if d < now]:
+                _, future = self._pending.pop(seq)
+                self.timeout_count += 1
+                if self.stats:
+                    self.stats.on_timeout(seq)
+                _resolve(future, error=TimeoutError(f"Yanıt zaman aşımı (#{seq})"))
+            self._cond.notify_all()
+
+    def cancel_all(self, error: BaseException):
+        """Bağlantı kapanırken bekleyen tüm istekleri hata ile sonlandır"""
+        with self._cond:
+            pending = list(self._pending.values())
+            self._pending.clear()
+            if self.stats:
+                self.stats.on_cancel()
+            self._cond.notify_all()
+        for _, future in pending:
+            _resolve(future, error=error)
 
 
 class SerialThread(threading.Thread):
-    """Serial haberleşme thread'i"""
-    
-    def __init__(self, serial_port, send_queue, receive_queue):
-        super().__init__(daemon=True)
+    """Serial haberleşme thread'i.
+
+    Okuma bu thread'de, portun zaman aşımlı bloklayan read() çağrısıyla yapılır;
+    veri geldiği anda uyanır. Yazma işini yardımcı SerialWriter thread'i
+    gönderim kuyruğunu bekleyerek yürütür. Böylece gecikme sabit bir uyku
+    süresine değil hattın kendisine bağlıdır.
+    """
+
+    # Boşta iken stop() kontrolü için okuma zaman aşımı (saniye)
+    READ_TIMEOUT = 0.5
+    # Yanıt gelmezse komutun pencereden düşürülmesi için geçen süre
+    RESPONSE_TIMEOUT = 0.3
+
+    def __init__(self, serial_port, send_queue, receive_queue, window_size: int = 1, codec=None,
+                 on_connection_lost: Optional[Callable[[], None]] = None, stats: Optional[LinkStats] = None):
+        super().__init__(daemon=True, name="SerialReader")
+        self.on_connection_lost = on_connection_lost
         self.serial_port = serial_port
         self.send_queue = send_queue
         self.receive_queue = receive_queue
         self.running = True
-        self._waiting_resp = False
-        self._last_send_ts = 0.0
-    
+        # Çerçeveleme: metin satırları (varsayılan) veya COBS ikili çerçeveler
+        self.codec = codec or TextCodec()
+        self.stats = stats
+        self.window = InflightWindow(window_size, self.RESPONSE_TIMEOUT, self.codec.sequenced, stats)
+        self._failed = False
+        self._fail_lock = threading.Lock()
+        try:
+            self.serial_port.timeout = self.READ_TIMEOUT
+        except Exception:
+            pass
+        self._writer = SerialWriter(self)
+
+    def run(self):
+        self._writer.start()
+        while self.running:
+            try:
+                # En az 1 bayt gelene kadar (ya da zaman aşımına kadar) bloklar
+                data = self.serial_port.read(self.serial_port.in_waiting or 1)
+                if not data:
+                    continue
+                if self.stats:
+                    self.stats.on_rx(len(data))
+                for seq, line in self.codec.feed(data):
+                    self._handle_line(seq, line)
+            except Exception as e:
+                if self.running:
+                    self._fail(e)
+                break
+
+    def _handle_line(self, seq: Optional[int], line: str):
+        # Sıra numaralı modda etiketsiz satırlar kendiliğinden gelen mesajlardır
+        if seq is None and self.codec.sequenced:
+            matched, future = False, None
+        else:
+            matched, future = self.window.release(seq)
+        if matched:
+            _resolve(future, parse_response(line))
+        if line:
+            self.receive_queue.put(line)
+
+    def _fail(self, error: Exception):
+        """Okuyucu/yazıcıdan gelen bağlantı hatasını bir kez bildir"""
+        with self._fail_lock:
+            if self._failed:
+                return
+            self._failed = True
+        self.running = False
+        self._writer.running = False
+        self.window.cancel_all(ConnectionError("Serial bağlantısı koptu"))
+        if isinstance(error, (OSError, PermissionError)):
+            # Bağlantı koptu - thread'i durdur ve ana thread'e bildir
+            self.receive_queue.put("Serial thread hatası: Bağlantı koptu")
+        else:
+            self.receive_queue.put(f"Serial thread hatası: {error}")
+        # SerialManager'a bildir
+        if self.on_connection_lost:
+            self.on_connection_lost()
+
+    def stop(self):
+        self.running = False
+        self._writer.stop()
+        self.window.cancel_all(ConnectionError("Serial bağlantısı kapatıldı"))
+        try:
+            # Bloklayan read() çağrısını hemen sonlandır (destekleyen portlarda)
+            self.serial_port.cancel_read()
+        except Exception:
+            pass
+
+
+class SerialWriter(threading.Thread):
+    """Gönderim kuyruğunu bekleyen yazma thread'i.
+
+    Her komut için pencerede yer ayırır; sıra numaralı modda komut
+    "#<seq> " etiketiyle (ikili modda çerçevedeki seq baytıyla) gönderilir
+    ve firmware aynı etiketle yanıt verir. Kuyrukta birden çok komut varsa
+    pencerede yer kaldıkça hepsi tek bir tampona alınır ve tek write/flush
+    ile gönderilir (USB-seri çeviriciler küçük paketlerde yavaştır).
+    """
+
+    # Tek write() çağrısında gönderilecek en fazla bayt: firmware'in RX
+    # tamponu (yüksek hızda patlama bunu aşarsa baytlar kaybolur)
+    MAX_BATCH_BYTES = RX_BUFFER_SIZE
+
+    # stop() çağrısında kuyruğa bırakılan işaret
+    _STOP = object()
+
+    def __init__(self, reader: SerialThread):
+        super().__init__(daemon=True, name="SerialWriter")
+        self.reader = reader
+        self.serial_port = reader.serial_port
+        self.send_queue = reader.send_queue
+        self.window = reader.window
+        self.running = True
+
     def run(self):
-        import sys
         while self.running:
             try:
-                # Sırayla gönder: yanıt gelmeden yenisini yollama
-                if not self._waiting_resp:
-                    try:
-                        message = self.send_queue.get_nowait()
-                        self.serial_port.write(message.encode('utf-8'))
-                        self.serial_port.flush()
-                        self._waiting_resp = True
-                        self._last_send_ts = time.time()
-                    except queue.Empty:
-                        pass
-                # Receive messages
-                if self.serial_port.in_waiting:
-                    line = self.serial_port.readline().decode('utf-8', errors='ignore').strip()
-                    if line:
-                        self.receive_queue.put(line)
-                        self._waiting_resp = False
-                # Timeout: 300 ms içinde yanıt gelmezse beklemeyi bırak
-                if self._waiting_resp and (time.time() - self._last_send_ts) > 0.3:
-                    self._waiting_resp = False
-                time.sleep(0.005)
-            except (OSError, PermissionError) as e:
-                # Bağlantı koptu - thread'i durdur ve ana thread'e bildir
-                self.receive_queue.put(f"Serial thread hatası: Bağlantı koptu")
-                # SerialManager'a bildir
-                from core.serial_manager import serial_manager
-                serial_manager.handle_connection_lost()
+                # Bekleyen yanıt varsa en yakın zaman aşımında uyan, yoksa süresiz bekle
+                command = self.send_queue.get(timeout=self.window.time_to_expiry())
+            except queue.Empty:
+                self.window.expire()
+                continue
+            if command is self._STOP:
+                # Eski bir thread'den kalmış işaret olabilir; yalnızca kendimiz duruyorsak çık
+                continue
+            seq = self.window.acquire(lambda: self.running, command.future, command.timeout, command)
+            if seq is None:
+                # Durdurulurken alınan mesajı yeni bağlantı için şeridinin başına geri koy
+                self.send_queue.requeue(command)
+                break
+            if command.expired():
+                # Pencere beklenirken bayatladı: yazma, yeri bırak
+                self.window.discard(seq)
+                self.send_queue.expire(command)
+                continue
+            try:
+                data = self.reader.codec.encode(command.text, seq)
+            except Exception as e:
+                self._reject(seq, command, e)
+                continue
+            if self.window.free_slots > 0:
+                data = self._drain_into(bytearray(data))
+            try:
+                self.serial_port.write(data)
+                self.serial_port.flush()
+                if self.reader.stats:
+                    self.reader.stats.on_tx(len(data))
+            except Exception as e:
+                self.reader._fail(e)
+                break
+
+    def _drain_into(self, buf: bytearray) -> bytearray:
+        """Pencerede yer kaldıkça kuyruktaki komutları tampona ekle (bloklamaz)"""
+        codec = self.reader.codec
+        while self.window.free_slots > 0 and len(buf) < self.MAX_BATCH_BYTES:
+            try:
+                command = self.send_queue.get_nowait()
+            except queue.Empty:
                 break
+            if command is self._STOP:
+                break
+            try:
+                # En uzun seq etiketiyle sığmıyorsa sonraki yazmaya bırak
+                size = len(codec.encode(command.text, self.window.SEQ_MODULO - 1))
             except Exception as e:
-                self.receive_queue.put(f"Serial thread hatası: {e}")
-                from core.serial_manager import serial_manager
-                serial_manager.handle_connection_lost()
+                self._reject(None, command, e)
+                continue
+            if len(buf) + size > self.MAX_BATCH_BYTES:
+                self.send_queue.requeue(command)
                 break
-    
+            # Yer olduğu için acquire beklemeden döner
+            seq = self.window.acquire(lambda: self.running, command.future, command.timeout, command)
+            if seq is None:
+                self.send_queue.requeue(command)
+                break
+            buf += codec.encode(command.text, seq)
+        return buf
+
+    def _reject(self, seq: Optional[int], command: OutgoingCommand, error: Exception):
+        """Kodlanamayan komut bağlantıyı düşürmez: yerini bırak, isteği hata ile bitir"""
+        if seq is not None:
+            self.window.discard(seq)
+        _resolve(command.future, error=error)
+        print(f"SerialWriter: komut gönderilemedi ({command.text.strip()[:20]}): {error}")
+
     def stop(self):
         self.running = False
+        self.window.wake()
+        # Kuyrukta bekleyen get() çağrısını uyandır
+        self.send_queue.put(self._STOP)
 
 
 # Global instance
@@ -0,0 +1,358 @@
+"""core.transport
+SerialManager'ın bayt taşıyıcısı (transport) katmanı.
+
+SerialManager, AsyncSerialManager ve onların üzerinden HILSerialConnection
+portu doğrudan serial.Serial ile değil open_transport() ile açar. Dönen
+nesne pyserial'in kullandığımız alt kümesini sağlar (read, write, flush,
+readline, in_waiting, timeout, baudrate, is_open, reset_*_buffer,
+cancel_read, close; mümkünse fileno). Port adresi taşıyıcıyı seçer:
+
+    COM3, /dev/ttyACM0, loop://  : pyserial (serial_for_url)
+    tcp://host:port              : ham TCP soketi (ser2net / esp-link tarzı köprüler)
+    pty://                       : Linux PTY çifti; karşı uç peer_name ile
+                                   başka bir sürece (ör. simülatör) verilir
+    pty://sim                    : PTY'nin karşı ucunda FirmwareModel çalışır
+    sim://[ad]                   : süreç içi döngü; FirmwareModel doğrudan beslenir
+
+sim:// ve pty://sim donanım olmadan tam hızda uçtan uca test/benchmark sağlar:
+
+    serial_manager.connect("sim://")
+    model = sim_model()          # pin/analog değerlerini testten ayarlamak için
+"""
+from __future__ import annotations
+
+import os
+import select
+import socket
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import serial
+
+from core.firmware_model import FirmwareModel
+
+# Kart açılışta resetlenir (DTR): bootloader + setup() süresi
+DEFAULT_BOOT_DELAY = 2.0
+
+# sim://<ad> -> model; aynı ad yeniden açıldığında kart "aynı kart" olarak kalır
+_sim_models: Dict[str, FirmwareModel] = {}
+_sim_lock = threading.Lock()
+
+
+def boot_delay(port) -> float:
+    """Port açıldıktan sonra firmware'in hazır olması için beklenecek süre"""
+    return getattr(port, "boot_delay", DEFAULT_BOOT_DELAY)
+
+
+def sim_model(name: str = "") -> FirmwareModel:
+    """sim://<ad> adresinin arkasındaki firmware modelini döndür (yoksa oluştur)"""
+    with _sim_lock:
+        model = _sim_models.get(name)
+        if model is None:
+            model = _sim_models[name] = FirmwareModel()
+        return model
+
+
+def open_transport(url: str, baudrate: int = 9600, timeout: Optional[float] = None,
+                   reset: bool = True):
+    """Adrese uygun taşıyıcıyı açıp döndür.
+    reset=False: pyserial'de DTR/RTS düşük tutulur (kart resetlenmez),
+    sim:// modelinin durumu korunur.
+    """
+    scheme = url.split("://", 1)[0].lower() if "://" in url else ""
+    if scheme == "sim":
+        model = sim_model(url[len("sim://"):])
+        if reset:
+            model.reset()
+        return LoopbackTransport(model, baudrate, timeout)
+    if scheme == "tcp":
+        parts = urlsplit(url)
+        if not parts.hostname or not parts.port:
+            raise ValueError(f"Geçersiz TCP adresi: {url}")
+        return TcpTransport(parts.hostname, parts.port, baudrate, timeout)
+    if scheme == "pty":
+        target = url[len("pty://"):]
+        return PtyTransport(FirmwareModel() if target == "sim" else None, baudrate, timeout)
+
+    port = serial.serial_for_url(url, baudrate, timeout=timeout, do_not_open=True)
+    if not reset:
+        port.dtr = False
+        port.rts = False
+    port.open()
+    return port
+
+
+class Transport:
+    """pyserial dışı taşıyıcıların ortak tabanı.
+    Alt sınıflar _read_available(size, timeout) ve _write() sağlar.
+    """
+
+    boot_delay = DEFAULT_BOOT_DELAY
+
+    def __init__(self, baudrate: int = 9600, timeout: Optional[float] = None):
+        # Gerçek UART yok; LoopbackTransport hızı modelin UART hızıyla karşılaştırır
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.is_open = True
+        self.port = None
+
+    # ----------------- Public API -----------------
+    def read(self, size: int = 1) -> bytes:
+        """pyserial gibi: size bayt gelene ya da timeout dolana kadar bekle"""
+        if not self.is_open:
+            raise serial.PortNotOpenError()
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        data = bytearray()
+        while len(data) < size:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            chunk = self._read_available(size - len(data), remaining)
+            if chunk is None:
+                break  # Zaman aşımı ya da cancel_read()
+            data += chunk
+            if remaining == 0.0:
+                break
+        return bytes(data)
+
+    def readline(self) -> bytes:
+        line = bytearray()
+        while True:
+            c = self.read(1)
+            if not c:
+                break
+            line += c
+            if c == b'\n':
+                break
+        return bytes(line)
+
+    def write(self, data) -> int:
+        if not self.is_open:
+            raise serial.PortNotOpenError()
+        self._write(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def reset_output_buffer(self):
+        pass
+
+    def cancel_read(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read_available(self, size: int, timeout: Optional[float]) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def _write(self, data: bytes):
+        raise NotImplementedError
+
+
+class LoopbackTransport(Transport):
+    """Süreç içi döngü: yazılan baytlar FirmwareModel'e gider,
+    modelin yanıtı okuma tamponuna eklenir. Thread ya da fd kullanmaz.
+    Port hızı modelin UART hızından farklıysa yazılanlar kaybolur.
+    """
+
+    boot_delay = 0.0
+
+    def __init__(self, model: Optional[FirmwareModel] = None, baudrate: int = 9600,
+                 timeout: Optional[float] = None):
+        super().__init__(baudrate, timeout)
+        self.model = model or FirmwareModel()
+        self.port = "sim://"
+        self._rx = bytearray()
+        self._cond = threading.Condition()
+        self._cancelled = False
+        self._broken = False
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self._rx)
+
+    def inject(self, data: bytes):
+        """Kartın kendiliğinden gönderdiği baytları okuma tamponuna ekle"""
+        with self._cond:
+            self._rx += data
+            self._cond.notify_all()
+
+    def unplug(self):
+        """Kablo çekilmiş gibi: sonraki read/write OSError verir"""
+        with self._cond:
+            self._broken = True
+            self._cond.notify_all()
+
+    def reset_input_buffer(self):
+        with self._cond:
+            self._rx.clear()
+
+    def cancel_read(self):
+        with self._cond:
+            self._cancelled = True
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self.is_open = False
+            self._cond.notify_all()
+
+    def _write(self, data: bytes):
+        if self._broken:
+            raise ConnectionResetError("sim: bağlantı koptu")
+        if self.baudrate != self.model.uart_baudrate():
+            return  # Hızlar uyuşmuyor: kart baytları çözemez
+        out = self.model.feed(data)
+        if out:
+            self.inject(out)
+
+    def _read_available(self, size: int, timeout: Optional[float]) -> Optional[bytes]:
+        with self._cond:
+            if not self._rx and not self._cancelled and not self._broken and self.is_open:
+                self._cond.wait(timeout)
+            if self._broken:
+                raise ConnectionResetError("sim: bağlantı koptu")
+            if self._cancelled or not self._rx:
+                self._cancelled = False
+                return None
+            data = bytes(self._rx[:size])
+            del self._rx[:size]
+            return data
+
+
+class _FdTransport(Transport):
+    """Dosya tanıtıcısı üzerinden çalışan taşıyıcılar (TCP soketi, PTY).
+    read() select ile bekler; cancel_read() bir uyandırma borusuna yazar.
+    """
+
+    def __init__(self, fd: int, baudrate: int, timeout: Optional[float]):
+        super().__init__(baudrate, timeout)
+        self._fd = fd
+        self._wake_r, self._wake_w = os.pipe()
+
+    def fileno(self) -> int:
+        return self._fd
+
+    @property
+    def in_waiting(self) -> int:
+        try:
+            import fcntl
+            import termios
+            import struct
+            raw = fcntl.ioctl(self._fd, termios.FIONREAD, b"\0\0\0\0")
+            return struct.unpack("i", raw)[0]
+        except (ImportError, OSError):
+            readable, _, _ = select.select([self._fd], [], [], 0)
+            return 1 if readable else 0
+
+    def reset_input_buffer(self):
+        while self.in_waiting:
+            if not self._recv(4096):
+                break
+
+    def cancel_read(self):
+        try:
+            os.write(self._wake_w, b"x")
+        except OSError:
+            pass
+
+    def close(self):
+        if not self.is_open:
+            return
+        self.is_open = False
+        self.cancel_read()
+        self._close_fd()
+        for fd in (self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def _read_available(self, size: int, timeout: Optional[float]) -> Optional[bytes]:
+        readable, _, _ = select.select([self._fd, self._wake_r], [], [], timeout)
+        if self._wake_r in readable:
+            os.read(self._wake_r, 64)
+            return None
+        if not readable:
+            return None
+        data = self._recv(size)
+        if not data:
+            raise ConnectionResetError("Karşı uç bağlantıyı kapattı")
+        return data
+
+    def _recv(self, size: int) -> bytes:
+        return os.read(self._fd, size)
+
+    def _write(self, data: bytes):
+        os.write(self._fd, data)
+
+    def _close_fd(self):
+        os.close(self._fd)
+
+
+class TcpTransport(_FdTransport):
+    """ser2net / esp-link gibi seri-TCP köprüleri için ham soket"""
+
+    CONNECT_TIMEOUT = 3.0
+
+    def __init__(self, host: str, port: int, baudrate: int = 9600, timeout: Optional[float] = None):
+        self._sock = socket.create_connection((host, port), timeout=self.CONNECT_TIMEOUT)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock.setblocking(True)
+        super().__init__(self._sock.fileno(), baudrate, timeout)
+        self.port = f"tcp://{host}:{port}"
+
+    def _recv(self, size: int) -> bytes:
+        return self._sock.recv(size)
+
+    def _write(self, data: bytes):
+        self._sock.sendall(data)
+
+    def _close_fd(self):
+        self._sock.close()
+
+
+class PtyTransport(_FdTransport):
+    """Linux PTY çifti. Host master ucu kullanır; karşı ucun yolu peer_name'dir.
+    model verilirse karşı uçta FirmwareModel'i süren bir thread başlatılır.
+    """
+
+    boot_delay = 0.0
+
+    def __init__(self, model: Optional[FirmwareModel] = None, baudrate: int = 9600,
+                 timeout: Optional[float] = None):
+        import tty
+        master, slave = os.openpty()
+        tty.setraw(master)
+        tty.setraw(slave)
+        super().__init__(master, baudrate, timeout)
+        self._slave = slave
+        self.peer_name = os.ttyname(slave)
+        self.port = f"pty://{self.peer_name}"
+        self.model = model
+        if model is not None:
+            threading.Thread(target=self._run_model, daemon=True, name="PtyFirmwareModel").start()
+
+    def _run_model(self):
+        while self.is_open:
+            try:
+                data = os.read(self._slave, 4096)
+            except OSError:
+                return
+            if not data:
+                return
+            out = self.model.feed(data)
+            if out:
+                os.write(self._slave, out)
+
+    def _close_fd(self):
+        os.close(self._fd)
+        try:
+            os.close(self._slave)
+        except OSError:
+            pass
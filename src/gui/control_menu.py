@@ -4,7 +4,7 @@ PinManager ile haberleşir, Scheduler ile periyodik okuma gerçekleştirir.
 """
 import customtkinter as ctk
 from functools import partial
-from typing import Dict
+from typing import Dict, Optional
 import os
 
 from utils.logger import bring_to_front_and_center, get_asset_path
@@ -12,6 +12,7 @@ from core.config import load_config, DIGITAL_PINS, ANALOG_PINS, PWM_DIGITAL_PINS
 from core.pin_manager import pin_manager
 from core.scheduler import scheduler
 from core.serial_manager import serial_manager
+from gui.tk_dispatch import TkMarshal
 
 
 class ControlMenu(ctk.CTkToplevel):
@@ -68,6 +69,8 @@ class ControlMenu(ctk.CTkToplevel):
         self.toggle_widgets: Dict[int, ctk.CTkSwitch] = {}
         self.slider_widgets: Dict[int, ctk.CTkSlider] = {}
         # PWM debounce helpers {pin: after_id}
+        # Hat geride kalırsa bu süre (s) içinde yazılamayan slider değeri atılır
+        self._pwm_ttl = 0.5
         self._pwm_after_ids: Dict[int, str] = {}
         self._pending_pwm_vals: Dict[int, int] = {}
 
@@ -103,18 +106,19 @@ class ControlMenu(ctk.CTkToplevel):
         except Exception:
             pass
 
-        # --- Serial mesaj kuyruğunu arka planda boşalt ---
-        try:
-            scheduler.add_job("serial_poll", serial_manager.poll_messages, 0.1)
-        except Exception:
-            pass
-
-
         # Bu sürümde pin modlarını doğrudan Kontrol Menüsü açılırken uyguluyoruz.
 
-        # PinManager dinleyicileri
-        pin_manager.add_listener("pin_state", self._on_pin_state)
-        pin_manager.add_listener("analog_value", self._on_analog_value)
+        # PinManager dinleyicileri (serial dağıtıcı thread'inden Tk ana thread'ine taşınır)
+        self._tk = TkMarshal(self)
+        # Yalnızca bu pencerede widget'ı olan pinlere abone olunur (pin indeksli dağıtım)
+        shown_pins = set(self.toggle_widgets) | set(self.digital_indicators) | set(self.analog_indicators)
+        pin_manager.add_listener("pin_state", self._tk.wrap(self._on_pin_state), snapshots=False, pins=shown_pins)
+        pin_manager.add_listener("analog_value", self._tk.wrap(self._on_analog_value), snapshots=False,
+                                 pins=set(self.analog_num_labels))
+        # DIG/ANA yanıtları yalnızca değişimde gelir; yalnızca değişen pinler çizilir.
+        # Sorgu açıldığında bilinen son değerler _paint_known_* ile bir kez çizilir.
+        pin_manager.add_listener("digital_snapshot", self._tk.wrap(self._on_digital_snapshot))
+        pin_manager.add_listener("analog_snapshot", self._tk.wrap(self._on_analog_snapshot))
 
         # Pencere kapatma protokolü
         self.protocol("WM_DELETE_WINDOW", self._on_closing)
@@ -342,15 +346,16 @@ class ControlMenu(ctk.CTkToplevel):
         def seq_worker(stop_event):
             while not stop_event.is_set():
                 step = get_ms(seq_entry, 100) / 1000.0
+                # Adım, bir sonraki adımın zamanı geldiğinde bayattır
                 for p in pins:
                     if stop_event.is_set():
                         break
-                    self._on_toggle_pattern(p, 1)
+                    self._on_toggle_pattern(p, 1, ttl=step)
                     time.sleep(step)
                 for p in pins:
                     if stop_event.is_set():
                         break
-                    self._on_toggle_pattern(p, 0)
+                    self._on_toggle_pattern(p, 0, ttl=step)
                     time.sleep(step)
 
         seq_switch.configure(command=lambda: _start_pattern("seq", seq_worker, seq_switch) if seq_switch.get() else _stop_pattern("seq"))
@@ -372,12 +377,12 @@ class ControlMenu(ctk.CTkToplevel):
                     if stop_event.is_set():
                         break
                     # Pin'i aç
-                    self._on_toggle_pattern(p, 1)
+                    self._on_toggle_pattern(p, 1, ttl=delay)
                     time.sleep(delay)
                     if stop_event.is_set():
                         break
                     # Pin'i kapat
-                    self._on_toggle_pattern(p, 0)
+                    self._on_toggle_pattern(p, 0, ttl=delay)
                     time.sleep(delay)
 
         blink_switch.configure(command=lambda: _start_pattern("blink", blink_worker, blink_switch) if blink_switch.get() else _stop_pattern("blink"))
@@ -449,8 +454,10 @@ class ControlMenu(ctk.CTkToplevel):
         val = self.toggle_widgets[pin].get()
         pin_manager.write_digital(pin, 1 if val else 0)
 
-    def _on_toggle_pattern(self, pin: int, state: int):
-        """Pattern worker'ları için toggle metodu - görsel güncelleme yapar"""
+    def _on_toggle_pattern(self, pin: int, state: int, ttl: Optional[float] = None):
+        """Pattern worker'ları için toggle metodu - görsel güncelleme yapar.
+        ttl: adım bu süre içinde hatta yazılamazsa atılır (geçmiş tekrar oynatılmaz).
+        """
         # Toggle widget'ını güncelle
         toggle = self.toggle_widgets.get(pin)
         if toggle is not None:
@@ -461,7 +468,7 @@ class ControlMenu(ctk.CTkToplevel):
                 toggle.deselect()
                 toggle.configure(progress_color=self._toggle_off_color)
         # Arduino'ya komut gönder
-        pin_manager.write_digital(pin, state)
+        pin_manager.write_digital(pin, state, ttl)
 
     def _on_pwm_change(self, pin: int, value: float):
         # Debounce: gönderimi 120 ms ertele; arada gelen değerler sonuncu ile üzerine yazılır
@@ -494,13 +501,25 @@ class ControlMenu(ctk.CTkToplevel):
         val = self._pending_pwm_vals.get(pin)
         if val is None:
             return
-        pin_manager.write_pwm(pin, val)
+        pin_manager.write_pwm(pin, val, self._pwm_ttl)
         # Temizle
         self._pwm_after_ids.pop(pin, None)
 
     def _on_pin_state(self, data):
-        pin = data["pin"]
-        val = data["value"]
+        self._show_pin_state(data["pin"], data["value"])
+
+    def _on_digital_snapshot(self, data):
+        values = data["values"]
+        for pin in data["changed"]:
+            self._show_pin_state(pin, values[pin])
+
+    def _paint_known_inputs(self):
+        """Değişmeyen değerler olay üretmez: giriş göstergelerini bilinen son durumla çiz"""
+        for pin in list(self.digital_indicators) + list(self.analog_indicators):
+            if pin in pin_manager.pin_states:
+                self._show_pin_state(pin, pin_manager.pin_states[pin])
+
+    def _show_pin_state(self, pin: int, val: int):
         # Güncelle toggle
         toggle = self.toggle_widgets.get(pin)
         if toggle is not None:
@@ -520,8 +539,18 @@ class ControlMenu(ctk.CTkToplevel):
             a_ind.configure(text="●", text_color=(self._color_green if val else self._color_red))
 
     def _on_analog_value(self, data):
-        name = data["pin"]
-        val = data["value"]
+        self._show_analog_value(data["pin"], data["value"])
+
+    def _on_analog_snapshot(self, data):
+        values = data["values"]
+        for name in data["changed"]:
+            self._show_analog_value(name, values[name])
+
+    def _paint_known_analog(self):
+        for name, value in list(pin_manager.analog_values.items()):
+            self._show_analog_value(name, value)
+
+    def _show_analog_value(self, name: str, val: int):
         lbl = self.analog_num_labels.get(name)
         if lbl is not None:
             lbl.configure(text=str(val))
@@ -541,6 +570,7 @@ class ControlMenu(ctk.CTkToplevel):
         if self.d_switch.get():
             interval = self._get_interval(self.d_interval_entry, 300)
             scheduler.add_job("digital_poll", pin_manager.request_digital_read, interval)
+            self._paint_known_inputs()
             # İlk veriyi bekletmeden iste
             pin_manager.request_digital_read()
         else:
@@ -559,6 +589,10 @@ class ControlMenu(ctk.CTkToplevel):
         if self.a_switch.get():
             interval = self._get_interval(self.a_interval_entry, 500)
             scheduler.add_job("analog_poll", pin_manager.request_analog_read, interval)
+            self._paint_known_analog()
+            # Analog pinlerin dijital göstergeleri kapatırken sıfırlandı
+            if self.d_switch.get():
+                self._paint_known_inputs()
             pin_manager.request_analog_read()
         else:
             scheduler.remove_job("analog_poll")
@@ -591,8 +625,9 @@ class ControlMenu(ctk.CTkToplevel):
     def _on_closing(self):
         scheduler.remove_job("digital_poll")
         scheduler.remove_job("analog_poll")
-        # Serial polling'i kaldır
-        scheduler.remove_job("serial_poll")
-        pin_manager.remove_listener("pin_state", self._on_pin_state)
-        pin_manager.remove_listener("analog_value", self._on_analog_value)
+        pin_manager.remove_listener("pin_state", self._tk.wrap(self._on_pin_state))
+        pin_manager.remove_listener("analog_value", self._tk.wrap(self._on_analog_value))
+        pin_manager.remove_listener("digital_snapshot", self._tk.wrap(self._on_digital_snapshot))
+        pin_manager.remove_listener("analog_snapshot", self._tk.wrap(self._on_analog_snapshot))
+        self._tk.close()
         self.destroy() 
\ No newline at end of file
@@ -5,6 +5,7 @@ import customtkinter as ctk
 from utils.logger import bring_to_front_and_center
 from core.config import load_config, save_config
 from core.serial_manager import serial_manager
+from gui.tk_dispatch import TkMarshal
 import threading
 import tkinter.messagebox as messagebox
 import os
@@ -46,9 +47,10 @@ class MainWindow(ctk.CTk):
         self.arduino_found = False
         self.serial_monitor = None
 
-        # Bağlantı callback'ini ekle
-        serial_manager.add_connection_callback(self._on_connection_changed)
-        serial_manager.add_message_callback(self._on_message_received)
+        # Bağlantı callback'ini ekle (serial thread'lerinden Tk ana thread'ine taşınır)
+        self._tk = TkMarshal(self)
+        serial_manager.add_connection_callback(self._tk.wrap(self._on_connection_changed))
+        serial_manager.add_message_callback(self._tk.wrap(self._on_message_received))
 
         self.after(100, self._init_serial)
 
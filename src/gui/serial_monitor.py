@@ -1,12 +1,16 @@
 import customtkinter as ctk
 from utils.logger import bring_to_front_and_center, get_asset_path
 from core.serial_manager import serial_manager
+from gui.tk_dispatch import TkMarshal
 import threading
 import time
 from datetime import datetime
 import os
 
 class SerialMonitor(ctk.CTkToplevel):
+    # Gönderilen/alınan sayaçlarının SerialManager'dan eşitlenme aralığı
+    COUNTER_SYNC_MS = 100
+
     def __init__(self, master=None):
         super().__init__(master)
         self.title("Serial Monitor - Arduino Haberleşme")
@@ -37,9 +41,11 @@ class SerialMonitor(ctk.CTkToplevel):
         self.sent_count = stats.get('sent_count', 0)
         self.received_count = stats.get('received_count', 0)
         
-        # Register callbacks
-        serial_manager.add_message_callback(self.on_message_received)
-        serial_manager.add_connection_callback(self.on_connection_changed)
+        # Register callbacks (serial thread'lerinden gelir, Tk ana thread'ine taşınır)
+        self._tk = TkMarshal(self)
+        self._counter_sync_id = None
+        serial_manager.add_message_callback(self._tk.wrap(self.on_message_received))
+        serial_manager.add_connection_callback(self._tk.wrap(self.on_connection_changed))
         
         self._build_layout()
         bring_to_front_and_center(self)
@@ -53,9 +59,6 @@ class SerialMonitor(ctk.CTkToplevel):
         if self.sent_count > 0 or self.received_count > 0:
             self.log_message("Sistem", f"Önceki oturumdan {self.sent_count} gönderilen, {self.received_count} alınan mesaj", "info")
         
-        # Start polling for received messages
-        self.poll_serial()
-        
         # Initialize port list
         self.refresh_ports()
         
@@ -291,6 +294,9 @@ class SerialMonitor(ctk.CTkToplevel):
             self.log_message("Gönderilen", message, "sent")
         elif source in ["Sistem", "Hata"]:
             self.log_message(source, message, "info" if source == "Sistem" else "error")
+        # Sayaçlar her satırda değil, en fazla COUNTER_SYNC_MS'de bir eşitlenir
+        if self._counter_sync_id is None:
+            self._counter_sync_id = self.after(self.COUNTER_SYNC_MS, self.sync_counters)
     
     def on_connection_changed(self, connected: bool):
         # Pencere kapalıysa hata verme
@@ -320,23 +326,21 @@ class SerialMonitor(ctk.CTkToplevel):
             self.connect_btn.configure(text="Bağlan")
             self.status_label.configure(text="Bağlantı yok", text_color="red")
     
-    def poll_serial(self):
-        """Poll for received messages from the serial thread"""
-        serial_manager.poll_messages()
-        
-        # Update counters from manager stats (senkronizasyon için)
-        stats = serial_manager.get_stats()
-        self.sent_count = stats['sent_count']
-        self.received_count = stats['received_count']
+    def sync_counters(self):
+        """Sayaçları serial manager sayaçlarıyla eşitle"""
+        self._counter_sync_id = None
+        self.sent_count = serial_manager.sent_count
+        self.received_count = serial_manager.received_count
         self.update_counter()
-        
-        # Schedule next poll
-        self.after(100, self.poll_serial)
     
     def on_closing(self):
+        if self._counter_sync_id is not None:
+            self.after_cancel(self._counter_sync_id)
+            self._counter_sync_id = None
         # Callbacks'leri kaldır
-        serial_manager.remove_message_callback(self.on_message_received)
-        serial_manager.remove_connection_callback(self.on_connection_changed)
+        serial_manager.remove_message_callback(self._tk.wrap(self.on_message_received))
+        serial_manager.remove_connection_callback(self._tk.wrap(self.on_connection_changed))
+        self._tk.close()
         
         # Ana pencereye referansı temizle
         if hasattr(self.master, 'serial_monitor'):
@@ -0,0 +1,76 @@
+"""gui.tk_dispatch
+Serial/PinManager callback'lerini Tk ana thread'ine taşıyan adaptör.
+
+SerialManager alınan satırları kendi dağıtıcı thread'inde iletir; Tk
+widget'ları ise yalnızca ana thread'den güncellenmelidir. TkMarshal ile
+sarılan callback herhangi bir thread'den çağrılabilir: çağrılar kuyruğa
+alınır ve ana thread'de, art arda gelenler tek bir after() turunda
+toplanarak çalıştırılır.
+
+    self._tk = TkMarshal(self)
+    serial_manager.add_message_callback(self._tk.wrap(self.on_message_received))
+    ...
+    self._tk.close()   # pencere kapanırken
+"""
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Tuple
+
+
+class TkMarshal:
+    """Callback çağrılarını bir Tk widget'ının ana thread'ine aktarır"""
+
+    def __init__(self, widget):
+        self.widget = widget
+        self._pending: Deque[Tuple[Callable[..., Any], tuple]] = deque()
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self._closed = False
+        self._wrappers: Dict[Callable[..., Any], Callable[..., None]] = {}
+
+    def wrap(self, callback: Callable[..., Any]) -> Callable[..., None]:
+        """callback'i thread-safe hale getiren sarmalayıcıyı döndür.
+        Aynı callback için her zaman aynı nesne döner (remove_* çağrıları için).
+        """
+        wrapper = self._wrappers.get(callback)
+        if wrapper is None:
+            def wrapper(*args):
+                self.call(callback, *args)
+            self._wrappers[callback] = wrapper
+        return wrapper
+
+    def call(self, callback: Callable[..., Any], *args):
+        """callback(*args) çağrısını ana thread'de çalıştırılmak üzere sıraya al"""
+        if self._closed:
+            return
+        with self._lock:
+            self._pending.append((callback, args))
+            if self._scheduled:
+                return
+            self._scheduled = True
+        try:
+            self.widget.after(0, self._drain)
+        except Exception:
+            # Widget yok edilmiş
+            self._closed = True
+
+    def close(self):
+        """Bekleyen çağrıları at; sonraki çağrıları yok say"""
+        self._closed = True
+        with self._lock:
+            self._pending.clear()
+
+    def _drain(self):
+        with self._lock:
+            batch = list(self._pending)
+            self._pending.clear()
+            self._scheduled = False
+        for callback, args in batch:
+            if self._closed:
+                return
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Tk callback error: {e}")
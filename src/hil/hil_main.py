@@ -12,7 +12,9 @@ import os
 from datetime import datetime
 from typing import Dict, List, Optional
 from dataclasses import dataclass, asdict
-from core.serial_manager import SerialManager, serial_manager
+from core.serial_manager import SerialManager
+from core.device_registry import device_registry
+from core.send_queue import URGENT
 import serial
 import serial.tools.list_ports
 import queue
@@ -45,63 +47,53 @@ class VehicleState:
     ac_off_btn: int = 0
 
 class HILSerialConnection:
-    """HIL için basit serial bağlantı sınıfı"""
+    """HIL için serial bağlantı.
+    Cihaz kayıt defterindeki bağımsız bir SerialManager'ı sarar; böylece sim
+    kartı da gönderim kuyruğu, I/O thread'i ve istatistiklerle birlikte tam
+    yığını kullanır. Proteus kartı TEST'e yanıt vermediği için doğrudan bağlanılır.
+    """
     
-    def __init__(self, port: str, baudrate: int = 9600):
+    def __init__(self, port: str, baudrate: int = 9600, name: str = "hil_sim"):
         self.port = port
         self.baudrate = baudrate
-        self.serial_port: Optional[serial.Serial] = None
-        self.is_connected = False
+        self.device = device_registry.create(name)
+        self.manager = self.device.serial
+        # TEST el sıkışması olmadan otomatik yeniden bağlanma yapılamaz
+        self.manager.auto_reconnect = False
         self.message_callbacks: List[callable] = []
+    
+    @property
+    def is_connected(self) -> bool:
+        return self.manager.is_connected
+    
+    @property
+    def serial_port(self) -> Optional[serial.Serial]:
+        return self.manager.serial_port
         
     def connect(self) -> bool:
         """Serial bağlantısını aç"""
         try:
-            self.serial_port = serial.Serial(self.port, self.baudrate, timeout=1)
-            time.sleep(1)  # Bağlantı stabilizasyonu
-            self.is_connected = True
-            return True
+            if self.manager.is_connected and self.manager.port_name != self.port:
+                self.disconnect()
+            # Yığın ada göre paylaşılır: callback bağlantı başına bir kez eklenir
+            self.manager.add_message_callback(self._on_manager_message)
+            if self.manager.connect(self.port, self.baudrate, test_connection=False):
+                return True
+            self.manager.remove_message_callback(self._on_manager_message)
+            print(f"Bağlantı hatası {self.port}")
         except Exception as e:
             print(f"Bağlantı hatası {self.port}: {e}")
-            return False
+        return False
     
     def disconnect(self):
         """Serial bağlantısını kapat"""
-        if self.serial_port and self.serial_port.is_open:
-            try:
-                self.serial_port.close()
-            except Exception:
-                pass
-        self.is_connected = False
+        self.manager.remove_message_callback(self._on_manager_message)
+        if self.manager.is_connected:
+            self.manager.disconnect()
     
     def send_message(self, message: str) -> bool:
         """Mesaj gönder"""
-        if not self.is_connected:
-            return False
-        
-        try:
-            if not message.endswith('\n'):
-                message += '\n'
-            self.serial_port.write(message.encode('utf-8'))
-            self.serial_port.flush()
-            return True
-        except Exception as e:
-            print(f"Mesaj gönderme hatası: {e}")
-            return False
-    
-    def read_message(self) -> Optional[str]:
-        """Mesaj oku"""
-        if not self.is_connected:
-            return None
-        
-        try:
-            if self.serial_port.in_waiting:
-                line = self.serial_port.readline().decode('utf-8', errors='ignore').strip()
-                if line:
-                    return line
-        except Exception as e:
-            print(f"Mesaj okuma hatası: {e}")
-        return None
+        return self.manager.send_message(message)
     
     def add_message_callback(self, callback: callable):
         """Mesaj callback'i ekle"""
@@ -110,13 +102,20 @@ class HILSerialConnection:
     
     def poll_messages(self):
         """Mesajları oku ve callback'leri çağır"""
-        message = self.read_message()
-        if message:
-            for callback in self.message_callbacks:
-                try:
-                    callback("Alınan", message)
-                except Exception as e:
-                    print(f"Callback hatası: {e}")
+        self.manager.poll_messages()
+    
+    def get_stats(self) -> dict:
+        return self.manager.get_stats()
+    
+    def _on_manager_message(self, source: str, message: str):
+        # Eski davranışla uyumlu: yalnızca alınan satırlar iletilir
+        if source != "Alınan":
+            return
+        for callback in self.message_callbacks:
+            try:
+                callback(source, message)
+            except Exception as e:
+                print(f"Callback hatası: {e}")
 
 class HILSerialManager:
     """HIL için özel serial yöneticisi - iki Arduino ile haberleşme"""
@@ -125,6 +124,7 @@ class HILSerialManager:
         self.sim_serial: Optional[HILSerialConnection] = None  # Proteus Arduino
         self.real_serial: Optional[SerialManager] = None  # Gerçek Arduino
         self.sim_port = "COM6"  # Varsayılan Proteus portu
+        self.sim_baudrate = 9600  # Proteus COMPIM ve hil_sim.ino ile aynı olmalı
         self.real_port: Optional[str] = None  # Otomatik bulunacak
         
         # Veri kaydetme
@@ -138,8 +138,8 @@ class HILSerialManager:
         # Araç durumu
         self.vehicle_state = VehicleState()
         
-        # Mevcut serial manager'ı kullan (gerçek Arduino için)
-        self.real_serial = serial_manager
+        # Gerçek Arduino uygulamanın varsayılan yığınını kullanır
+        self.real_serial = device_registry.get().serial
         
         self.motor_on_btn = 0
         self.motor_off_btn = 0
@@ -161,8 +161,11 @@ class HILSerialManager:
             self.sim_port = port
             
         try:
-            # Sim Arduino için HILSerialConnection oluştur
-            self.sim_serial = HILSerialConnection(self.sim_port, 9600)
+            # Sim Arduino bağlantısı bir kez oluşturulur, yeniden bağlanırken aynısı kullanılır
+            if self.sim_serial is None:
+                self.sim_serial = HILSerialConnection(self.sim_port, self.sim_baudrate)
+            self.sim_serial.port = self.sim_port
+            self.sim_serial.baudrate = self.sim_baudrate
             
             # Bağlantı kur
             if self.sim_serial.connect():
@@ -181,8 +184,8 @@ class HILSerialManager:
             # Arduino portunu bul
             self.real_port = self.real_serial.find_arduino_port(timeout=3.0)
             if self.real_port:
-                # Callback'leri ekle
-                self.real_serial.add_message_callback(self._on_real_message)
+                # Callback'leri ekle (log dosyasına yazma dağıtıcıyı bekletmesin diye kendi kuyruğunda)
+                self.real_serial.add_message_callback(self._on_real_message, queued=True)
                 return True
             return False
         except Exception as e:
@@ -289,34 +292,37 @@ class HILSerialManager:
             print(f"Potansiyometre mesaj işleme hatası: {e}")
     
     def _send_commands_to_real_arduino(self):
-        """Gerçek Arduino'ya sadece değişiklik olduğunda komut gönder"""
+        """Gerçek Arduino'ya sadece değişiklik olduğunda komut gönder.
+        Bu çıkışlar araç güvenlik durumunu yansıtır: slider/pattern trafiğinin
+        arkasında beklememeleri için acil şeritten gönderilir.
+        """
         if not self.real_serial or not self.real_serial.is_connected:
             return
         try:
             # Motor durumu - Yeşil LED (Pin 2)
             motor_val = 1 if self.vehicle_state.motor_status else 0
             if self.last_outputs['motor'] != motor_val:
-                self.real_serial.send_command(2, motor_val)
+                self.real_serial.send_command(2, motor_val, URGENT)
                 self.last_outputs['motor'] = motor_val
             # Klima durumu - Mavi LED (Pin 3)
             climate_val = 1 if self.vehicle_state.climate_status else 0
             if self.last_outputs['climate'] != climate_val:
-                self.real_serial.send_command(3, climate_val)
+                self.real_serial.send_command(3, climate_val, URGENT)
                 self.last_outputs['climate'] = climate_val
             # Acil durum - Kırmızı LED (Pin 4)
             emergency_val = 1 if self.vehicle_state.emergency_status else 0
             if self.last_outputs['emergency'] != emergency_val:
-                self.real_serial.send_command(4, emergency_val)
+                self.real_serial.send_command(4, emergency_val, URGENT)
                 self.last_outputs['emergency'] = emergency_val
             # Hız uyarısı - Hız LED (Pin 5)
             speed_val = 1 if self.vehicle_state.speed > self.vehicle_state.speed_limit else 0
             if self.last_outputs['speed'] != speed_val:
-                self.real_serial.send_command(5, speed_val)
+                self.real_serial.send_command(5, speed_val, URGENT)
                 self.last_outputs['speed'] = speed_val
             # Yakıt uyarısı - Yakıt LED (Pin 6)
             fuel_val = 1 if self.vehicle_state.fuel_level < self.vehicle_state.fuel_critical_level else 0
             if self.last_outputs['fuel'] != fuel_val:
-                self.real_serial.send_command(6, fuel_val)
+                self.real_serial.send_command(6, fuel_val, URGENT)
                 self.last_outputs['fuel'] = fuel_val
         except Exception as e:
             print(f"Real Arduino komut gönderme hatası: {e}")
@@ -620,9 +626,7 @@ class HILMainWindow(ctk.CTk):
         
         # Otomatik bağlantıları başlat
         threading.Thread(target=self._auto_connect, daemon=True).start()
-        
-        # Mesaj polling'i başlat
-        self._start_message_polling()
+        # Mesajlar her kartın SerialManager dağıtıcı thread'inden anında gelir
     
     def _auto_connect(self):
         """Otomatik bağlantıları başlat"""
@@ -634,27 +638,6 @@ class HILMainWindow(ctk.CTk):
         if self.hil_manager.connect_real_arduino():
             self._update_real_status(True)
     
-    def _start_message_polling(self):
-        """Mesaj polling'i başlat"""
-        def poll_messages():
-            while True:
-                try:
-                    # Sim Arduino'dan mesajları oku
-                    if self.hil_manager.sim_serial:
-                        self.hil_manager.sim_serial.poll_messages()
-                    
-                    # Real Arduino'dan mesajları oku (mevcut sistem kullanılıyor)
-                    if self.hil_manager.real_serial:
-                        self.hil_manager.real_serial.poll_messages()
-                    
-                    time.sleep(0.01)  # 10ms bekleme
-                except Exception as e:
-                    print(f"Mesaj polling hatası: {e}")
-                    time.sleep(0.1)
-        
-        # Polling thread'ini başlat
-        threading.Thread(target=poll_messages, daemon=True).start()
-    
     def _connect_sim(self):
         """Proteus Arduino'ya manuel bağlan"""
         if self.hil_manager.connect_sim_arduino():
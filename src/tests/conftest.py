@@ -0,0 +1,33 @@
+"""Testler src/ kökünden içe aktarılır (from core.x import ...).
+
+    cd src && python -m pytest -q
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+@pytest.fixture(autouse=True)
+def config_path(tmp_path, monkeypatch):
+    """SerialManager son port bilgisini core/config.json yerine geçici dosyaya yazsın"""
+    import importlib
+
+    path = str(tmp_path / "config.json")
+    # core paketi serial_manager adıyla örneği dışa aktarır; modülün kendisi yamalanır
+    monkeypatch.setattr(importlib.import_module("core.serial_manager"), "get_config_path", lambda: path)
+    return path
+
+
+@pytest.fixture
+def manager(request):
+    """sim:// firmware modeline bağlı adlandırılmış SerialManager (test sonunda kapatılır)"""
+    from core.serial_manager import SerialManager
+
+    name = request.node.name
+    serial = SerialManager(name=name)
+    assert serial.connect(f"sim://{name}")
+    yield serial
+    serial.shutdown()
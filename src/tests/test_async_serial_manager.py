@@ -0,0 +1,76 @@
+"""AsyncSerialManager: el sıkışma, eşzamanlı istekler ve kopma (sim:// ve pty://sim)"""
+import asyncio
+import os
+
+import pytest
+
+from core.async_serial_manager import AsyncSerialManager
+
+PORTS = ["sim://async"] + (["pty://sim"] if os.name == "posix" else [])
+
+
+@pytest.mark.parametrize("port", PORTS)
+@pytest.mark.parametrize("binary", [True, False])
+def test_concurrent_requests_get_their_own_replies(port, binary):
+    async def main():
+        manager = AsyncSerialManager(port)
+        manager.prefer_binary = binary
+        assert await manager.connect()
+        try:
+            assert manager.protocol == ("binary" if binary else "text")
+            replies = await asyncio.gather(*(manager.request(f"PWM {pin},{pin * 10}") for pin in (3, 5, 6, 9, 10, 11)))
+            assert [r.data for r in replies] == [{"pin": pin, "value": pin * 10} for pin in (3, 5, 6, 9, 10, 11)]
+        finally:
+            await manager.disconnect()
+    asyncio.run(main())
+
+
+def test_lines_stream_ends_on_disconnect():
+    async def main():
+        manager = AsyncSerialManager("sim://async-lines")
+        assert await manager.connect()
+        seen = []
+
+        async def consume():
+            async for line in manager.lines():
+                seen.append(line)
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        await manager.request("PWM 9,5")
+        await manager.disconnect()
+        await asyncio.wait_for(task, 1)
+        assert seen == ["PIN 9 : 5"]
+    asyncio.run(main())
+
+
+def test_unplug_fails_pending_requests():
+    async def main():
+        manager = AsyncSerialManager("sim://async-unplug")
+        assert await manager.connect()
+        events = []
+        manager.add_connection_callback(events.append)
+        manager.serial_port.unplug()
+        with pytest.raises(ConnectionError):
+            await manager.request("TEST")
+        assert not manager.is_connected
+        assert events == [False]
+    asyncio.run(main())
+
+
+def test_stats_report_one_timeout_counter_with_serial_manager_keys(manager):
+    async def main():
+        async_manager = AsyncSerialManager("sim://async-stats")
+        assert await async_manager.connect()
+        try:
+            # Kart yanıt vermesin: istek zaman aşımına uğrar
+            async_manager.serial_port.model.feed = lambda data: b""
+            with pytest.raises(TimeoutError):
+                await async_manager.request("TEST", 0.05)
+            return async_manager.get_stats()
+        finally:
+            await async_manager.disconnect()
+    stats = asyncio.run(main())
+    assert stats["timeouts"] == 1
+    assert "response_timeouts" not in stats
+    assert set(stats) <= set(manager.get_stats())
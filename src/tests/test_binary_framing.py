@@ -0,0 +1,119 @@
+"""COBS + CRC8 ikili çerçeveleme (BinaryCodec)"""
+import pytest
+
+from core.firmware_model import FirmwareModel
+from core.protocol import OP_PWM, OP_TEXT, BinaryCodec, cobs_decode, cobs_encode, crc8
+
+
+@pytest.mark.parametrize("data", [b"", b"\x00", b"\x00\x00", b"\x01\x02\x03", b"\x11\x00\x22\x00", bytes(range(200))])
+def test_cobs_round_trip_has_no_zero_bytes(data):
+    encoded = cobs_encode(data)
+    assert b"\x00" not in encoded
+    assert cobs_decode(encoded) == data
+
+
+def test_cobs_decode_rejects_bad_length():
+    with pytest.raises(ValueError):
+        cobs_decode(b"\x05\x01")
+
+
+def test_crc8_check_value():
+    # CRC-8/SMBUS (polinom 0x07, başlangıç 0) kontrol değeri
+    assert crc8(b"123456789") == 0xF4
+
+
+def test_pack_known_and_unknown_commands():
+    assert BinaryCodec.pack("PWM 9,10") == (OP_PWM, b"\x09\x0a")
+    assert BinaryCodec.pack("HELLO") == (OP_TEXT, b"HELLO")
+
+
+@pytest.fixture
+def board():
+    model = FirmwareModel()
+    assert model.feed(b"PROTO BIN\n") == b"PROTO BIN\r\n"
+    return model
+
+
+def test_replies_render_as_text_firmware_lines(board):
+    codec = BinaryCodec()
+    board.analog_values[0] = 512
+    out = board.feed(codec.encode("PWM 9,10", 5) + codec.encode("ANA", 6) + codec.encode("7,1", 7))
+    assert codec.feed(out) == [(5, "PIN 9 : 10"), (6, "A0:512,A1:0,A2:0,A3:0,A4:0,A5:0"), (7, "PIN 7 : ON")]
+
+
+def test_frames_split_across_reads(board):
+    codec = BinaryCodec()
+    out = board.feed(codec.encode("TEST", 3))
+    assert codec.feed(out[:2]) == []
+    assert codec.feed(out[2:]) == [(3, "1")]
+
+
+def test_corrupt_frame_is_dropped_and_counted(board):
+    codec = BinaryCodec()
+    good = board.feed(codec.encode("PWM 5,1", 1))
+    bad = bytearray(good)
+    bad[2] ^= 0xFF
+    assert codec.feed(bytes(bad) + good) == [(1, "PIN 5 : 1")]
+    assert codec.crc_errors == 1
+
+
+def test_corrupt_command_is_ignored_by_firmware(board):
+    frame = bytearray(BinaryCodec().encode("PWM 9,10", 1))
+    frame[3] ^= 0x01
+    assert board.feed(bytes(frame)) == b""
+    assert board.pin_states[9] == 0
+
+
+def test_manager_negotiates_binary(manager):
+    assert manager.protocol == "binary"
+    assert manager.request("PWM 6,200").result(2).data == {"pin": 6, "value": 200}
+
+
+@pytest.mark.parametrize("data", [b"\x01" * 254, b"\x01" * 300, b"\x01" * 254 + b"\x00" + b"\x02" * 600])
+def test_cobs_splits_long_runs_into_254_byte_blocks(data):
+    encoded = cobs_encode(data)
+    assert b"\x00" not in encoded
+    assert encoded[0] == 0xFF
+    assert cobs_decode(encoded) == data
+
+
+def test_long_text_frame_round_trips():
+    codec = BinaryCodec()
+    frame = codec.encode("X" * 300, 9)
+    assert codec.decode_frame(frame[:-1]) == (9, "X" * 300)
+    assert not codec.fits("X" * 300)
+    assert codec.fits("PWM 9,10")
+
+
+def test_firmware_drops_frames_longer_than_rx_buffer(board):
+    codec = BinaryCodec()
+    assert board.feed(codec.encode("X" * 80, 1)) == b""
+    assert codec.feed(board.feed(codec.encode("TEST", 2))) == [(2, "1")]
+
+
+def test_oversized_command_is_rejected_and_link_survives(manager):
+    assert manager.protocol == "binary"
+    assert not manager.send_message("X" * 300)
+    with pytest.raises(ValueError):
+        manager.request("X" * 300).result(0)
+    assert manager.request("STAT").result(2).kind == "stat"
+    assert manager.serial_thread.window.in_flight == 0
+
+
+def test_encode_failure_does_not_stop_the_writer(manager, monkeypatch):
+    codec = manager.serial_thread.codec
+    encode = codec.encode
+
+    def flaky_encode(text, seq=None):
+        # Yalnızca yazıcı thread'i (seq ile) kodlarken hata ver
+        if text.startswith("BAD") and seq is not None:
+            raise ValueError("bozuk")
+        return encode(text, seq)
+
+    monkeypatch.setattr(codec, "encode", flaky_encode)
+    bad = manager.request("BAD")
+    with pytest.raises(ValueError):
+        bad.result(2)
+    assert manager.request("STAT").result(2).kind == "stat"
+    assert manager.serial_thread.window.in_flight == 0
+    assert manager.is_connected
@@ -0,0 +1,33 @@
+"""DeviceRegistry: kart başına yığın oluşturma ve tamamen kapatma"""
+import threading
+
+from core.device_registry import DEFAULT_DEVICE, DeviceRegistry
+
+
+def test_remove_tears_down_the_whole_stack(request):
+    registry = DeviceRegistry()
+    name = request.node.name
+    stack = registry.create(name)
+    assert registry.create(name) is stack
+    assert stack.serial.connect(f"sim://{name}")
+    stack.router.add_listener("pin_state", lambda e: None, queued=True)
+    stack.serial.add_message_callback(lambda source, line: None, queued=True)
+    # Dağıtıcı ve iki queued dinleyici thread'i (adlarında test fonksiyonunun adı geçer)
+    threads = [t for t in threading.enumerate() if name in t.name]
+    assert len(threads) == 3
+
+    registry.remove(name)
+
+    assert registry.get(name) is None
+    assert not stack.serial.is_connected
+    for thread in threads:
+        thread.join(1)
+        assert not thread.is_alive(), thread.name
+    assert stack.router.listener_stats() == {}
+    assert stack.serial.message_callbacks == [] and stack.serial.reconnect_callbacks == []
+
+
+def test_default_device_is_never_removed():
+    registry = DeviceRegistry()
+    registry.remove(DEFAULT_DEVICE)
+    assert registry.get(DEFAULT_DEVICE) is not None
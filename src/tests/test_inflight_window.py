@@ -0,0 +1,80 @@
+"""InflightWindow ve #seq etiketli boru hattı (pipelining)"""
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from core.protocol import TextCodec
+from core.serial_manager import InflightWindow
+
+
+def running():
+    return True
+
+
+def test_acquire_assigns_increasing_seq_until_full():
+    window = InflightWindow(size=3, timeout=1.0, use_seq=True)
+    assert [window.acquire(running) for _ in range(3)] == [1, 2, 3]
+    assert window.free_slots == 0
+    # Pencere dolu: is_running False olunca beklemeden None döner
+    assert window.acquire(lambda: False) is None
+
+
+def test_release_matches_tagged_reply_out_of_order():
+    window = InflightWindow(size=4, timeout=1.0, use_seq=True)
+    futures = [Future() for _ in range(3)]
+    seqs = [window.acquire(running, f) for f in futures]
+    assert window.release(seqs[1]) == (True, futures[1])
+    assert window.release(seqs[1]) == (False, None)
+    # Etiketsiz (kendiliğinden gelen) satır pencereyi boşaltmaz
+    assert window.release(None) == (False, None)
+    assert window.in_flight == 2
+
+
+def test_untagged_mode_releases_oldest():
+    window = InflightWindow(size=1, timeout=1.0, use_seq=False)
+    future = Future()
+    window.acquire(running, future)
+    assert window.release(None) == (True, future)
+    assert window.in_flight == 0
+
+
+def test_seq_wraps_after_255_and_skips_zero():
+    window = InflightWindow(size=1, timeout=1.0, use_seq=True)
+    seqs = []
+    for _ in range(InflightWindow.SEQ_MODULO):
+        seq = window.acquire(running)
+        seqs.append(seq)
+        window.release(seq)
+    assert seqs[:2] == [1, 2]
+    assert seqs[254:] == [255, 1]
+    assert 0 not in seqs
+
+
+def test_expire_fails_future_and_frees_slot():
+    window = InflightWindow(size=1, timeout=0.01, use_seq=True)
+    future = Future()
+    window.acquire(running, future)
+    time.sleep(0.02)
+    window.expire()
+    assert window.in_flight == 0
+    assert window.timeout_count == 1
+    with pytest.raises(TimeoutError):
+        future.result(0)
+
+
+def test_text_codec_tags_and_splits_replies():
+    codec = TextCodec(use_seq=True)
+    assert codec.encode("TEST\n", 7) == b"#7 TEST\n"
+    assert codec.feed(b"#7 1\r\nPIN 7") == [(7, "1")]
+    assert codec.feed(b" : ON\r\n#8\r\nD2:1,\r\n") == [(None, "PIN 7 : ON"), (8, ""), (None, "D2:1,")]
+
+
+def test_pipelined_requests_resolve_with_their_own_replies(manager):
+    assert "SEQ" in manager.firmware_caps
+    requests = [manager.request("TEST"), manager.request("MODE 7,IN"), manager.request("PWM 9,77"),
+                manager.request("ANA"), manager.request("DIG")]
+    kinds = [f.result(2).kind for f in requests]
+    assert kinds == ["test", "pin_mode", "pin_state", "analog", "digital"]
+    assert requests[2].result().data == {"pin": 9, "value": 77}
+    assert requests[4].result().data == {"values": {7: 0}}
@@ -0,0 +1,111 @@
+"""QueuedListener: drop_oldest / conflate taşma politikaları ve router entegrasyonu"""
+import threading
+import time
+
+import pytest
+
+from core.events import PinState
+from core.listener_queue import CONFLATE, DROP_OLDEST, QueuedListener
+from core.message_router import MessageRouter
+from core.serial_manager import SerialManager
+
+
+class Blocked:
+    """İlk çağrıda kapı açılana kadar bekleyen callback (worker meşgul kalsın diye)"""
+
+    def __init__(self):
+        self.calls = []
+        self.started = threading.Event()
+        self.gate = threading.Event()
+
+    def __call__(self, event):
+        self.calls.append(event)
+        self.started.set()
+        self.gate.wait(2)
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while not predicate():
+        assert time.time() < deadline
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def blocked():
+    callback = Blocked()
+    yield callback
+    callback.gate.set()
+
+
+def fill(listener, callback, events):
+    listener(PinState(0, 0))
+    assert callback.started.wait(2)
+    for event in events:
+        listener(event)
+
+
+def test_drop_oldest_keeps_newest(blocked):
+    listener = QueuedListener(blocked, maxsize=2, overflow=DROP_OLDEST)
+    fill(listener, blocked, [PinState(2, 1), PinState(3, 1), PinState(4, 1)])
+    assert listener.depth == 2 and listener.dropped == 1
+    blocked.gate.set()
+    wait_for(lambda: len(blocked.calls) == 3)
+    assert blocked.calls[1:] == [PinState(3, 1), PinState(4, 1)]
+    listener.close()
+
+
+def test_conflate_replaces_pending_value_in_place(blocked):
+    listener = QueuedListener(blocked, maxsize=2, overflow=CONFLATE)
+    fill(listener, blocked, [PinState(2, 0), PinState(3, 0), PinState(2, 1), PinState(2, 2)])
+    assert listener.conflated == 2 and listener.dropped == 0
+    blocked.gate.set()
+    wait_for(lambda: len(blocked.calls) == 3)
+    assert blocked.calls[1:] == [PinState(2, 2), PinState(3, 0)]
+    listener.close()
+
+
+def test_conflate_without_match_drops_oldest(blocked):
+    listener = QueuedListener(blocked, maxsize=1, overflow=CONFLATE)
+    fill(listener, blocked, [PinState(2, 0), PinState(3, 0)])
+    assert listener.dropped == 1
+    blocked.gate.set()
+    wait_for(lambda: len(blocked.calls) == 2)
+    assert blocked.calls[1:] == [PinState(3, 0)]
+    listener.close()
+
+
+def test_close_discards_pending_and_ignores_later_calls(blocked):
+    listener = QueuedListener(blocked, maxsize=4)
+    fill(listener, blocked, [PinState(2, 0)])
+    listener.close()
+    listener(PinState(3, 0))
+    blocked.gate.set()
+    time.sleep(0.05)
+    assert blocked.calls == [PinState(0, 0)]
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        QueuedListener(lambda e: None, overflow="spill")
+
+
+def test_router_queued_listener_runs_off_the_dispatch_thread(request):
+    router = MessageRouter(SerialManager(name=request.node.name))
+    threads = []
+    done = threading.Event()
+
+    def slow(event):
+        threads.append(threading.current_thread())
+        done.set()
+
+    router.add_listener("pin_state", slow, queued=True, overflow=CONFLATE, maxsize=8)
+    router._on_serial_message("Alınan", "PIN 7 : ON")
+    assert done.wait(2)
+    assert threads[0] is not threading.current_thread()
+    stats = router.listener_stats()
+    assert len(stats) == 1
+    (name, entry), = stats.items()
+    assert name.startswith("pin_state:") and entry["delivered"] == 1 and entry["overflow"] == CONFLATE
+    router.remove_listener("pin_state", slow)
+    assert router.listener_stats() == {}
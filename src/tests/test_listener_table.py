@@ -0,0 +1,60 @@
+"""ListenerTable ve pin indeksli abonelikler"""
+from core.events import AnalogValue, ListenerTable, PinState, pin_keys
+from core.message_router import MessageRouter
+from core.serial_manager import SerialManager
+
+
+def test_pin_keys_match_event_pin_format():
+    assert pin_keys("pin_state", (2, "A0", "a1")) == {2, 14, 15}
+    assert pin_keys("analog_value", (14, "a2", "A3")) == {"A0", "A2", "A3"}
+
+
+def test_add_and_remove_across_all_and_pins():
+    table = ListenerTable()
+    a, b = (lambda e: None), (lambda e: None)
+    assert not table
+    table.add(a)
+    table.add(b, {2, 3})
+    assert table.all == (a,)
+    assert table.by_pin == {2: (b,), 3: (b,)}
+    table.remove(b)
+    assert table.by_pin == {}
+    table.remove(a)
+    assert not table
+
+
+def test_remove_drops_one_registration_at_a_time():
+    table = ListenerTable()
+    a = lambda e: None  # noqa: E731
+    table.add(a)
+    table.add(a)
+    table.remove(a)
+    assert table.all == (a,)
+
+
+def test_listener_removing_itself_does_not_skip_the_next(request):
+    router = MessageRouter(SerialManager(name=request.node.name))
+    calls = []
+
+    def once(event):
+        calls.append("once")
+        router.remove_listener("pin_state", once)
+
+    router.add_listener("pin_state", once)
+    router.add_listener("pin_state", lambda e: calls.append("next"))
+    router._on_serial_message("Alınan", "PIN 7 : ON")
+    router._on_serial_message("Alınan", "PIN 7 : OFF")
+    assert calls == ["once", "next", "next"]
+
+
+def test_router_delivers_only_subscribed_pins(request):
+    router = MessageRouter(SerialManager(name=request.node.name))
+    every, pinned, analog = [], [], []
+    router.add_listener("pin_state", every.append)
+    router.add_listener("pin_state", pinned.append, pins={3, "A0"})
+    router.add_listener("analog_value", analog.append, pins={15})
+    for line in ("D2:1,D3:0,", "PIN A0 : ON", "PIN 9 : 40", "A0:10,A1:20"):
+        router._on_serial_message("Alınan", line)
+    assert every == [PinState(2, 1), PinState(3, 0), PinState(14, 1), PinState(9, 40)]
+    assert pinned == [PinState(3, 0), PinState(14, 1)]
+    assert analog == [AnalogValue("A1", 20)]
@@ -0,0 +1,72 @@
+"""core.protocol.parse_response ve MessageRouter'ın tablo tabanlı dağıtımı"""
+import pytest
+
+from core.message_router import MessageRouter
+from core.protocol import parse_response
+from core.serial_manager import SerialManager
+
+
+@pytest.mark.parametrize("line, kind, data", [
+    ("1", "test", {}),
+    ("", "ack", {}),
+    ("PIN 7 : ON", "pin_state", {"pin": 7, "value": 1}),
+    ("PIN 11 : 127", "pin_state", {"pin": 11, "value": 127}),
+    ("PIN A0 : OFF", "pin_state", {"pin": 14, "value": 0}),
+    ("PIN 7:OUT", "pin_mode", {"pin": 7, "mode": 1}),
+    ("PIN A2:PAS", "pin_mode", {"pin": 16, "mode": 2}),
+    ("PIN ALL: ON", "all", {"value": 1}),
+    ("D2:1,D3:0,", "digital", {"values": {2: 1, 3: 0}}),
+    ("A0:123,A1:456", "analog", {"values": {"A0": 123, "A1": 456}}),
+    ("2:0:1,3:1:1,A0:0:0,A5:1:2", "stat", {"entries": [(2, 0, 1), (3, 1, 1), (14, 0, 0), (19, 1, 2)]}),
+    ("MODES OK 18", "batch", {"command": "MODES", "count": 18}),
+    ("WRITE OK 5", "batch", {"command": "WRITE", "count": 5}),
+    ("CAPS FNSS_TEST/5 SEQ BIN", "caps", {"firmware": "FNSS_TEST/5", "caps": ["SEQ", "BIN"]}),
+])
+def test_parse_response(line, kind, data):
+    resp = parse_response(line)
+    assert (resp.kind, resp.data) == (kind, data)
+
+
+@pytest.mark.parametrize("line", ["PIN 99 : ON", "PIN 7", "D2:1,X", "A0:12:3", "2:0,3:1:1", "HIL_REAL_READY",
+                                  "MODES FAIL 1", "CAPSULE", "PIN 7 : ??"])
+def test_malformed_lines_stay_raw(line):
+    assert parse_response(line).kind == "raw"
+
+
+@pytest.fixture
+def router(request):
+    return MessageRouter(SerialManager(name=request.node.name))
+
+
+def feed(router, *lines):
+    for line in lines:
+        router._on_serial_message("Alınan", line)
+
+
+def test_router_publishes_events_the_legacy_router_missed(router):
+    pins, stats = [], []
+    router.add_listener("pin_state", lambda e: pins.append((e.pin, e.value)))
+    router.add_listener("stat", lambda e: stats.extend(e.entries))
+    feed(router, "PIN A0 : ON", "D2:1,D3:0,", "2:0:1,A0:1:1")
+    assert pins == [(14, 1), (2, 1), (3, 0)]
+    assert stats == [(2, 0, 1), (14, 1, 1)]
+
+
+def test_sent_lines_are_ignored(router):
+    pins = []
+    router.add_listener("pin_state", pins.append)
+    router._on_serial_message("Gönderilen", "PIN 7 : ON")
+    assert pins == []
+
+
+def test_lines_nobody_listens_to_are_not_parsed(router, monkeypatch):
+    parsed = []
+    monkeypatch.setattr("core.message_router.parse_response", lambda line: parsed.append(line) or parse_response(line))
+    router.add_listener("pin_state", lambda e: None)
+    feed(router, "A0:1,A1:2", "2:0:1", "PIN 7 : ON", "D2:1,")
+    assert parsed == ["PIN 7 : ON", "D2:1,"]
+    # raw dinleyicisi tüm satırları ister
+    raw = []
+    router.add_listener("raw", lambda e: raw.append(e.line))
+    feed(router, "A0:1,A1:2", "HELLO")
+    assert raw == ["A0:1,A1:2", "HELLO"]
@@ -0,0 +1,83 @@
+"""PinManager değişim filtresi: analog ölü bant ve force aboneliği"""
+import pytest
+
+from core.events import AnalogValue, PinState
+from core.pin_manager import PinManager
+from core.serial_manager import SerialManager
+
+
+@pytest.fixture
+def pins(request):
+    return PinManager(serial=SerialManager(name=request.node.name))
+
+
+def feed(pins, *lines):
+    for line in lines:
+        pins.router._on_serial_message("Alınan", line)
+
+
+def test_unchanged_digital_lines_publish_nothing(pins):
+    snaps, states = [], []
+    pins.add_listener("digital_snapshot", snaps.append)
+    pins.add_listener("pin_state", states.append)
+    feed(pins, "D2:1,D3:0,", "D2:1,D3:0,", "D2:1,D3:1,")
+    assert [s.changed for s in snaps] == [(2, 3), (3,)]
+    assert states == [PinState(2, 1), PinState(3, 0), PinState(3, 1)]
+    assert pins.get_pin_state(3) == 1
+
+
+def test_single_pin_replies_always_delivered(pins):
+    states = []
+    pins.add_listener("pin_state", states.append)
+    feed(pins, "PIN 7 : ON", "PIN 7 : ON")
+    assert states == [PinState(7, 1), PinState(7, 1)]
+
+
+def test_analog_deadband_is_relative_to_last_reported_value(pins):
+    values = []
+    pins.set_analog_deadband("A0", 5)
+    pins.add_listener("analog_value", values.append, pins={"A0"})
+    feed(pins, *(f"A0:{v},A1:0" for v in (100, 104, 105, 106, 100, 97)))
+    assert values == [AnalogValue("A0", 100), AnalogValue("A0", 106), AnalogValue("A0", 100)]
+    # Ölü bant yalnızca olayları süzer; son okuma her zaman saklanır
+    assert pins.get_analog_value("A0") == 97
+
+
+def test_default_deadband_and_pin_number_alias(pins):
+    snaps = []
+    pins.default_analog_deadband = 3
+    pins.set_analog_deadband(15, 0)  # A1
+    pins.add_listener("analog_snapshot", snaps.append)
+    feed(pins, "A0:10,A1:10", "A0:12,A1:11", "A0:14,A1:11")
+    assert [s.changed for s in snaps] == [("A0", "A1"), ("A1",), ("A0",)]
+
+
+def test_force_listener_gets_every_sample(pins):
+    changes, forced, forced_pins = [], [], []
+    pins.set_analog_deadband("A0", 10)
+    pins.add_listener("analog_snapshot", changes.append)
+    pins.add_listener("analog_snapshot", forced.append, force=True)
+    pins.add_listener("analog_value", forced_pins.append, pins={"A1"}, force=True)
+    feed(pins, "A0:100,A1:5", "A0:101,A1:5")
+    assert len(changes) == 1
+    assert [s.changed for s in forced] == [("A0", "A1"), ()]
+    assert forced[1].values == {"A0": 101, "A1": 5}
+    assert forced_pins == [AnalogValue("A1", 5), AnalogValue("A1", 5)]
+
+
+def test_remove_listener_clears_force_registration(pins):
+    forced = []
+    pins.add_listener("digital_snapshot", forced.append, force=True)
+    feed(pins, "D2:1,")
+    pins.remove_listener("digital_snapshot", forced.append)
+    feed(pins, "D2:1,")
+    assert len(forced) == 1
+
+
+def test_analog_values_come_only_from_ana_snapshots(pins):
+    values = []
+    pins.add_listener("analog_value", values.append)
+    # Firmware'in tekil analog yanıtı yok: yönlendiricinin analog_value tablosuna abone olunmaz
+    assert not pins.router._listeners.get("analog_value")
+    feed(pins, "A0:7,A1:8")
+    assert values == [AnalogValue("A0", 7), AnalogValue("A1", 8)]
@@ -0,0 +1,48 @@
+"""Otomatik yeniden bağlantı ve pin durumunun geri yüklenmesi (sim:// unplug)"""
+import threading
+import time
+
+from core.pin_manager import PinManager
+from core.transport import sim_model
+
+
+def test_reconnects_after_unplug(manager):
+    events = []
+    reconnected = threading.Event()
+    manager.add_connection_callback(events.append)
+    manager.add_reconnect_callback(reconnected.set)
+    manager.serial_port.unplug()
+    assert reconnected.wait(5)
+    assert manager.is_connected
+    assert events == [False, True]
+    assert manager.request("TEST").result(2).kind == "test"
+
+
+def test_restores_pin_state_when_board_was_reset(manager, request):
+    pins = PinManager(serial=manager)
+    pins.set_modes({9: 1, 7: 1}).result(2)
+    pins.write_many({9: 120, 7: 1}).result(2)
+    model = sim_model(request.node.name)
+    assert model.pin_states[9] == 120
+
+    reconnected = threading.Event()
+    manager.add_reconnect_callback(reconnected.set)
+    manager.serial_port.unplug()
+    model.reset()
+    assert reconnected.wait(5)
+    # restore_state'in MODES/WRITE komutları TEST'ten önce kuyrukta
+    manager.request("TEST").result(2)
+    assert model.pin_modes[9] == 1 and model.pin_modes[7] == 1
+    assert model.pin_states[9] == 120 and model.pin_states[7] == 1
+
+
+def test_disconnect_stops_reconnecting(manager):
+    manager.serial_port.unplug()
+    # Okuma thread'i kopmayı fark edip denetçiyi başlatsın
+    deadline = time.time() + 2
+    while manager.is_connected and time.time() < deadline:
+        time.sleep(0.005)
+    manager.disconnect()
+    time.sleep(0.3)
+    assert not manager.is_connected
+    assert manager.serial_thread is None
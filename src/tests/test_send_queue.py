@@ -0,0 +1,206 @@
+"""SendQueue: birleştirme (coalescing), taşma politikaları, öncelik şeritleri, ttl ve requeue"""
+import queue
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from core.send_queue import BLOCK, DROP_OLDEST, NORMAL, REJECT, URGENT, OutgoingCommand, SendQueue
+
+
+def cmd(text, **kwargs):
+    return OutgoingCommand(text, **kwargs)
+
+
+def drain(q):
+    out = []
+    while True:
+        try:
+            out.append(q.get_nowait().text)
+        except queue.Empty:
+            return out
+
+
+def test_writes_to_same_pin_coalesce_in_place():
+    q = SendQueue()
+    for text in ("PWM 9,10", "5,1", "PWM 9,20", "PWM 9,30", "5,0"):
+        q.put(cmd(text))
+    assert drain(q) == ["PWM 9,30", "5,0"]
+    assert q.coalesced_count == 3
+
+
+def test_digital_and_pwm_writes_share_a_pin_key():
+    q = SendQueue()
+    q.put(cmd("PWM 9,10"))
+    q.put(cmd("9,1"))
+    assert drain(q) == ["9,1"]
+
+
+def test_non_write_command_is_a_barrier():
+    q = SendQueue()
+    for text in ("PWM 9,10", "MODE 9,IN", "PWM 9,20"):
+        q.put(cmd(text))
+    assert drain(q) == ["PWM 9,10", "MODE 9,IN", "PWM 9,20"]
+
+
+def test_requests_with_future_never_coalesce():
+    q = SendQueue()
+    q.put(cmd("PWM 9,10", future=Future()))
+    q.put(cmd("PWM 9,20", future=Future()))
+    assert drain(q) == ["PWM 9,10", "PWM 9,20"]
+
+
+def test_drop_oldest_fails_dropped_future():
+    q = SendQueue(maxsize=2, overflow=DROP_OLDEST)
+    first = Future()
+    q.put(cmd("TEST", future=first))
+    q.put(cmd("ANA"))
+    assert q.put(cmd("DIG"))
+    assert drain(q) == ["ANA", "DIG"]
+    assert q.dropped_count == 1
+    with pytest.raises(queue.Full):
+        first.result(0)
+
+
+def test_reject_keeps_queue_and_returns_false():
+    q = SendQueue(maxsize=2, overflow=REJECT)
+    q.put(cmd("TEST"))
+    q.put(cmd("ANA"))
+    assert not q.put(cmd("DIG"))
+    assert q.rejected_count == 1
+    assert drain(q) == ["TEST", "ANA"]
+
+
+def test_block_gives_up_after_block_timeout():
+    q = SendQueue(maxsize=1, overflow=BLOCK, block_timeout=0.05)
+    q.put(cmd("TEST"))
+    assert not q.put(cmd("ANA"))
+    assert q.qsize() == 1
+
+
+def test_coalescing_does_not_count_against_the_bound():
+    q = SendQueue(maxsize=1, overflow=REJECT)
+    q.put(cmd("PWM 9,10"))
+    assert q.put(cmd("PWM 9,20"))
+    assert drain(q) == ["PWM 9,20"]
+
+
+def test_control_markers_bypass_the_bound():
+    q = SendQueue(maxsize=1, overflow=REJECT)
+    q.put(cmd("TEST"))
+    marker = object()
+    assert q.put(marker)
+    assert q.get_nowait() is marker
+
+
+def test_requeue_puts_command_back_at_the_head():
+    q = SendQueue()
+    for text in ("PWM 9,10", "PWM 5,1", "ANA"):
+        q.put(cmd(text))
+    item = q.get_nowait()
+    q.requeue(item)
+    assert q.qsize() == 3
+    assert q.lane_stats()["normal"]["sent"] == 0
+    # Anahtar geri geldi: aynı pine yeni yazma onunla birleşir
+    q.put(cmd("PWM 9,99"))
+    assert drain(q) == ["PWM 9,99", "PWM 5,1", "ANA"]
+
+
+def test_requeue_keeps_key_on_newer_pending_write():
+    q = SendQueue()
+    q.put(cmd("PWM 9,10"))
+    item = q.get_nowait()
+    q.put(cmd("PWM 9,20"))
+    q.requeue(item)
+    q.put(cmd("PWM 9,30"))
+    assert drain(q) == ["PWM 9,10", "PWM 9,30"]
+
+
+def test_urgent_lane_goes_first():
+    q = SendQueue()
+    q.put(cmd("ANA"))
+    q.put(cmd("DIG"))
+    q.put(cmd("ALL 0"))
+    q.put(cmd("PWM 9,0", priority=URGENT))
+    assert drain(q) == ["ALL 0", "PWM 9,0", "ANA", "DIG"]
+
+
+def test_urgent_burst_lets_normal_lane_through():
+    q = SendQueue(urgent_burst=2)
+    q.put(cmd("ANA"))
+    for i in range(4):
+        q.put(cmd(f"TEXT {i}", priority=URGENT))
+    assert drain(q) == ["TEXT 0", "TEXT 1", "ANA", "TEXT 2", "TEXT 3"]
+    assert q.starvation_count == 1
+
+
+def test_urgent_write_supersedes_pending_normal_write():
+    q = SendQueue()
+    q.put(cmd("PWM 9,10"))
+    q.put(cmd("PWM 5,10"))
+    q.put(cmd("PWM 9,0", priority=URGENT))
+    assert drain(q) == ["PWM 9,0", "PWM 5,10"]
+    assert q.superseded_count == 1
+
+
+def test_urgent_all_supersedes_every_pending_pin_write():
+    q = SendQueue()
+    for text in ("PWM 9,10", "5,1", "ANA"):
+        q.put(cmd(text))
+    q.put(cmd("ALL 0"))
+    assert drain(q) == ["ALL 0", "ANA"]
+
+
+def test_urgent_command_evicts_normal_when_full():
+    q = SendQueue(maxsize=2, overflow=REJECT)
+    q.put(cmd("ANA"))
+    q.put(cmd("DIG"))
+    assert q.put(cmd("ALL 0"))
+    assert drain(q) == ["ALL 0", "DIG"]
+
+
+def test_requeue_returns_to_its_own_lane():
+    q = SendQueue()
+    q.put(cmd("ANA"))
+    q.put(cmd("ALL 1"))
+    item = q.get_nowait()
+    assert item.priority == URGENT
+    q.requeue(item)
+    assert q.lane_depth(URGENT) == 1 and q.lane_depth(NORMAL) == 1
+    assert drain(q) == ["ALL 1", "ANA"]
+
+
+def test_expired_command_is_skipped_and_future_fails():
+    q = SendQueue()
+    future = Future()
+    q.put(cmd("ANA", future=future, ttl=0.01))
+    q.put(cmd("DIG"))
+    time.sleep(0.02)
+    assert drain(q) == ["DIG"]
+    assert q.expired_count == 1
+    assert q.lane_stats()["normal"]["expired"] == 1
+    with pytest.raises(TimeoutError):
+        future.result(0)
+
+
+def test_coalesced_write_takes_the_newer_deadline():
+    q = SendQueue()
+    q.put(cmd("PWM 9,10", ttl=0.01))
+    q.put(cmd("PWM 9,20", ttl=60))
+    time.sleep(0.02)
+    assert drain(q) == ["PWM 9,20"]
+    q.put(cmd("PWM 9,30"))
+    q.put(cmd("PWM 9,40", ttl=0.01))
+    time.sleep(0.02)
+    assert drain(q) == []
+
+
+def test_command_without_ttl_never_expires():
+    item = cmd("ANA")
+    assert item.deadline is None
+    assert not item.expired(time.perf_counter() + 1e6)
+
+
+def test_unknown_overflow_policy_is_rejected():
+    with pytest.raises(ValueError):
+        SendQueue(overflow="spill")
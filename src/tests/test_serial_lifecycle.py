@@ -0,0 +1,45 @@
+"""SerialManager thread'lerinin kapanması: dağıtıcı ve queued callback'ler"""
+import threading
+
+from core.serial_manager import SerialManager
+
+
+def test_disconnect_stops_dispatcher_after_pending_lines(manager):
+    lines = []
+    manager.add_message_callback(lambda source, line: lines.append(line))
+    manager.request("PWM 9,1").result(2)
+    dispatcher = manager._dispatcher
+    manager.disconnect()
+    dispatcher.join(1)
+    assert not dispatcher.is_alive()
+    assert "PIN 9 : 1" in lines
+
+
+def test_reconnect_after_disconnect_restarts_dispatcher(manager, request):
+    manager.disconnect()
+    lines = []
+    manager.add_message_callback(lambda source, line: source == "Alınan" and lines.append(line))
+    assert manager.connect(f"sim://{request.node.name}")
+    manager.request("PWM 9,2").result(2)
+    manager.disconnect()
+    manager.disconnect()
+    assert lines == ["PIN 9 : 2"]
+    dispatchers = [t for t in threading.enumerate() if t.name == f"SerialDispatch-{request.node.name}"]
+    for thread in dispatchers:
+        thread.join(1)
+        assert not thread.is_alive()
+
+
+def test_shutdown_closes_queued_callbacks(request):
+    name = request.node.name
+    serial = SerialManager(name=name)
+    assert serial.connect(f"sim://{name}")
+    callback = lambda source, line: None  # noqa: E731
+    serial.add_message_callback(callback, queued=True)
+    worker = serial._queued_callbacks[callback]._thread
+    dispatcher = serial._dispatcher
+    serial.shutdown()
+    worker.join(1)
+    dispatcher.join(1)
+    assert not worker.is_alive() and not dispatcher.is_alive()
+    assert not serial.is_connected and serial.message_callbacks == []
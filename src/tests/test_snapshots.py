@@ -0,0 +1,33 @@
+"""MessageRouter digital/analog_snapshot olaylarının changed/mask alanları"""
+from core.events import analog_mask, digital_mask
+from core.message_router import MessageRouter
+from core.serial_manager import SerialManager
+
+
+def test_masks_use_arduino_pin_bits():
+    assert digital_mask((2, 13)) == (1 << 2) | (1 << 13)
+    assert analog_mask(("A0", "A5")) == (1 << 14) | (1 << 19)
+
+
+def test_snapshot_changed_is_relative_to_previous_snapshot(request):
+    router = MessageRouter(SerialManager(name=request.node.name))
+    snaps = []
+    router.add_listener("digital_snapshot", snaps.append)
+    for line in ("D2:1,D3:0,", "D2:1,D3:0,", "D2:0,D3:0,"):
+        router._on_serial_message("Alınan", line)
+    assert [s.changed for s in snaps] == [(2, 3), (), (2,)]
+    assert [s.mask for s in snaps] == [0b1100, 0, 0b100]
+    assert snaps[2].values == {2: 0, 3: 0}
+
+
+def test_first_snapshot_after_resubscribe_reports_all_pins(request):
+    router = MessageRouter(SerialManager(name=request.node.name))
+    snaps = []
+    router.add_listener("analog_snapshot", snaps.append)
+    router._on_serial_message("Alınan", "A0:5,A1:7")
+    router.remove_listener("analog_snapshot", snaps.append)
+    router._on_serial_message("Alınan", "A0:9,A1:7")
+    router.add_listener("analog_snapshot", snaps.append)
+    router._on_serial_message("Alınan", "A0:9,A1:7")
+    assert [s.changed for s in snaps] == [("A0", "A1"), ("A0", "A1")]
+    assert snaps[1].mask == analog_mask(("A0", "A1"))